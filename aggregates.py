@@ -0,0 +1,181 @@
+"""Agregat sentimen harian yang dipelihara secara inkremental.
+
+Tabel `status_harian` menyimpan jumlah status dan total `kepercayaan` per
+pengguna, per hari, per label. Grafik tren cukup membaca beberapa ratus baris
+agregat, bukan memindai seluruh riwayat `status`.
+
+- Jalur normal: `record_rows` dipanggil oleh StatusWriter di dalam transaksi
+  insert yang sama, lalu watermark (id_status terakhir yang sudah teragregasi)
+  dimajukan.
+- Setelah backfill (baris dimasukkan tanpa StatusWriter), `refresh` hanya
+  mengagregasi baris dengan id_status > watermark. `rebuild` menghitung ulang
+  semuanya.
+- Setiap perubahan menaikkan `versi` pengguna di `status_harian_versi`, dipakai
+  `TrendCache` untuk menyimpan data grafik per pengguna sampai ada status baru.
+
+Catatan: UPDATE/DELETE langsung pada `status` tidak tercermin; jalankan
+`rebuild` setelah operasi semacam itu.
+"""
+import threading
+from collections import defaultdict
+
+WATERMARK_NAME = "status_harian"
+ANONYMOUS_USER = ""  # id_user NULL disimpan sebagai string kosong (kolom kunci tidak boleh NULL)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS status_harian (
+            id_user TEXT NOT NULL,
+            tanggal TEXT NOT NULL,
+            label_sentimen TEXT NOT NULL,
+            jumlah INTEGER NOT NULL DEFAULT 0,
+            jumlah_kepercayaan INTEGER NOT NULL DEFAULT 0,
+            total_kepercayaan REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (id_user, tanggal, label_sentimen)
+        ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS status_harian_versi (
+            id_user TEXT PRIMARY KEY,
+            versi INTEGER NOT NULL
+        ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS agregat_watermark (
+            nama TEXT PRIMARY KEY,
+            id_status INTEGER NOT NULL
+        )""",
+)
+
+_UPSERT_SQL = """
+    INSERT INTO status_harian (id_user, tanggal, label_sentimen, jumlah, jumlah_kepercayaan, total_kepercayaan)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id_user, tanggal, label_sentimen) DO UPDATE SET
+        jumlah = jumlah + excluded.jumlah,
+        jumlah_kepercayaan = jumlah_kepercayaan + excluded.jumlah_kepercayaan,
+        total_kepercayaan = total_kepercayaan + excluded.total_kepercayaan
+"""
+
+_BUMP_VERSION_SQL = """
+    INSERT INTO status_harian_versi (id_user, versi) VALUES (?, 1)
+    ON CONFLICT (id_user) DO UPDATE SET versi = versi + 1
+"""
+
+# `kepercayaan` non-numerik (BLOB lama yang belum dikonversi persistence.normalize_confidence)
+# tidak ikut dihitung, alih-alih dijumlahkan sebagai 0
+_NUMERIC_CONFIDENCE = "CASE WHEN typeof(kepercayaan) IN ('real', 'integer') THEN kepercayaan END"
+
+_SET_WATERMARK_SQL = """
+    INSERT INTO agregat_watermark (nama, id_status) VALUES (?, ?)
+    ON CONFLICT (nama) DO UPDATE SET id_status = excluded.id_status
+"""
+
+
+def ensure_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+def get_watermark(conn):
+    row = conn.execute("SELECT id_status FROM agregat_watermark WHERE nama = ?", (WATERMARK_NAME,)).fetchone()
+    return row[0] if row else 0
+
+
+def _max_status_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id_status), 0) FROM status").fetchone()[0]
+
+
+def _apply_groups(conn, groups):
+    conn.executemany(_UPSERT_SQL, [key + tuple(value) for key, value in groups.items()])
+    conn.executemany(_BUMP_VERSION_SQL, [(user,) for user in {key[0] for key in groups}])
+
+
+def record_rows(conn, rows, max_id_before):
+    """Menambahkan baris yang baru saja di-insert ke agregat (di dalam transaksi pemanggil).
+
+    `rows` berurutan seperti persistence.INSERT_SQL: (isi, label, kepercayaan,
+    tanggal, id_user, model_versi). `max_id_before` adalah MAX(id_status) sebelum insert.
+    Jika masih ada baris lama di atas watermark (sisa backfill), seluruh
+    selisihnya diagregasi lewat `refresh` sehingga tidak ada yang terlewat.
+    """
+    if get_watermark(conn) != max_id_before:
+        return refresh(conn)
+    groups = defaultdict(lambda: [0, 0, 0.0])
+    for _, label, kepercayaan, tanggal, id_user, _ in rows:
+        group = groups[(id_user or ANONYMOUS_USER, str(tanggal), label)]
+        group[0] += 1
+        if kepercayaan is not None:
+            group[1] += 1
+            group[2] += kepercayaan
+    _apply_groups(conn, groups)
+    conn.execute(_SET_WATERMARK_SQL, (WATERMARK_NAME, _max_status_id(conn)))
+    return len(rows)
+
+
+def refresh(conn):
+    """Mengagregasi baris `status` di atas watermark (mis. setelah backfill)."""
+    watermark = get_watermark(conn)
+    high = _max_status_id(conn)
+    if high <= watermark:
+        return 0
+    rows = conn.execute(
+        f"""SELECT COALESCE(id_user, ''), tanggal_status, label_sentimen, COUNT(*),
+                   COUNT({_NUMERIC_CONFIDENCE}), COALESCE(SUM({_NUMERIC_CONFIDENCE}), 0)
+            FROM status WHERE id_status > ? AND id_status <= ?
+            GROUP BY 1, 2, 3""",
+        (watermark, high),
+    ).fetchall()
+    groups = {(u, str(t), l): (n, nk, total) for u, t, l, n, nk, total in rows}
+    _apply_groups(conn, groups)
+    conn.execute(_SET_WATERMARK_SQL, (WATERMARK_NAME, high))
+    return sum(g[0] for g in groups.values())
+
+
+def rebuild(conn):
+    """Menghitung ulang seluruh agregat dari nol.
+
+    Versi semua pengguna dinaikkan, termasuk yang barisnya sudah terhapus,
+    agar TrendCache tidak terus menyajikan grafik lama mereka.
+    """
+    conn.execute("DELETE FROM status_harian")
+    conn.execute("UPDATE status_harian_versi SET versi = versi + 1")
+    conn.execute(_SET_WATERMARK_SQL, (WATERMARK_NAME, 0))
+    return refresh(conn)
+
+
+def user_version(conn, id_user):
+    row = conn.execute("SELECT versi FROM status_harian_versi WHERE id_user = ?",
+                       (id_user or ANONYMOUS_USER,)).fetchone()
+    return row[0] if row else 0
+
+
+def daily_trend(conn, id_user, date_from=None, date_to=None):
+    """Baris (tanggal, label, jumlah, rata2_kepercayaan) untuk grafik tren seorang pengguna."""
+    sql = ("SELECT tanggal, label_sentimen, jumlah, "
+           "CASE WHEN jumlah_kepercayaan > 0 THEN total_kepercayaan / jumlah_kepercayaan END "
+           "FROM status_harian WHERE id_user = ?")
+    params = [id_user or ANONYMOUS_USER]
+    if date_from:
+        sql += " AND tanggal >= ?"
+        params.append(date_from)
+    if date_to:
+        sql += " AND tanggal <= ?"
+        params.append(date_to)
+    return conn.execute(sql + " ORDER BY tanggal, label_sentimen", params).fetchall()
+
+
+class TrendCache:
+    """Cache data grafik per pengguna, berlaku sampai versi agregat pengguna berubah."""
+
+    def __init__(self, max_users=1000):
+        self.max_users = max_users
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, conn, id_user):
+        version = user_version(conn, id_user)
+        with self._lock:
+            cached = self._data.get(id_user)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = daily_trend(conn, id_user)
+        with self._lock:
+            if len(self._data) >= self.max_users:
+                self._data.pop(next(iter(self._data)))
+            self._data[id_user] = (version, rows)
+        return rows
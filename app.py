@@ -1,8 +1,22 @@
 import streamlit as st
-import joblib
 import numpy as np
-from PIL import Image
+import html # Escape username di HTML
 import os # Untuk memeriksa keberadaan file
+import tempfile # File sementara untuk ekspor riwayat
+import time # Timer monotonic untuk instrumentasi latensi
+
+import history_export
+import long_document
+import metrics
+import near_duplicate
+import page_html
+from aggregates import TrendCache
+from persistence import decode_confidence, get_pool, get_writer
+from prediction_cache import DEFAULT_MAX_SIZE, PredictionCache
+from sentiment_engine import (Prediction, SentimentEngine, artifact_paths, artifact_signature, artifact_version,
+                              load_artifacts)
+from shared_model import active_registry
+from user_store import get_user_store
 
 # --- Konfigurasi Halaman Streamlit (Harus di awal) ---
 st.set_page_config(
@@ -13,15 +27,20 @@ st.set_page_config(
 )
 
 # --- Fungsi untuk Memuat Model dan Alat NLP ---
-@st.cache_resource # Gunakan cache_resource untuk memuat model hanya sekali
-def load_nlp_resources():
-    """Memuat model, TF-IDF vectorizer, dan LabelEncoder."""
+@st.cache_resource(max_entries=2) # Gunakan cache_resource untuk memuat model hanya sekali per versi file
+def load_nlp_resources(model_signature=None):
+    """Memuat model, TF-IDF vectorizer, dan LabelEncoder.
+
+    `model_signature` (lihat `model_file_signature`) menjadi kunci cache: jika set
+    artefak aktif berganti (pointer dipindah oleh `train.py --pasang` atau
+    `online_update.py --perbarui-pkl`), versi baru dimuat tanpa restart, sementara
+    sesi yang sedang berjalan tetap memegang objek lama sampai selesai.
+    """
+    paths = model_signature[0] if model_signature else artifact_paths()
     try:
         # Perhatikan: Disarankan untuk mengganti nama file "tfidf_vectorizer (1).pkl"
         # menjadi "tfidf_vectorizer.pkl" untuk konsistensi.
-        model = joblib.load("naivebayes_model.pkl")
-        tfidf = joblib.load("tf-idf_vectorizer.pkl") # Pastikan nama file sudah diperbaiki
-        label_encoder = joblib.load("label_encoder.pkl")
+        model, tfidf, label_encoder = load_artifacts(*paths) # Pastikan nama file sudah diperbaiki
         return model, tfidf, label_encoder
     except FileNotFoundError as e:
         st.error(f"🚨 Error: File model atau vectorizer tidak ditemukan. Pastikan semua file (.pkl) berada di direktori yang sama dengan aplikasi Streamlit ini. Detail: {e}")
@@ -30,397 +49,111 @@ def load_nlp_resources():
         st.error(f"🚨 Error saat memuat sumber daya NLP: {e}")
         st.stop()
 
-model, tfidf, label_encoder = load_nlp_resources()
+def model_file_signature():
+    """(path artefak aktif, (inode, mtime, ukuran) per file); berubah saat pointer atau salah satu file berganti."""
+    paths = artifact_paths()
+    return paths, artifact_signature(*paths)
 
-# --- Custom CSS untuk Tampilan Aplikasi (Tema Biru Modern) ---
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Gaya untuk keseluruhan aplikasi */
-    .stApp {
-        background: #3b5998; /* Diubah menjadi biru Facebook */
-        font-family: 'Inter', sans-serif; /* Font Inter untuk tampilan modern */
-        min-height: 100vh; /* Tinggi minimal 100% viewport */
-        color: #374151; /* Warna teks default */
-    }
-    
-    /* Gaya untuk header utama aplikasi */
-    .main-header {
-        background: rgba(255, 255, 255, 0.95); /* Latar belakang semi-transparan */
-        backdrop-filter: blur(20px); /* Efek blur pada latar belakang */
-        border: 1px solid rgba(255, 255, 255, 0.2); /* Border tipis */
-        border-radius: 20px; /* Sudut membulat */
-        padding: 3rem 2rem; /* Padding internal */
-        margin: 2rem auto; /* Margin atas/bawah dan tengah secara horizontal */
-        text-align: center; /* Teks di tengah */
-        box-shadow: 
-            0 20px 40px rgba(0, 0, 0, 0.1), /* Bayangan luar */
-            0 0 0 1px rgba(255, 255, 255, 0.1) inset; /* Bayangan dalam */
-        animation: fadeInUp 0.8s ease-out; /* Animasi muncul */
-        position: relative;
-        overflow: hidden; /* Pastikan shimmer tidak keluar */
-    }
-    
-    /* Efek shimmer pada header */
-    .main-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-        animation: shimmer 3s infinite; /* Animasi shimmer */
-    }
-    
-    /* Gaya untuk bagian logo di header */
-    .logo-section {
-        display: flex;
-        align-items: center;
-        justify-content: flex-start;
-        margin-bottom: 2rem;
-        color: #4a90e2;
-        font-weight: 600;
-        font-size: 1.1rem;
-    }
-    
-    /* Gaya untuk judul utama aplikasi */
-    .main-title {
-        font-size: 3.5rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, #667eea, #764ba2); /* Gradien teks */
-        -webkit-background-clip: text; /* Untuk efek gradien pada teks */
-        -webkit-text-fill-color: transparent; /* Untuk efek gradien pada teks */
-        background-clip: text;
-        margin: 1rem 0;
-        letter-spacing: 3px;
-        text-shadow: 0 4px 20px rgba(102, 126, 234, 0.3); /* Bayangan teks */
-        animation: pulse 2s infinite alternate; /* Animasi pulse */
-    }
-    
-    /* Gaya untuk sub-judul */
-    .subtitle {
-        font-size: 1.3rem;
-        color: #6b7280;
-        margin-bottom: 2rem;
-        font-weight: 400;
-        opacity: 0.8;
-    }
-    
-    /* Gaya untuk card/kontainer utama input */
-    .card {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        border-radius: 20px;
-        padding: 2.5rem;
-        margin: 2rem auto;
-        max-width: 800px;
-        box-shadow: 
-            0 25px 50px rgba(0, 0, 0, 0.1),
-            0 0 0 1px rgba(255, 255, 255, 0.1) inset;
-        transition: all 0.3s ease; /* Transisi halus saat hover */
-        animation: slideUp 0.6s ease-out;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .card:hover {
-        transform: translateY(-5px); /* Efek naik saat hover */
-        box-shadow: 
-            0 35px 60px rgba(0, 0, 0, 0.15),
-            0 0 0 1px rgba(255, 255, 255, 0.2) inset;
-    }
-    
-    /* Garis gradien di atas card */
-    .card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background: linear-gradient(90deg, #667eea, #764ba2, #f093fb);
-        border-radius: 20px 20px 0 0;
-    }
-    
-    /* Gaya untuk bagian hasil analisis */
-    .result-section {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(20px);
-        border: 2px solid rgba(102, 126, 234, 0.2);
-        border-radius: 20px;
-        padding: 2.5rem;
-        margin: 2rem auto;
-        max-width: 800px;
-        min-height: 400px; /* Tinggi minimal agar tidak terlalu kecil */
-        box-shadow: 
-            0 25px 50px rgba(0, 0, 0, 0.1),
-            0 0 30px rgba(102, 126, 234, 0.1);
-        animation: expandIn 0.6s ease-out;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    /* Gaya untuk judul bagian */
-    .section-title {
-        font-size: 2rem;
-        font-weight: 600;
-        color: white; /* Diubah menjadi putih */
-        margin-bottom: 2rem;
-        text-align: center;
-        position: relative;
-    }
-    
-    /* Garis bawah pada judul bagian */
-    .section-title::after {
-        content: '';
-        position: absolute;
-        bottom: -8px;
-        left: 50%;
-        transform: translateX(-50%);
-        width: 60px;
-        height: 3px;
-        background: linear-gradient(90deg, #667eea, #764ba2);
-        border-radius: 2px;
-    }
-    
-    /* Gaya untuk area input teks (Streamlit textarea) */
-    .stTextArea > div > div > textarea {
-        min-height: 150px !important; /* Tinggi minimal textarea */
-        font-size: 1.1rem !important;
-        line-height: 1.6 !important;
-        border: none !important; /* Hilangkan border default */
-        background: transparent !important; /* Latar belakang transparan */
-        resize: none !important; /* Nonaktifkan resize manual */
-        outline: none !important; /* Hilangkan outline saat fokus */
-        color: #374151; /* Warna teks input */
-    }
-    
-    .stTextArea > div > div > textarea:focus {
-        box_shadow: none !important; /* Hilangkan bayangan saat fokus */
-    }
+@st.cache_resource(max_entries=2) # Engine (beserta cache prediksinya) dibuat sekali per versi artefak
+def load_engine(model_signature=None):
+    """Membuat SentimentEngine dengan cache prediksi LRU di depan jalur inferensi.
 
-    /* Gaya untuk kontainer input teks */
-    .stTextArea {
-        border: 2px solid rgba(102, 126, 234, 0.2);
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 1.5rem 0;
-        background: rgba(248, 250, 252, 0.8);
-        backdrop-filter: blur(10px);
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .stTextArea:hover {
-        border-color: rgba(102, 126, 234, 0.4);
-        box-shadow: 0 0 20px rgba(102, 126, 234, 0.1);
-    }
-    
-    /* Gaya untuk area teks yang ditampilkan (hasil analisis) */
-    .text-display-area {
-        border: 2px solid rgba(102, 126, 234, 0.2);
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 1.5rem 0;
-        background: white; /* Diubah menjadi putih */
-        backdrop-filter: blur(0px); /* Hapus blur jika ingin putih solid */
-        font-size: 1.1rem;
-        line-height: 1.6;
-        color: #374151;
-    }
-    
-    /* Gaya umum untuk tombol Streamlit */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        color: white !important;
-        border: none !important;
-        padding: 1rem 2rem !important;
-        border-radius: 12px !important;
-        font-size: 1rem !important;
-        font-weight: 600 !important;
-        cursor: pointer !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        letter-spacing: 0.5px !important;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.25) !important;
-        width: 100% !important; /* Lebar penuh */
-        height: 50px !important; /* Tinggi tetap */
-        display: flex !important;
-        align-items: center !important;
-        justify-content: center !important;
-        margin: 0.5rem 0 !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-1px) !important;
-        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.35) !important;
-        background: linear-gradient(135deg, #5a67d8 0%, #6b46c1 100%) !important;
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0) !important;
-        box-shadow: 0 2px 10px rgba(102, 126, 234, 0.3) !important;
-    }
-    
-    /* Gaya khusus untuk tombol kembali */
-    .back-button-container .stButton > button {
-        background: linear-gradient(135deg, #6b7280 0%, #9ca3af 100%) !important;
-        color: white !important;
-        border: none !important;
-        padding: 0.7rem 1.5rem !important;
-        border-radius: 8px !important;
-        font-size: 0.9rem !important;
-        font-weight: 500 !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 2px 8px rgba(107, 114, 128, 0.2) !important;
-        margin-bottom: 1rem !important;
-        width: auto !important; /* Lebar otomatis */
-        min-width: 100px !important;
-    }
-    
-    .back-button-container .stButton > button:hover {
-        transform: translateY(-1px) !important;
-        box-shadow: 0 4px 12px rgba(107, 114, 128, 0.3) !important;
-        background: linear-gradient(135deg, #4b5563 0%, #6b7280 100%) !important;
-    }
-    
-    /* Gaya untuk kotak hasil sentimen (positif) */
-    .sentiment-positive {
-        background: linear-gradient(135deg, #10b981, #34d399); /* Gradien hijau */
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1.5rem 0;
-        font-size: 1.3rem;
-        font-weight: 600;
-        text-align: center;
-        box-shadow: 0 10px 30px rgba(16, 185, 129, 0.3);
-        animation: bounceIn 0.6s ease-out; /* Animasi bounce */
-    }
-    
-    /* Gaya untuk kotak hasil sentimen (negatif) */
-    .sentiment-negative {
-        background: linear-gradient(135deg, #ef4444, #f87171); /* Gradien merah */
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1.5rem 0;
-        font-size: 1.3rem;
-        font-weight: 600;
-        text-align: center;
-        box-shadow: 0 10px 30px rgba(239, 68, 68, 0.3);
-        animation: bounceIn 0.6s ease-out;
-    }
-    
-    /* Gaya untuk kotak hasil sentimen (netral) */
-    .sentiment-neutral {
-        background: linear-gradient(135deg, #f59e0b, #fbbf24); /* Gradien oranye */
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 1.5rem 0;
-        font-size: 1.3rem;
-        font-weight: 600;
-        text-align: center;
-        box-shadow: 0 10px 30px rgba(245, 158, 11, 0.3);
-        animation: bounceIn 0.6s ease-out;
-    }
-    
-    /* Gaya untuk kotak rekomendasi/saran */
-    .recommendation-box {
-        background: white; /* Diubah menjadi putih */
-        border-left: 5px solid #667eea; /* Border kiri berwarna */
-        border-radius: 10px;
-        padding: 1.5rem;
-        margin: 2rem 0;
-        font-size: 1.1rem;
-        line-height: 1.8;
-        color: #374151;
-        backdrop-filter: blur(0px); /* Hapus blur jika ingin putih solid */
-        animation: slideInLeft 0.6s ease-out; /* Animasi slide dari kiri */
-    }
-    
-    /* Gaya untuk footer */
-    .footer {
-        text-align: center;
-        color: rgba(255, 255, 255, 0.8);
-        margin-top: 4rem;
-        padding: 2rem;
-        font-size: 1rem;
-        font-weight: 500;
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        animation: fadeIn 1s ease-out;
-    }
-    
-    /* --- Keyframe Animasi --- */
-    @keyframes fadeInUp {
-        from { opacity: 0; transform: translateY(30px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    @keyframes slideUp {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    @keyframes expandIn {
-        from { opacity: 0; transform: scale(0.95); }
-        to { opacity: 1; transform: scale(1); }
-    }
-    
-    @keyframes bounceIn {
-        0% { opacity: 0; transform: scale(0.3); }
-        50% { opacity: 1; transform: scale(1.05); }
-        70% { transform: scale(0.9); }
-        100% { opacity: 1; transform: scale(1); }
-    }
-    
-    @keyframes slideInLeft {
-        from { opacity: 0; transform: translateX(-30px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; }
-        to { opacity: 1; }
-    }
-    
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        100% { transform: scale(1.02); }
-    }
-    
-    @keyframes shimmer {
-        0% { left: -100%; }
-        100% { left: 100%; }
-    }
-    
-    /* --- Responsive Design (Media Queries) --- */
-    @media (max-width: 768px) {
-        .main-title {
-            font-size: 2.5rem;
-            letter-spacing: 2px;
-        }
-        
-        .card, .result-section {
-            margin: 1rem;
-            padding: 1.5rem;
-        }
-        
-        .main-header {
-            margin: 1rem;
-            padding: 2rem 1.5rem;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
+    Cache prediksi milik engine ini saja; artefak baru berarti engine dan cache baru.
+    """
+    model, tfidf, label_encoder = load_nlp_resources(model_signature)
+    # Ukuran cache bisa diatur lewat environment variable SENTIMEN_CACHE_SIZE (0 = nonaktif)
+    cache_size = int(os.environ.get("SENTIMEN_CACHE_SIZE", DEFAULT_MAX_SIZE))
+    cache = None
+    if cache_size > 0:
+        cache = PredictionCache(cache_size)
+    engine = SentimentEngine(model, tfidf, label_encoder, cache=cache)
+    engine.version = artifact_version(*(model_signature[0] if model_signature else artifact_paths()))
+    return engine
+
+@st.cache_resource # Satu engine per varian bundle
+def load_variant_engine(variant):
+    """Engine dari varian model ringkas (lihat model_variant.py)."""
+    from model_variant import resolve_variant # Impor lambat: hanya saat varian dipilih
+
+    cache_size = int(os.environ.get("SENTIMEN_CACHE_SIZE", DEFAULT_MAX_SIZE))
+    try:
+        return SentimentEngine.from_bundle(resolve_variant(variant), cache_size=cache_size or None)
+    except (FileNotFoundError, ValueError) as e:
+        st.error(f"🚨 Error saat memuat varian model '{variant}': {e}")
+        st.stop()
+
+def get_engine():
+    """Mengembalikan engine aktif.
+
+    Jika mode model bersama aktif (lihat shared_model.py), engine diambil dari
+    registry bersama yang otomatis menukar versi model tanpa restart. Jika
+    SENTIMEN_MODEL_VARIANT diisi, dipakai varian bundle ringkas tersebut. Selain
+    itu dipakai engine lokal proses dari file .pkl, yang juga dimuat ulang bila
+    file model diganti.
+    """
+    registry = active_registry()
+    if registry is not None:
+        return registry.current_engine()
+    variant = os.environ.get("SENTIMEN_MODEL_VARIANT")
+    if variant:
+        return load_variant_engine(variant)
+    return load_engine(model_file_signature())
+
+# Engine inferensi yang sama dipakai oleh worker batch (lihat sentiment_engine.py)
+engine = get_engine()
+
+# Jumlah kata berpengaruh yang ditampilkan per arah di halaman hasil (0 = sembunyikan)
+EXPLAIN_TOP_K = int(os.environ.get("SENTIMEN_EXPLAIN_TOP_K", 5))
+
+# Kemiripan minimum agar hasil status tersimpan dipakai ulang tanpa menjalankan model (0 = nonaktif)
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("SENTIMEN_NEAR_DUP_THRESHOLD", near_duplicate.DEFAULT_THRESHOLD))
+
+def find_near_duplicate(text):
+    """Status tersimpan hasil model aktif yang hampir sama dengan `text` (near_duplicate.Duplicate), atau None."""
+    if NEAR_DUPLICATE_THRESHOLD <= 0 or engine.version is None:
+        return None
+    with get_pool().connection() as conn:
+        return near_duplicate.lookup(conn, text, NEAR_DUPLICATE_THRESHOLD, model_version=engine.version)
+
+def analyze_text(text):
+    """(Prediction, Duplicate atau None, DocumentAnalysis atau None).
+
+    Teks panjang (jurnal) dinilai per kalimat dengan batas token (long_document.py).
+    Status pendek dicek di cache prediksi engine lebih dulu; hanya jika belum ada,
+    status tersimpan yang hampir sama dicari di database dan hasilnya dipakai ulang.
+    """
+    if long_document.is_long(text):
+        document = long_document.analyze_document(engine, text)
+        return document.prediction, None, document
+    cached = engine.cached(text, explain=EXPLAIN_TOP_K)
+    if cached is not None:
+        return cached, None, None
+    duplicate = find_near_duplicate(text)
+    kepercayaan = decode_confidence(duplicate.kepercayaan) if duplicate else None
+    if not isinstance(kepercayaan, (int, float)):
+        return engine.analyze(text, explain=EXPLAIN_TOP_K), None, None
+    confidence = kepercayaan / 100.0
+    prediction = Prediction(duplicate.label.lower(), confidence, None, None,
+                            confidence < engine.low_confidence_threshold)
+    return prediction, duplicate, None
+
+def segment_timeline(document):
+    """Timeline segmen untuk session state: teks, label, kepercayaan, dan skor positif - negatif."""
+    timeline = []
+    for segment in document.segments:
+        probabilities = dict(zip(engine.classes, segment.prediction.probabilities))
+        timeline.append({
+            'teks': segment.text,
+            'label': segment.prediction.label,
+            'kepercayaan': segment.prediction.confidence,
+            'skor': probabilities.get('positif', 0.0) - probabilities.get('negatif', 0.0)
+        })
+    return timeline
+
+# --- Custom CSS untuk Tampilan Aplikasi (Tema Biru Modern) ---
+# Tema ada di static/style.css dan disajikan sebagai file statis yang di-cache browser;
+# setiap rerun penuh hanya mengirim satu tag <link> (lihat page_html.py).
+st.markdown(page_html.stylesheet_html(st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
 # --- Inisialisasi State Sesi Streamlit ---
 # Digunakan untuk mengelola navigasi antar halaman dan menyimpan hasil analisis
@@ -429,47 +162,152 @@ if 'page' not in st.session_state:
 if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = None # Menyimpan hasil analisis teks
 
+# --- Navigasi Halaman ---
+# Tombol memakai callback `on_click`: state diubah sebelum fragment halaman dijalankan
+# ulang, sehingga perpindahan halaman cukup satu rerun fragment (tanpa st.rerun()).
+def go_to(page, clear_result=False):
+    st.session_state.page = page
+    if clear_result:
+        st.session_state.analysis_result = None # Hapus hasil analisis sebelumnya
+
+def run_analysis():
+    """Callback tombol "Analisis Sekarang": prediksi lalu pindah ke halaman hasil."""
+    text_input = st.session_state.text_input
+    if text_input.strip() == "": # Validasi input kosong
+        st.session_state.input_error = True
+        return
+    st.session_state.analysis_started = time.perf_counter() # Awal pengukuran time-to-result
+    # --- Proses Prediksi ---
+    # Normalisasi teks (TextNormalizer, jika vectorizer dilatih dengannya), vectorization
+    # TF-IDF, prediksi model, dan inverse transform LabelEncoder dijalankan oleh
+    # SentimentEngine (jalur yang sama dengan prediksi batch).
+    #    Pastikan `label_encoder.classes_` sesuai dengan mapping sentimen Anda (e.g., [0: Negatif, 1: Netral, 2: Positif])
+    #    Label, kepercayaan, probabilitas per kelas, dan margin berasal dari satu perhitungan skor.
+    #    Status yang hampir sama dengan status tersimpan memakai label dan kepercayaan
+    #    status tersebut (indeks MinHash/LSH, lihat near_duplicate.py) tanpa menjalankan model.
+    #    Teks panjang dipecah per kalimat dan dinilai dalam satu batch; label dokumen adalah
+    #    gabungan skor kalimat (lihat long_document.py).
+    prediction, duplicate, document = analyze_text(text_input)
+    
+    # Simpan hasil ke riwayat di sentimen.db (di-buffer, ditulis per batch oleh StatusWriter)
+    get_writer().add(text_input, prediction.label, prediction.confidence,
+                     id_user=st.session_state.get('username'), model_version=engine.version)
+    
+    # Simpan hasil ke session state
+    st.session_state.analysis_result = {
+        'text': text_input,
+        'sentiment': prediction.label,
+        'confidence': prediction.confidence,
+        'probabilities': (dict(zip(engine.classes, prediction.probabilities))
+                          if prediction.probabilities is not None else None),
+        'margin': prediction.margin,
+        'low_confidence': prediction.low_confidence,
+        'explanation': prediction.explanation,
+        'duplicate_of': (duplicate.id_status, duplicate.similarity) if duplicate else None,
+        'segments': segment_timeline(document) if document else None,
+        'truncated': document.truncated if document else False
+    }
+    st.session_state.page = 'result' # Halaman hasil dirender pada rerun fragment yang sama
+
+# --- Akun: Login, Daftar, dan Sesi ---
+# Password hanya di-hash saat login/daftar; rerun berikutnya cukup memvalidasi token sesi
+# (tabel user_sessions, di-cache in-process). Lihat user_store.py.
+def restore_session():
+    """Mengisi `username` dari token sesi; sesi yang lama tidak aktif otomatis logout."""
+    token = st.session_state.get('session_token')
+    if token is None:
+        return
+    username = get_user_store().resolve_session(token)
+    if username is None:
+        del st.session_state['session_token']
+        st.session_state.pop('username', None)
+        st.session_state.session_expired = True
+    else:
+        st.session_state.username = username
+
+def start_session(username):
+    st.session_state.session_token = get_user_store().create_session(username)
+    st.session_state.username = username
+
+def login():
+    """Callback form login."""
+    username = get_user_store().authenticate(st.session_state.login_username, st.session_state.login_password)
+    st.session_state.login_password = ""
+    if username is None:
+        st.session_state.auth_error = "Username atau password salah."
+        return
+    start_session(username)
+
+def register():
+    """Callback form pendaftaran."""
+    try:
+        username = get_user_store().register(st.session_state.register_username, st.session_state.register_password)
+    except ValueError as e:
+        st.session_state.auth_error = str(e)
+        return
+    finally:
+        st.session_state.register_password = ""
+    start_session(username)
+
+def logout():
+    token = st.session_state.pop('session_token', None)
+    if token is not None:
+        get_user_store().end_session(token)
+    st.session_state.pop('username', None)
+
+def show_account():
+    """Status login di halaman utama: tombol keluar, atau form masuk/daftar."""
+    if st.session_state.get('username'):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.markdown(f'<div class="text-display-area">👤 Masuk sebagai '
+                        f'<strong>{html.escape(st.session_state.username)}</strong></div>', unsafe_allow_html=True)
+        with col2:
+            st.button("🚪 Keluar", key="logout_btn", on_click=logout)
+        return
+    if st.session_state.pop('session_expired', False):
+        st.info("⏳ Sesi berakhir karena tidak aktif. Silakan masuk kembali.")
+    with st.expander("🔐 Masuk / Daftar (untuk grafik tren dan unduh riwayat)"):
+        tab_login, tab_register = st.tabs(["Masuk", "Daftar"])
+        with tab_login:
+            with st.form("login_form"):
+                st.text_input("Username", key="login_username")
+                st.text_input("Password", type="password", key="login_password")
+                st.form_submit_button("Masuk", on_click=login)
+        with tab_register:
+            with st.form("register_form"):
+                st.text_input("Username", key="register_username")
+                st.text_input("Password", type="password", key="register_password")
+                st.form_submit_button("Daftar", on_click=register)
+        auth_error = st.session_state.pop('auth_error', None)
+        if auth_error:
+            st.error(f"⚠️ {auth_error}")
+
 # --- Fungsi Halaman Utama (Home Page) ---
 def show_home_page():
     """Menampilkan halaman selamat datang dengan tombol untuk memulai analisis."""
-    st.markdown("""
-        <div class="main-header">
-            <div class="logo-section">
-                <span>🧠 Analisis Sentimen</span>
-            </div>
-            <div class="main-title">ANALISIS SENTIMEN</div>
-            <div class="subtitle">"SELAMAT DATANG DI SISTEM ANALISIS STATUS"</div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(page_html.HOME_HEADER_HTML, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     # Mengubah layout kolom untuk memindahkan tombol "Input Status" ke ujung kiri dan membuatnya lebih lebar
     col1, col2 = st.columns([3, 1]) # Kolom pertama 3x lebih lebar (untuk tombol), kolom kedua 1x lebih lebar (kosong)
     with col1: # Menempatkan tombol di kolom pertama (kiri)
-        if st.button("📝 Input Status", key="input_status_btn", help="Klik untuk memulai analisis sentimen"):
-            st.session_state.page = 'input' # Ubah state ke halaman input
-            st.rerun() # Muat ulang aplikasi untuk menampilkan halaman baru
+        st.button("📝 Input Status", key="input_status_btn", help="Klik untuk memulai analisis sentimen",
+                  on_click=go_to, args=('input',)) # Ubah state ke halaman input
     st.markdown("<br>", unsafe_allow_html=True)
+    show_account()
 
 # --- Fungsi Halaman Input (Input Page) ---
 def show_input_page():
     """Menampilkan halaman untuk memasukkan teks dan melakukan analisis."""
-    st.markdown("""
-        <div class="main-header">
-            <div class="logo-section">
-                <span>🧠 Analisis Sentimen</span>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(page_html.PAGE_HEADER_HTML, unsafe_allow_html=True)
     
     # Tombol kembali dengan styling khusus (ditempatkan di kolom terpisah agar CSS spesifik bisa diterapkan)
     col1, col2, col3 = st.columns([2, 6, 2])
     with col1:
         # Wrapper div untuk menerapkan CSS kustom ke tombol "Kembali"
         st.markdown('<div class="back-button-container">', unsafe_allow_html=True)
-        if st.button("← Kembali", key="back_btn", help="Kembali ke halaman utama"):
-            st.session_state.page = 'home'
-            st.rerun()
+        st.button("← Kembali", key="back_btn", help="Kembali ke halaman utama", on_click=go_to, args=('home',))
         st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
@@ -478,7 +316,7 @@ def show_input_page():
     st.markdown('<h2 class="section-title" style="color: white;">📝 MASUKKAN STATUS</h2>', unsafe_allow_html=True)
     
     # Area input teks
-    text_input = st.text_area(
+    st.text_area(
         "", # Label kosong karena styling sudah di CSS
         height=150, 
         placeholder="💭 Bagikan perasaan atau status Anda disini... Kami akan menganalisis sentimen dari kata-kata Anda.",
@@ -490,53 +328,134 @@ def show_input_page():
     # Mengubah layout kolom untuk memindahkan tombol "Analisis Sekarang" ke ujung kiri dan membuatnya lebih lebar
     col1, col2 = st.columns([3, 1]) # Kolom pertama 3x lebih lebar (untuk tombol), kolom kedua 1x lebih lebar (kosong)
     with col1: # Menempatkan tombol di kolom pertama (kiri)
-        if st.button("🔍 Analisis Sekarang", key="analyze_btn", help="Mulai analisis sentimen"):
-            if text_input.strip() == "": # Validasi input kosong
-                st.error("⚠️ Mohon masukkan teks terlebih dahulu untuk dianalisis.")
-            else:
-                with st.spinner('🔄 Sedang menganalisis sentimen...'): # Tampilkan spinner saat analisis
-                    # --- Proses Prediksi ---
-                    # 1. Preprocessing (jika ada langkah selain yang ditangani TF-IDF)
-                    #    Misalnya, text_input = text_input.lower() jika case folding tidak di TF-IDF
-                    
-                    # 2. Vectorization: Mengubah teks menjadi representasi numerik menggunakan TF-IDF
-                    vectorized_text = tfidf.transform([text_input])
-                    
-                    # 3. Prediksi Model: Menggunakan model yang sudah dilatih
-                    prediction = model.predict(vectorized_text)
-                    
-                    # 4. Inverse Transform: Mengubah label numerik kembali ke label string aslinya
-                    #    Pastikan `label_encoder.classes_` sesuai dengan mapping sentimen Anda (e.g., [0: Negatif, 1: Netral, 2: Positif])
-                    sentiment_label = label_encoder.inverse_transform(prediction)[0]
-                    
-                    # Simpan hasil ke session state
-                    st.session_state.analysis_result = {
-                        'text': text_input,
-                        'sentiment': sentiment_label
-                    }
-                    st.session_state.page = 'result' # Ubah state ke halaman hasil
-                    st.rerun() # Muat ulang aplikasi untuk menampilkan halaman hasil
+        st.button("🔍 Analisis Sekarang", key="analyze_btn", help="Mulai analisis sentimen", on_click=run_analysis)
+        if st.session_state.pop('input_error', False):
+            st.error("⚠️ Mohon masukkan teks terlebih dahulu untuk dianalisis.")
     st.markdown("<br>", unsafe_allow_html=True)
 
+# --- Grafik Tren Sentimen Harian ---
+@st.cache_resource # Satu cache data grafik per proses, berlaku sampai ada status baru
+def get_trend_cache():
+    return TrendCache()
+
+def show_trend_chart(id_user):
+    """Menampilkan grafik tren harian dari tabel agregat (bukan dari seluruh riwayat)."""
+    import plotly.express as px # Impor lambat: hanya dibutuhkan saat grafik ditampilkan
+
+    get_writer().flush() # Pastikan status terbaru pengguna ikut teragregasi
+    with get_pool().connection() as conn:
+        rows = get_trend_cache().get(conn, id_user)
+    if not rows:
+        return
+    data = {
+        "Tanggal": [r[0] for r in rows],
+        "Sentimen": [r[1] for r in rows],
+        "Jumlah": [r[2] for r in rows],
+    }
+    fig = px.line(data, x="Tanggal", y="Jumlah", color="Sentimen", markers=True,
+                  title="📈 Tren Sentimen Harian",
+                  color_discrete_map={"POSITIF": "#10b981", "NETRAL": "#f59e0b", "NEGATIF": "#ef4444"})
+    st.plotly_chart(fig, use_container_width=True)
+
+# --- Unduh Riwayat (Excel/CSV) ---
+def export_history(id_user, fmt, start=None, end=None, labels=None):
+    """Isi file ekspor (bytes): baris dialirkan ke file sementara di disk, lalu dibaca sekali untuk diunduh."""
+    get_writer().flush() # Status yang masih di buffer ikut terekspor
+    with tempfile.TemporaryFile() as f:
+        with get_pool().connection() as conn:
+            history_export.export(conn, f, fmt, id_user, start, end, labels)
+        f.seek(0)
+        return f.read()
+
+def show_export(id_user):
+    """Menampilkan filter dan tombol unduh riwayat; file baru dibuat saat tombol diklik."""
+    with st.expander("📥 Unduh riwayat analisis"):
+        col1, col2 = st.columns(2)
+        with col1:
+            period = st.date_input("Rentang tanggal", value=[], key="export_period")
+        with col2:
+            labels = st.multiselect("Label", history_export.LABELS, key="export_labels")
+        fmt = st.radio("Format", history_export.FORMATS, horizontal=True, key="export_format",
+                       format_func=lambda f: "Excel (.xlsx)" if f == "xlsx" else "CSV")
+        start, end = (list(period) + [None, None])[:2] # Rentang boleh kosong atau baru berisi tanggal awal
+        st.download_button(
+            "⬇️ Unduh", key="export_btn",
+            data=lambda: export_history(id_user, fmt, start, end, labels), # Dijalankan saat tombol diklik
+            file_name=history_export.file_name(fmt, id_user, start, end),
+            mime=history_export.MIME_TYPES[fmt],
+            on_click="ignore" # Unduhan tidak memicu rerun
+        )
+
+# --- Timeline Sentimen Dokumen Panjang ---
+def show_timeline(result):
+    """Menampilkan sentimen per kalimat untuk jurnal/teks panjang."""
+    segments = result.get('segments')
+    if not segments:
+        return
+    import plotly.express as px # Impor lambat: hanya dibutuhkan saat grafik ditampilkan
+
+    with st.expander(f"🧭 Alur sentimen per kalimat ({len(segments)} bagian)", expanded=True):
+        if result.get('truncated'):
+            st.caption(f"Teks sangat panjang: hanya {long_document.DEFAULT_MAX_TOKENS} kata pertama yang dinilai.")
+        data = {
+            "Bagian": list(range(1, len(segments) + 1)),
+            "Skor": [s['skor'] for s in segments],
+            "Sentimen": [s['label'].upper() for s in segments],
+            "Teks": [s['teks'][:120] for s in segments],
+        }
+        fig = px.bar(data, x="Bagian", y="Skor", color="Sentimen", hover_data=["Teks"],
+                     range_y=[-1, 1], labels={"Skor": "Positif − Negatif"},
+                     color_discrete_map={"POSITIF": "#10b981", "NETRAL": "#f59e0b", "NEGATIF": "#ef4444"})
+        st.plotly_chart(fig, use_container_width=True)
+
+# --- Tingkat Kepercayaan Prediksi ---
+def show_confidence(result):
+    """Menampilkan kepercayaan, probabilitas per kelas, dan peringatan jika prediksi meragukan."""
+    if result.get('confidence') is None: # Hasil lama di session state belum punya skor
+        return
+    if result.get('duplicate_of'): # Hasil dipakai ulang dari status serupa: tanpa probabilitas per kelas
+        _, similarity = result['duplicate_of']
+        detail = f"diambil dari status serupa yang sudah dianalisis (kemiripan {similarity * 100:.0f}%)"
+    else:
+        probabilities = " &nbsp;|&nbsp; ".join(
+            f"{str(label).capitalize()}: {p * 100:.1f}%" for label, p in result['probabilities'].items())
+        detail = (f"(selisih dengan kelas berikutnya {result['margin'] * 100:.1f} poin)<br>"
+                  f"<small>{probabilities}</small>")
+    st.markdown(f"""
+        <div class="text-display-area">
+            <strong>🎯 Tingkat kepercayaan:</strong> {result['confidence'] * 100:.1f}%
+            {detail}
+        </div>
+    """, unsafe_allow_html=True)
+    if result['low_confidence']:
+        st.warning("⚠️ Model kurang yakin dengan hasil ini. Status ditandai untuk ditinjau lebih lanjut; "
+                   "jangan jadikan hasil ini satu-satunya acuan.")
+    show_explanation(result)
+
+def show_explanation(result):
+    """Menampilkan kata yang paling mendorong dan menahan label prediksi (untuk moderator)."""
+    explanation = result.get('explanation')
+    if not explanation or not (explanation.toward or explanation.against):
+        return
+    with st.expander("🔎 Kata yang paling berpengaruh"):
+        def format_tokens(tokens):
+            return ", ".join(f"**{token}** ({score:+.3f})" for token, score in tokens) or "-"
+        st.markdown(f"Mendorong ke **{str(result['sentiment']).upper()}**: {format_tokens(explanation.toward)}")
+        st.markdown(f"Mengarah ke **{explanation.versus.upper()}**: {format_tokens(explanation.against)}")
+
 # --- Fungsi Halaman Hasil (Result Page) ---
 def show_result_page():
     """Menampilkan hasil analisis sentimen dan rekomendasi."""
     # Pastikan ada hasil analisis sebelum menampilkan halaman
     if st.session_state.analysis_result is None:
-        st.session_state.page = 'home'
-        st.rerun()
+        go_to('home')
+        show_home_page()
         return
 
-    st.markdown("""
-        <div class="main-header">
-            <div class="logo-section">
-                <span>🧠 Analisis Sentimen</span>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(page_html.PAGE_HEADER_HTML, unsafe_allow_html=True)
     
     # Mengubah warna teks "HASIL ANALISIS" menjadi putih
-    st.markdown('<h2 class="section-title" style="color: white;">📊 HASIL ANALISIS</h2>', unsafe_allow_html=True)
+    st.markdown(page_html.RESULT_TITLE_HTML, unsafe_allow_html=True)
     
     # Tampilkan teks yang dianalisis
     st.markdown(f"""
@@ -549,108 +468,85 @@ def show_result_page():
     # Tampilkan hasil sentimen dengan styling dinamis berdasarkan label
     sentiment = st.session_state.analysis_result['sentiment'].lower() # Pastikan lowercase untuk perbandingan
     
-    # --- Mapping Sentimen ke Kelas CSS dan Rekomendasi ---
-    # PASTIKAN LABEL INI SESUAI DENGAN `label_encoder.classes_` ANDA
-    if sentiment == "positif": # Sesuaikan dengan string label dari LabelEncoder Anda
-        st.markdown(f"""
-            <div class="sentiment-positive">
-                🎉 Hasil Sentimen: POSITIF
-            </div>
-        """, unsafe_allow_html=True)
-        
-        recommendation = """
-        <div class="recommendation-box">
-            <strong>💡 Rekomendasi & Dukungan:</strong><br><br>
-            ✨ Luar biasa! Energi positif Anda sangat menginspirasi<br>
-            🌟 Terus jaga pikiran positif dan bagikan ke orang sekitar<br>
-            🎯 Luangkan waktu untuk hal-hal yang membuat Anda bahagia<br>
-            🚀 Momentum positif ini bisa dijadikan motivasi untuk pencapaian lebih besar
-        </div>
-        """
-    elif sentiment == "negatif": # Sesuaikan dengan string label dari LabelEncoder Anda
-        st.markdown(f"""
-            <div class="sentiment-negative">
-                💔 Hasil Sentimen: NEGATIF
-            </div>
-        """, unsafe_allow_html=True)
-        
-        recommendation = """
-        <div class="recommendation-box">
-            <strong>🤗 Saran & Dukungan:</strong><br><br>
-            💪 Anda tidak sendirian, cobalah berbicara dengan orang terdekat<br>
-            🩺 Pertimbangkan konsultasi dengan psikolog profesional<br>
-            🧘 Luangkan waktu untuk self-care dan aktivitas yang menenangkan<br>
-            ❤️ Ingat, Anda berharga dan pantas mendapatkan bantuan serta perhatian
-        </div>
-        """
-    else: # Asumsi ini adalah "netral"
-        st.markdown(f"""
-            <div class="sentiment-neutral">
-                ⚖️ Hasil Sentimen: NETRAL
-            </div>
-        """, unsafe_allow_html=True)
-        
-        recommendation = """
-        <div class="recommendation-box">
-            <strong>📌 Catatan & Saran:</strong><br><br>
-            🔍 Status menunjukkan sentimen yang seimbang<br>
-            👁️ Tetap pantau perasaan dan jangan ragu untuk berbagi cerita<br>
-            ⚖️ Jaga keseimbangan hidup, tetaplah reflektif dan terbuka<br>
-            🌱 Momen netral adalah kesempatan untuk introspeksi diri
-        </div>
-        """
-    
+    # --- Mapping Sentimen ke Banner dan Rekomendasi (HTML disusun sekali di page_html.py) ---
+    # Label selain positif/negatif diasumsikan "netral"
+    banner, recommendation = page_html.SENTIMENT_HTML.get(sentiment, page_html.SENTIMENT_HTML["netral"])
+    st.markdown(banner, unsafe_allow_html=True)
     st.markdown(recommendation, unsafe_allow_html=True)
     
+    show_confidence(st.session_state.analysis_result)
+    show_timeline(st.session_state.analysis_result)
+    
+    # Grafik tren sentimen harian dan unduh riwayat hanya untuk pengguna yang login
+    if st.session_state.get('username'):
+        show_trend_chart(st.session_state.username)
+        show_export(st.session_state.username)
+    
     st.markdown("<br><br>", unsafe_allow_html=True)
     # Mengubah layout kolom untuk memindahkan tombol "Kembali ke Awal" ke ujung kanan
     # col1 untuk "Analisis Ulang", col2 untuk space, col3 untuk "Kembali ke Awal"
     col1, col2, col3 = st.columns([1, 4, 1]) # Mengubah rasio kolom untuk membuat tombol lebih lebar dan "Kembali ke Awal" di ujung kanan
     with col1: # Tombol "Analisis Ulang" di kolom kiri
-        if st.button("🔄 Analisis Ulang", key="analyze_again", help="Analisis status baru"):
-            st.session_state.page = 'input'
-            st.rerun()
+        st.button("🔄 Analisis Ulang", key="analyze_again", help="Analisis status baru",
+                  on_click=go_to, args=('input',))
     with col3: # Tombol "Kembali ke Awal" di kolom paling kanan
-        if st.button("🏠 Kembali ke Awal", key="back_to_home", help="Kembali ke halaman utama"):
-            st.session_state.page = 'home'
-            st.session_state.analysis_result = None # Hapus hasil analisis sebelumnya
-            st.rerun()
+        st.button("🏠 Kembali ke Awal", key="back_to_home", help="Kembali ke halaman utama",
+                  on_click=go_to, args=('home', True))
     
     st.markdown("<br>", unsafe_allow_html=True)
 
-# --- Sembunyikan Elemen Streamlit Default ---
-hide_streamlit_style = """
-    <style>
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    .stDeployButton {display:none;} /* Sembunyikan tombol deploy jika tidak diinginkan */
-    </style>
-"""
-st.markdown(hide_streamlit_style, unsafe_allow_html=True)
+# --- Halaman Admin Tersembunyi: Metrik Latensi ---
+def show_metrics_page():
+    """Menampilkan histogram latensi per tahap (akses lewat ?admin=metrik)."""
+    st.markdown('<h2 class="section-title">📈 METRIK LATENSI</h2>', unsafe_allow_html=True)
+    if not metrics.REGISTRY.enabled:
+        st.info("Instrumentasi dimatikan (SENTIMEN_METRICS=0).")
+    st.json(metrics.REGISTRY.snapshot())
+    if engine.cache is not None:
+        st.json({"prediction_cache": engine.cache.stats()})
+    st.code(metrics.REGISTRY.render_text(), language="text") # Format teks Prometheus
+
+def is_admin_request():
+    """True jika URL meminta halaman metrik (dan token cocok bila SENTIMEN_ADMIN_TOKEN diset)."""
+    if st.query_params.get("admin") != "metrik":
+        return False
+    token = os.environ.get("SENTIMEN_ADMIN_TOKEN")
+    return not token or st.query_params.get("token") == token
 
 # --- Logika Utama Aplikasi ---
-def main():
-    """Fungsi utama untuk mengelola alur aplikasi berdasarkan state sesi."""
+@st.fragment
+def show_pages():
+    """Halaman home/input/hasil sebagai satu fragment.
+
+    Interaksi di halaman hanya menjalankan ulang fragment ini; CSS, model, dan
+    footer di luar fragment tidak dikirim ulang.
+    """
+    restore_session()
     if st.session_state.page == 'home':
         show_home_page()
     elif st.session_state.page == 'input':
         show_input_page()
     elif st.session_state.page == 'result':
-        show_result_page()
+        with metrics.timer("ui.render_result"):
+            show_result_page()
+        # Dari klik "Analisis Sekarang" (callback) sampai halaman hasil selesai dirender
+        analysis_started = st.session_state.pop('analysis_started', None)
+        if analysis_started is not None:
+            metrics.observe("ui.time_to_result", time.perf_counter() - analysis_started)
+
+def main():
+    """Fungsi utama untuk mengelola alur aplikasi berdasarkan state sesi."""
+    if is_admin_request():
+        show_metrics_page()
+    else:
+        show_pages()
 
 # --- Fungsi Footer ---
 def show_footer():
     """Menampilkan footer aplikasi."""
-    st.markdown("""
-        <div class='footer'>
-            © 2025 Sentimen Analisis Kesehatan Mental<br>
-            <small>Dibuat dengan ❤️ menggunakan Machine Learning & NLP</small>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(page_html.FOOTER_HTML, unsafe_allow_html=True)
 
 # --- Jalankan Aplikasi ---
 if __name__ == "__main__":
     main()
     show_footer()
-
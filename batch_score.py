@@ -0,0 +1,273 @@
+"""CLI skoring batch untuk file CSV/JSONL berukuran besar.
+
+Input dibaca secara streaming dalam potongan (chunk) berukuran tetap, setiap
+chunk diprediksi dengan satu kali pemanggilan SentimentEngine, lalu hasilnya
+langsung ditulis ke output. Pemakaian memori tetap datar berapa pun ukuran
+input.
+
+Mode multi-proses (`--workers N`) membagi chunk ke N proses worker yang
+masing-masing memuat model sekali saat start; hasil tetap ditulis sesuai
+urutan input.
+
+Contoh:
+    python batch_score.py sentimen_status.csv -o hasil.csv
+    python batch_score.py status.jsonl -o hasil.jsonl --text-field isi_status
+    python batch_score.py sentimen.db -o hasil.csv --workers 16
+"""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sentiment_engine import SentimentEngine
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Kolom output (urutan sama untuk CSV maupun JSONL)
+OUTPUT_FIELDS = ["text", "label_asli", "prediksi", "kepercayaan", "margin", "perlu_tinjauan"]
+# Kolom tambahan saat penjelasan token diminta (--jelaskan K), format "token:skor token:skor"
+EXPLAIN_FIELDS = ["token_pendorong", "token_penahan"]
+
+
+# --- Pembaca Input (Streaming) ---
+def iter_csv_rows(path, text_column=3, label_column=4, skip_header=True):
+    """Menghasilkan (teks, label_asli) per baris CSV. Nomor kolom dimulai dari 1."""
+    text_idx = text_column - 1
+    label_idx = label_column - 1 if label_column else None
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if len(row) <= text_idx:
+                continue
+            label = row[label_idx] if label_idx is not None and len(row) > label_idx else ""
+            yield row[text_idx], label
+
+
+def iter_jsonl_rows(path, text_field="text", label_field="label"):
+    """Menghasilkan (teks, label_asli) per baris JSONL; baris kosong dilewati."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield str(record.get(text_field, "")), str(record.get(label_field, "") or "")
+
+
+def iter_sqlite_rows(path, fetch_size=DEFAULT_CHUNK_SIZE):
+    """Menghasilkan (isi_status, label_sentimen) dari tabel `status` di database SQLite."""
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute("SELECT isi_status, label_sentimen FROM status ORDER BY id_status")
+        while True:
+            batch = cursor.fetchmany(fetch_size)
+            if not batch:
+                return
+            for text, label in batch:
+                yield text or "", label or ""
+    finally:
+        conn.close()
+
+
+def iter_chunks(rows, chunk_size):
+    """Memecah iterator baris menjadi list berukuran `chunk_size`."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def detect_format(path, explicit=None):
+    """Menentukan format file ('csv' atau 'jsonl') dari argumen atau ekstensi."""
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    return "jsonl" if ext in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+# --- Skoring ---
+def _format_tokens(tokens):
+    return " ".join(f"{token}:{score:.4f}" for token, score in tokens)
+
+
+def score_chunk(engine, chunk, explain=0):
+    """Memprediksi satu chunk (list of (teks, label_asli)) dan mengembalikan baris hasil.
+
+    `explain` > 0 menambahkan kolom token pendorong/penahan (maksimal sebanyak itu per arah).
+    """
+    texts = [text for text, _ in chunk]
+    results = []
+    for (text, original), p in zip(chunk, engine.analyze_batch(texts, explain)):
+        result = {"text": text, "label_asli": original, "prediksi": p.label,
+                  "kepercayaan": round(p.confidence, 6), "margin": round(p.margin, 6),
+                  "perlu_tinjauan": int(p.low_confidence)}
+        if explain:
+            explanation = p.explanation
+            result["token_pendorong"] = _format_tokens(explanation.toward) if explanation else ""
+            result["token_penahan"] = _format_tokens(explanation.against) if explanation else ""
+        results.append(result)
+    return results
+
+
+def score_stream(engine, rows, chunk_size=DEFAULT_CHUNK_SIZE, explain=0):
+    """Menghasilkan list hasil per chunk secara berurutan."""
+    for chunk in iter_chunks(rows, chunk_size):
+        yield score_chunk(engine, chunk, explain)
+
+
+# --- Mode Multi-Proses ---
+_worker_engine = None
+
+
+def load_engine(bundle_path=None):
+    """Memuat engine dari bundle memory-map jika diberikan, selain itu dari file .pkl."""
+    if bundle_path:
+        return SentimentEngine.from_bundle(bundle_path)
+    return SentimentEngine.from_files()
+
+
+def _init_worker(bundle_path=None):
+    """Initializer proses worker: memuat artefak model satu kali per proses."""
+    global _worker_engine
+    _worker_engine = load_engine(bundle_path)
+
+
+def _score_chunk_in_worker(chunk, explain=0):
+    return score_chunk(_worker_engine, chunk, explain)
+
+
+def score_stream_parallel(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=2, max_pending=None,
+                          bundle_path=None, explain=0):
+    """Seperti `score_stream`, tetapi chunk diskor oleh `workers` proses.
+
+    Hasil dikembalikan sesuai urutan input. Jumlah chunk yang sedang diproses
+    dibatasi `max_pending` (default 2x jumlah worker) sehingga pembaca input
+    tidak berlari jauh di depan penulis output. Dengan `bundle_path`, semua
+    worker memetakan bundle yang sama sehingga halaman model dibagi via page cache.
+    """
+    max_pending = max_pending or workers * 2
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(bundle_path,)) as pool:
+        for chunk in iter_chunks(rows, chunk_size):
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_score_chunk_in_worker, chunk, explain))
+        while pending:
+            yield pending.popleft().result()
+
+
+# --- Penulis Output (Inkremental) ---
+class CsvResultWriter:
+    def __init__(self, f, fields=OUTPUT_FIELDS):
+        self.writer = csv.DictWriter(f, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, results):
+        self.writer.writerows(results)
+
+
+class JsonlResultWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, results):
+        self.f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+
+
+def open_writer(f, fmt, fields=OUTPUT_FIELDS):
+    return JsonlResultWriter(f) if fmt == "jsonl" else CsvResultWriter(f, fields)
+
+
+def run(rows, out, engine, chunk_size=DEFAULT_CHUNK_SIZE, out_format="csv", workers=1,
+        bundle_path=None, explain=0):
+    """Menjalankan skoring streaming dan mengembalikan (jumlah_baris, detik).
+
+    Jika `workers` > 1, `engine` tidak dipakai; tiap worker memuat model sendiri.
+    """
+    writer = open_writer(out, out_format, OUTPUT_FIELDS + EXPLAIN_FIELDS if explain else OUTPUT_FIELDS)
+    total = 0
+    start = time.perf_counter()
+    if workers > 1:
+        stream = score_stream_parallel(rows, chunk_size, workers, bundle_path=bundle_path, explain=explain)
+    else:
+        stream = score_stream(engine, rows, chunk_size, explain)
+    for results in stream:
+        writer.write(results)
+        out.flush()  # Tulis hasil secepatnya agar memori tidak menumpuk
+        total += len(results)
+    return total, time.perf_counter() - start
+
+
+def build_rows(args):
+    """Membuat iterator baris input sesuai argumen CLI."""
+    fmt = detect_format(args.input, args.input_format)
+    if fmt == "jsonl":
+        return iter_jsonl_rows(args.input, args.text_field, args.label_field)
+    if fmt == "sqlite":
+        return iter_sqlite_rows(args.input, args.chunk_size)
+    return iter_csv_rows(args.input, args.text_column, args.label_column,
+                         skip_header=not args.no_header)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Skoring sentimen batch untuk file CSV/JSONL.")
+    parser.add_argument("input", help="File input (.csv, .jsonl, atau database .db dengan tabel status)")
+    parser.add_argument("-o", "--output", default="-", help="File output (default: stdout)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl", "sqlite"], help="Paksa format input")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="Paksa format output")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Jumlah baris per chunk (default: %(default)s)")
+    parser.add_argument("--text-column", type=int, default=3,
+                        help="Nomor kolom teks status pada CSV, mulai dari 1 (default: %(default)s)")
+    parser.add_argument("--label-column", type=int, default=4,
+                        help="Nomor kolom label asli pada CSV, 0 jika tidak ada (default: %(default)s)")
+    parser.add_argument("--no-header", action="store_true", help="CSV tidak memiliki baris header")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses worker; >1 mengaktifkan mode multi-proses (default: %(default)s)")
+    parser.add_argument("--bundle", default=None,
+                        help="Muat model dari bundle memory-map (lihat model_bundle.py) alih-alih file .pkl")
+    parser.add_argument("--jelaskan", type=int, default=0, metavar="K",
+                        help="Tambahkan K token teratas yang mendorong/menahan label prediksi")
+    parser.add_argument("--text-field", default="text", help="Nama field teks pada JSONL")
+    parser.add_argument("--label-field", default="label", help="Nama field label asli pada JSONL")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chunk_size < 1:
+        raise SystemExit("--chunk-size harus >= 1")
+    if args.workers < 1:
+        raise SystemExit("--workers harus >= 1")
+    if args.jelaskan < 0:
+        raise SystemExit("--jelaskan harus >= 0")
+    out_format = args.output_format or ("csv" if args.output == "-" else detect_format(args.output))
+    # Pada mode multi-proses model dimuat di masing-masing worker, bukan di proses utama
+    engine = load_engine(args.bundle) if args.workers == 1 else None
+    rows = build_rows(args)
+    if args.output == "-":
+        total, elapsed = run(rows, sys.stdout, engine, args.chunk_size, out_format, args.workers, args.bundle,
+                             args.jelaskan)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            total, elapsed = run(rows, out, engine, args.chunk_size, out_format, args.workers, args.bundle,
+                                 args.jelaskan)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Selesai: {total} baris dalam {elapsed:.2f} detik ({rate:,.0f} baris/detik)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Benchmark jalur inferensi: cold start, latensi satu teks, throughput batch, memori.
+
+Korpus diambil dari `sentimen_status.csv` lalu direplikasi ke ukuran yang
+diminta (default 10k/100k/1M baris). Hasil ditulis sebagai JSON agar bisa
+dibandingkan antar-run; dengan `--compare` skrip keluar dengan kode 1 jika ada
+metrik yang memburuk melebihi ambang batas.
+
+Contoh:
+    python benchmark.py -o baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.1
+    python benchmark.py --sizes 10000 --batch-sizes 1,64 --quick
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from batch_score import iter_csv_rows
+from sentiment_engine import BASE_DIR, SentimentEngine
+
+DEFAULT_CSV = os.path.join(BASE_DIR, "sentimen_status.csv")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BATCH_SIZES = (1, 32, 256, 1024, 4096)
+
+# Akhiran nama metrik yang makin besar makin baik (selain itu makin kecil makin baik)
+HIGHER_IS_BETTER = ("rows_per_s",)
+
+_COLD_LOAD_SNIPPET = """
+import time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+from sentiment_engine import load_artifacts
+load_artifacts()
+print(time.perf_counter() - start)
+"""
+
+
+def load_corpus(path=DEFAULT_CSV):
+    return [text for text, _ in iter_csv_rows(path) if text.strip()]
+
+
+def replicated(texts, n_rows):
+    """Iterator `n_rows` teks hasil replikasi korpus (tanpa menyalin ke memori)."""
+    return itertools.islice(itertools.cycle(texts), n_rows)
+
+
+def summarize(samples):
+    """Persentil latensi dalam mikrodetik."""
+    arr = np.asarray(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(arr, 50)), 2),
+        "p90_us": round(float(np.percentile(arr, 90)), 2),
+        "p99_us": round(float(np.percentile(arr, 99)), 2),
+        "mean_us": round(float(arr.mean()), 2),
+    }
+
+
+def bench_cold_load(repeats):
+    """Waktu `load_artifacts()` (dipakai `load_nlp_resources()`) di proses Python baru."""
+    env = dict(os.environ, PYTHONPATH=BASE_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    timings = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _COLD_LOAD_SNIPPET], capture_output=True,
+                             text=True, check=True, env=env, cwd=BASE_DIR)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"min_s": round(min(timings), 4), "median_s": round(float(np.median(timings)), 4)}
+
+
+def bench_single(engine, texts, n):
+    """Latensi satu teks untuk rantai sklearn (seperti di `show_input_page()`) dan fast path."""
+    model, tfidf, label_encoder = engine.model, engine.tfidf, engine.label_encoder
+    sample = list(replicated(texts, n))
+    results = {}
+
+    timings = []
+    for text in sample:
+        start = time.perf_counter()
+        label_encoder.inverse_transform(model.predict(tfidf.transform([text])))[0]
+        timings.append(time.perf_counter() - start)
+    results["sklearn_chain"] = summarize(timings)
+
+    if engine.fast_scorer is not None:
+        timings = []
+        predict = engine.fast_scorer.predict
+        for text in sample:
+            start = time.perf_counter()
+            predict(text)
+            timings.append(time.perf_counter() - start)
+        results["fast_scorer"] = summarize(timings)
+    return results
+
+
+def bench_batch(engine, texts, sizes, batch_sizes, max_seconds):
+    """Throughput `predict_with_confidence_batch` per ukuran korpus dan ukuran batch."""
+    results = {}
+    for n_rows in sizes:
+        per_size = {}
+        for batch_size in batch_sizes:
+            rows = replicated(texts, n_rows)
+            done = 0
+            start = time.perf_counter()
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                engine.predict_with_confidence_batch(batch)
+                done += len(batch)
+                if time.perf_counter() - start > max_seconds:
+                    break  # Batasi durasi untuk batch kecil pada korpus besar
+            elapsed = time.perf_counter() - start
+            per_size[str(batch_size)] = {"rows": done, "seconds": round(elapsed, 4),
+                                         "rows_per_s": round(done / elapsed, 1)}
+        results[str(n_rows)] = per_size
+    return results
+
+
+def peak_rss_kb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam byte di macOS, kilobyte di Linux
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def run_benchmark(args):
+    texts = load_corpus(args.csv)
+    engine = SentimentEngine.from_files()
+    rss_after_load = peak_rss_kb()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_rows": len(texts),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "cold_load": bench_cold_load(args.cold_repeats),
+        "single": bench_single(engine, texts, args.single_samples),
+        "batch": bench_batch(engine, texts, args.sizes, args.batch_sizes, args.max_seconds),
+        "memory": {"peak_rss_after_load_kb": rss_after_load, "peak_rss_kb": peak_rss_kb()},
+    }
+    return report
+
+
+# --- Perbandingan Regresi ---
+def flatten(report, prefix=""):
+    """Meratakan metrik numerik menjadi {"path.ke.metrik": nilai}; bagian meta diabaikan."""
+    flat = {}
+    for key, value in report.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not key.endswith(("rows", "seconds")):
+            flat[path] = value
+    return flat
+
+
+def compare(current, baseline, threshold):
+    """Daftar (metrik, baseline, sekarang, perubahan) yang memburuk melebihi `threshold`."""
+    now, before = flatten(current), flatten(baseline)
+    regressions = []
+    for path, old in before.items():
+        new = now.get(path)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if path.endswith(HIGHER_IS_BETTER) else change
+        if worse > threshold:
+            regressions.append((path, old, new, change))
+    return regressions
+
+
+def _int_list(value):
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur inferensi sentimen.")
+    parser.add_argument("-o", "--output", default="-", help="File JSON hasil (default: stdout)")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Korpus sumber")
+    parser.add_argument("--sizes", type=_int_list, default=None,
+                        help="Ukuran korpus replikasi, dipisah koma (default: 10000,100000,1000000)")
+    parser.add_argument("--batch-sizes", type=_int_list, default=DEFAULT_BATCH_SIZES,
+                        help="Ukuran batch, dipisah koma (default: 1,32,256,1024,4096)")
+    parser.add_argument("--single-samples", type=int, default=2000, help="Jumlah sampel latensi satu teks")
+    parser.add_argument("--cold-repeats", type=int, default=3, help="Pengulangan cold load")
+    parser.add_argument("--max-seconds", type=float, default=30.0,
+                        help="Batas durasi per kombinasi ukuran/batch (default: %(default)s)")
+    parser.add_argument("--quick", action="store_true", help="Mode cepat untuk pengecekan lokal")
+    parser.add_argument("--compare", default=None, help="JSON baseline untuk deteksi regresi")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Ambang regresi relatif, mis. 0.1 = 10%% (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.sizes is None:
+        args.sizes = (10_000,) if args.quick else DEFAULT_SIZES
+    if args.quick:
+        args.single_samples = min(args.single_samples, 300)
+        args.cold_repeats = 1
+        args.max_seconds = min(args.max_seconds, 3.0)
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for path, old, new, change in regressions:
+            print(f"REGRESI {path}: {old} -> {new} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"Tidak ada regresi di atas {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Skorer cepat tanpa matriks sparse untuk prediksi satu teks.
+
+Untuk MultinomialNB, skor kelas c adalah
+    log_prior[c] + sum_j tfidf_j * feature_log_prob[c, j]
+sehingga satu status pendek bisa diskor langsung dari dict kosakata tanpa
+membangun matriks CSR lewat `tfidf.transform` dan tanpa dispatch
+`model.predict`. Urutan penjumlahan mengikuti sklearn (per indeks fitur)
+agar hasilnya identik.
+
+Verifikasi paritas dengan sklearn atas sentimen_status.csv:
+    python fast_scorer.py --verifikasi
+"""
+import argparse
+import math
+import os
+import sys
+from collections import Counter
+
+
+class FastScorer:
+    """Skorer MultinomialNB + TF-IDF murni Python untuk satu teks."""
+
+    def __init__(self, analyzer, term_weights, class_log_prior, classes,
+                 norm="l2", sublinear_tf=False, binary=False):
+        self.analyzer = analyzer
+        # term -> (indeks fitur, idf, tuple feature_log_prob per kelas); cukup objek dengan .get()
+        self.term_weights = term_weights
+        self.class_log_prior = tuple(float(p) for p in class_log_prior)
+        self.classes = list(classes)
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.n_classes = len(self.class_log_prior)
+
+    @classmethod
+    def from_artifacts(cls, model, tfidf, classes):
+        """Membangun skorer dari model MultinomialNB dan TfidfVectorizer yang sudah dilatih.
+
+        Melempar ValueError jika artefak tidak didukung.
+        """
+        for attr in ("feature_log_prob_", "class_log_prior_"):
+            if not hasattr(model, attr):
+                raise ValueError(f"Model tidak memiliki atribut {attr}; fast path hanya untuk MultinomialNB")
+        if not hasattr(tfidf, "vocabulary_"):
+            raise ValueError("Vectorizer belum dilatih (vocabulary_ tidak ada)")
+        use_idf = getattr(tfidf, "use_idf", False)
+        idf = tfidf.idf_ if use_idf else None
+        flp_columns = model.feature_log_prob_.T.tolist()
+        term_weights = {}
+        for term, j in tfidf.vocabulary_.items():
+            term_weights[term] = (int(j), float(idf[j]) if idf is not None else 1.0, tuple(flp_columns[j]))
+        return cls(
+            tfidf.build_analyzer(),
+            term_weights,
+            model.class_log_prior_,
+            classes,
+            norm=getattr(tfidf, "norm", None),
+            sublinear_tf=getattr(tfidf, "sublinear_tf", False),
+            binary=getattr(tfidf, "binary", False),
+        )
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Membangun skorer di atas ModelBundle tanpa menyalin kosakata ke dict."""
+        from model_bundle import BundleTermLookup
+
+        config = bundle.config
+        return cls(
+            bundle.build_analyzer(),
+            BundleTermLookup(bundle),
+            bundle.class_log_prior.tolist(),
+            bundle.classes,
+            norm=config["norm"],
+            sublinear_tf=config["sublinear_tf"],
+            binary=config["binary"],
+        )
+
+    def features(self, text):
+        """Fitur TF-IDF teks sebagai list (indeks, bobot, flp) terurut indeks fitur."""
+        counts = Counter(self.analyzer(text))
+        lookup = self.term_weights
+        entries = []
+        for term, count in counts.items():
+            weight = lookup.get(term)
+            if weight is not None:
+                entries.append((weight[0], count, weight[1], weight[2]))
+        entries.sort()
+        features = []
+        for j, count, idf, flp in entries:
+            if self.binary:
+                tf = 1.0
+            elif self.sublinear_tf:
+                tf = math.log(count) + 1.0
+            else:
+                tf = float(count)
+            features.append([j, tf * idf, flp])
+        if self.norm == "l2":
+            total = 0.0
+            for f in features:
+                total += f[1] * f[1]
+            scale = math.sqrt(total)
+        elif self.norm == "l1":
+            scale = 0.0
+            for f in features:
+                scale += abs(f[1])
+        else:
+            scale = 0.0
+        if scale > 0.0:
+            for f in features:
+                f[1] = f[1] / scale
+        return features
+
+    def joint_log_likelihood(self, text):
+        """Skor log-likelihood gabungan per kelas (sama dengan `_joint_log_likelihood` sklearn)."""
+        return self.score_features(self.features(text))
+
+    def score_features(self, features):
+        """Log-likelihood gabungan dari hasil `features` (dipakai ulang untuk penjelasan token)."""
+        scores = [0.0] * self.n_classes
+        for _, value, flp in features:
+            for c in range(self.n_classes):
+                scores[c] += value * flp[c]
+        return [s + p for s, p in zip(scores, self.class_log_prior)]
+
+    def predict_proba(self, text):
+        """Probabilitas per kelas (softmax dari log-likelihood)."""
+        jll = self.joint_log_likelihood(text)
+        top = max(jll)
+        log_norm = top + math.log(sum(math.exp(s - top) for s in jll))
+        return [math.exp(s - log_norm) for s in jll]
+
+    def predict(self, text):
+        """Label sentimen untuk satu teks."""
+        jll = self.joint_log_likelihood(text)
+        # Argmax dengan aturan seri yang sama dengan numpy (indeks pertama menang)
+        best = 0
+        for c in range(1, self.n_classes):
+            if jll[c] > jll[best]:
+                best = c
+        return self.classes[best]
+
+
+def verify_parity(scorer, engine, texts, atol=1e-12):
+    """Membandingkan FastScorer dengan jalur sklearn; mengembalikan daftar ketidaksesuaian."""
+    texts = list(texts)
+    labels = engine.predict_batch(texts)
+    proba = engine.predict_proba_batch(texts)
+    mismatches = []
+    for i, text in enumerate(texts):
+        fast_label = scorer.predict(text)
+        fast_proba = scorer.predict_proba(text)
+        max_diff = max(abs(a - b) for a, b in zip(fast_proba, proba[i]))
+        if fast_label != labels[i] or max_diff > atol:
+            mismatches.append((text, labels[i], fast_label, max_diff))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Utilitas FastScorer.")
+    parser.add_argument("--verifikasi", action="store_true",
+                        help="Cek paritas FastScorer dengan sklearn atas file CSV")
+    parser.add_argument("--csv", default=None, help="File CSV korpus (default: sentimen_status.csv)")
+    args = parser.parse_args(argv)
+    if not args.verifikasi:
+        parser.print_help()
+        return
+
+    from batch_score import iter_csv_rows
+    from sentiment_engine import BASE_DIR, SentimentEngine
+
+    engine = SentimentEngine.from_files()
+    scorer = FastScorer.from_artifacts(engine.model, engine.tfidf, engine.classes)
+    path = args.csv or os.path.join(BASE_DIR, "sentimen_status.csv")
+    texts = [text for text, _ in iter_csv_rows(path)]
+    mismatches = verify_parity(scorer, engine, texts)
+    for text, expected, got, diff in mismatches[:20]:
+        print(f"TIDAK SESUAI: {text!r}: sklearn={expected} fast={got} selisih_proba={diff:.3g}")
+    print(f"{len(texts) - len(mismatches)}/{len(texts)} teks identik dengan sklearn")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Ekspor riwayat analisis (tabel `status`) ke Excel atau CSV dengan memori tetap.
+
+Baris dibaca dari sentimen.db lewat cursor yang di-`fetchmany` per batch
+(SQLite menelusuri indeks secara bertahap, tanpa memuat seluruh hasil) lalu
+langsung ditulis:
+
+- `xlsx`: openpyxl mode write-only; baris ditulis ke XML sementara dan
+  dikemas saat disimpan, tanpa membangun DataFrame atau workbook di memori.
+  Lebih dari batas baris Excel otomatis berlanjut ke sheet berikutnya.
+- `csv`: ditulis per batch dan di-flush, sehingga ekspor ke stdout atau
+  respons HTTP bisa diterima secara bertahap.
+
+Filter: pengguna, rentang `tanggal_status` (inklusif), dan label. Query
+memakai indeks `idx_status_user_tanggal` / `idx_status_tanggal`
+(persistence.py) sehingga urutan tanggal tidak butuh sort sementara.
+
+Contoh:
+    python history_export.py -o riwayat.xlsx --user andi --dari 2025-01-01 --sampai 2025-06-30
+    python history_export.py --format csv --label NEGATIF > negatif.csv   # semua pengguna
+"""
+import argparse
+import csv
+import datetime
+import io
+import sys
+
+from persistence import decode_confidence
+
+DEFAULT_FETCH_SIZE = 1000
+FORMATS = ("xlsx", "csv")
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+LABELS = ("POSITIF", "NETRAL", "NEGATIF")
+
+COLUMNS = ("id_status", "tanggal_status", "id_user", "isi_status", "label_sentimen", "kepercayaan")
+HEADERS = ("ID", "Tanggal", "Pengguna", "Status", "Sentimen", "Kepercayaan (%)")
+SHEET_TITLE = "Riwayat"
+EXCEL_MAX_ROWS = 1048576  # Termasuk baris header
+
+
+# --- Query ---
+def build_query(id_user=None, start=None, end=None, labels=None):
+    """(sql, params) untuk riwayat terfilter, urut tanggal.
+
+    Hanya diurutkan menurut tanggal (urutan indeks); menambah `id_status` ke
+    ORDER BY memaksa sort sementara per tanggal karena kolom label dan
+    kepercayaan berada di antara tanggal dan rowid di dalam indeks.
+    """
+    clauses, params = [], []
+    if id_user is not None:
+        clauses.append("id_user = ?")
+        params.append(id_user)
+    if start is not None:
+        clauses.append("tanggal_status >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append("tanggal_status <= ?")
+        params.append(str(end))
+    if labels:
+        labels = [str(label).upper() for label in labels]
+        clauses.append(f"label_sentimen IN ({','.join('?' * len(labels))})")
+        params.extend(labels)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT {', '.join(COLUMNS)} FROM status{where} ORDER BY tanggal_status", params
+
+
+def iter_rows(conn, id_user=None, start=None, end=None, labels=None, fetch_size=DEFAULT_FETCH_SIZE):
+    """Baris riwayat sebagai tuple (urutan COLUMNS), dibaca per `fetch_size`."""
+    sql, params = build_query(id_user, start, end, labels)
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield row[:-1] + (decode_confidence(row[-1]),)
+    finally:
+        cursor.close()
+
+
+# --- Penulis ---
+def write_csv(rows, f, fetch_size=DEFAULT_FETCH_SIZE):
+    """Menulis CSV ke file teks `f`, flush setiap `fetch_size` baris; mengembalikan jumlah baris."""
+    writer = csv.writer(f)
+    writer.writerow(HEADERS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % fetch_size == 0:
+            f.flush()
+    f.flush()
+    return count
+
+
+def _excel_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def write_xlsx(rows, f):
+    """Menulis workbook write-only ke path atau file biner `f`; mengembalikan jumlah baris."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    count = 0
+    sheet_rows = EXCEL_MAX_ROWS
+    for id_status, tanggal, id_user, isi, label, kepercayaan in rows:
+        if sheet_rows >= EXCEL_MAX_ROWS:
+            index = len(workbook.worksheets) + 1
+            sheet = workbook.create_sheet(SHEET_TITLE if index == 1 else f"{SHEET_TITLE} {index}")
+            sheet.append(HEADERS)
+            sheet_rows = 1
+        if isi is not None:
+            isi = ILLEGAL_CHARACTERS_RE.sub("", isi)  # Karakter kontrol tidak boleh ada di XML
+        sheet.append((id_status, _excel_date(tanggal), id_user, isi, label, kepercayaan))
+        sheet_rows += 1
+        count += 1
+    if sheet is None:
+        workbook.create_sheet(SHEET_TITLE).append(HEADERS)
+    workbook.save(f)
+    return count
+
+
+def export(conn, f, fmt="xlsx", id_user=None, start=None, end=None, labels=None,
+           fetch_size=DEFAULT_FETCH_SIZE):
+    """Mengekspor riwayat terfilter ke `f` (file biner atau path); mengembalikan jumlah baris."""
+    rows = iter_rows(conn, id_user, start, end, labels, fetch_size)
+    if fmt == "xlsx":
+        return write_xlsx(rows, f)
+    if fmt != "csv":
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt!r}")
+    if isinstance(f, str):
+        with open(f, "w", encoding="utf-8-sig", newline="") as text:
+            return write_csv(rows, text, fetch_size)
+    text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="", write_through=True)
+    try:
+        return write_csv(rows, text, fetch_size)
+    finally:
+        text.detach()  # `f` tetap terbuka untuk pemanggil
+
+
+def file_name(fmt, id_user=None, start=None, end=None):
+    parts = ["riwayat-sentimen", id_user or "semua"]
+    if start or end:
+        parts.append(f"{start or 'awal'}_{end or 'akhir'}")
+    return "-".join(str(p) for p in parts) + f".{fmt}"
+
+
+def main(argv=None):
+    from persistence import get_pool, get_writer
+
+    parser = argparse.ArgumentParser(description="Ekspor riwayat analisis sentimen ke Excel/CSV.")
+    parser.add_argument("-o", "--output", default=None,
+                        help="File keluaran (default: stdout untuk csv, nama otomatis untuk xlsx)")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Format keluaran (default: dari ekstensi --output, atau xlsx)")
+    parser.add_argument("--user", default=None, help="Hanya riwayat pengguna ini (default: semua pengguna)")
+    parser.add_argument("--dari", type=datetime.date.fromisoformat, default=None, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--sampai", type=datetime.date.fromisoformat, default=None, help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument("--label", action="append", choices=LABELS, default=None,
+                        help="Filter label (bisa diulang)")
+    parser.add_argument("--fetch-size", type=int, default=DEFAULT_FETCH_SIZE, help="Baris per fetch dari database")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "xlsx")
+    output = args.output
+    if output is None and fmt == "xlsx":
+        output = file_name(fmt, args.user, args.dari, args.sampai)
+    get_writer().flush()  # Status yang masih di buffer ikut terekspor
+    with get_pool().connection() as conn:
+        if output is None:
+            count = export(conn, sys.stdout.buffer, fmt, args.user, args.dari, args.sampai, args.label,
+                           args.fetch_size)
+        else:
+            count = export(conn, output, fmt, args.user, args.dari, args.sampai, args.label, args.fetch_size)
+    print(f"{count} baris diekspor{f' ke {output}' if output else ''}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
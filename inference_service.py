@@ -0,0 +1,289 @@
+"""Layanan inferensi lokal berbasis asyncio dengan micro-batching.
+
+Permintaan yang datang bersamaan dikumpulkan ke dalam micro-batch yang
+di-flush ketika mencapai ukuran maksimum atau waktu tunggu maksimum, lalu
+diskor dengan satu kali `tfidf.transform` + `predict_proba`. Overhead Python
+per permintaan pun teramortisasi.
+
+Endpoint HTTP (TCP atau Unix socket):
+    POST /predict   {"text": "..."} atau {"texts": ["...", ...]}
+    GET  /metrics   kedalaman antrean, histogram ukuran batch, persentil latensi,
+                    dan histogram per tahap (?format=prometheus untuk format teks)
+    GET  /health
+
+Contoh:
+    python inference_service.py --port 8600 --max-batch 64 --max-wait-ms 5
+    python inference_service.py --unix /tmp/sentimen.sock --bundle models/sentimen-v1.bundle
+"""
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from batch_score import load_engine
+from shared_model import active_registry
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1 << 20
+LATENCY_WINDOW = 10000  # Jumlah sampel latensi terakhir untuk persentil
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ServiceStats:
+    """Statistik layanan: histogram ukuran batch dan jendela latensi terakhir."""
+
+    def __init__(self, max_batch):
+        self.batch_buckets = []
+        size = 1
+        while size < max_batch:
+            self.batch_buckets.append(size)
+            size *= 2
+        self.batch_buckets.append(max_batch)
+        self.batch_counts = [0] * len(self.batch_buckets)
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.batches = 0
+
+    def record_batch(self, size):
+        self.batches += 1
+        for i, upper in enumerate(self.batch_buckets):
+            if size <= upper:
+                self.batch_counts[i] += 1
+                break
+
+    def record_latency(self, seconds):
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def percentiles(self, quantiles=(0.5, 0.9, 0.99)):
+        if not self.latencies:
+            return {f"p{int(q * 100)}_ms": None for q in quantiles}
+        ordered = sorted(self.latencies)
+        last = len(ordered) - 1
+        return {f"p{int(q * 100)}_ms": round(ordered[min(last, int(q * len(ordered)))] * 1000, 3)
+                for q in quantiles}
+
+
+class MicroBatcher:
+    """Mengumpulkan teks dari banyak coroutine lalu menskornya per batch."""
+
+    def __init__(self, get_engine, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.get_engine = get_engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.stats = ServiceStats(max_batch)
+        # Satu thread skoring: event loop tetap bebas menerima koneksi selama batch dihitung
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="skoring")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, text):
+        """Mengantrekan satu teks dan menunggu Prediction-nya (label, kepercayaan, margin, ...)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        first = await self.queue.get()
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _, _ in batch]
+            engine = self.get_engine()
+            try:
+                predictions = await loop.run_in_executor(self._executor, engine.analyze_batch, texts)
+            except Exception as e:  # Kegagalan batch diteruskan ke setiap peminta
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch))
+            now = time.perf_counter()
+            for (_, future, started), prediction in zip(batch, predictions):
+                self.stats.record_latency(now - started)
+                metrics.observe("service.request", now - started)
+                if not future.done():
+                    future.set_result(prediction)
+
+    def metrics(self):
+        stats = self.stats
+        return {
+            "queue_depth": self.queue.qsize(),
+            "requests": stats.requests,
+            "batches": stats.batches,
+            "mean_batch_size": round(stats.requests / stats.batches, 3) if stats.batches else 0.0,
+            "batch_size_histogram": {f"le_{b}": c for b, c in zip(stats.batch_buckets, stats.batch_counts)},
+            "latency": stats.percentiles(),
+        }
+
+
+# --- Server HTTP Minimal ---
+def _response(status, payload, keep_alive=True):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+def _prediction_payload(prediction):
+    return {"label": prediction.label, "kepercayaan": prediction.confidence, "margin": prediction.margin,
+            "perlu_tinjauan": prediction.low_confidence}
+
+
+class InferenceService:
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    async def handle_predict(self, body):
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "Body harus berupa JSON"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Body harus berupa objek JSON"}
+        if isinstance(payload.get("texts"), list):
+            if not all(isinstance(t, str) for t in payload["texts"]):
+                return 400, {"error": "Setiap elemen 'texts' harus berupa string"}
+            results = await asyncio.gather(*(self.batcher.predict(t) for t in payload["texts"]))
+            return 200, {"results": [_prediction_payload(p) for p in results]}
+        if "text" in payload:
+            if not isinstance(payload["text"], str):
+                return 400, {"error": "Field 'text' harus berupa string"}
+            return 200, _prediction_payload(await self.batcher.predict(payload["text"]))
+        return 400, {"error": "Field 'text' atau 'texts' wajib diisi"}
+
+    async def route(self, method, path, body):
+        path, _, query = path.partition("?")
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "Gunakan POST"}
+            return await self.handle_predict(body)
+        if path == "/metrics" and method == "GET":
+            if "format=prometheus" in query:
+                return 200, metrics.REGISTRY.render_text()
+            return 200, dict(self.batcher.metrics(), stages=metrics.REGISTRY.snapshot())
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok"}
+        return 404, {"error": "Tidak ditemukan"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    writer.write(_response(400, {"error": "Request line tidak valid"}, keep_alive=False))
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(_response(400, {"error": "Content-Length tidak valid"}, keep_alive=False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, {"error": "Body terlalu besar"}, keep_alive=False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = await self.route(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8600, unix_path=None, bundle_path=None,
+                max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    registry = active_registry()
+    if registry is not None:
+        get_engine = registry.current_engine
+    else:
+        engine = load_engine(bundle_path)
+        get_engine = lambda: engine  # noqa: E731
+    batcher = MicroBatcher(get_engine, max_batch, max_wait_ms)
+    batcher.start()
+    service = InferenceService(batcher)
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        where = f"http://{host}:{port}"
+    print(f"Layanan inferensi berjalan di {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan inferensi sentimen dengan micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--unix", default=None, help="Path Unix socket (menggantikan host/port)")
+    parser.add_argument("--bundle", default=None, help="Muat model dari bundle memory-map")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="Ukuran maksimum micro-batch (default: %(default)s)")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Waktu tunggu maksimum sebelum batch di-flush (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.bundle, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
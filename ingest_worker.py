@@ -0,0 +1,247 @@
+"""Worker ingest yang mengikuti (tail) file JSONL sebagai antrean append-only.
+
+Setiap baris JSONL berisi satu status, mis.
+    {"text": "capek bgt", "id_user": "siti", "tanggal": "2025-07-01"}
+(field teks juga boleh bernama `isi_status`). Worker membaca baris baru
+secara massal, menskornya per batch dengan artefak TF-IDF + NB, lalu menulis
+hasil ke tabel `status` dan memajukan offset byte checkpoint di dalam SATU
+transaksi per batch. Setelah restart, pembacaan dilanjutkan dari offset yang
+tersimpan sehingga tidak ada baris yang hilang atau terduplikasi.
+
+Contoh:
+    python ingest_worker.py --file requests.jsonl
+    python ingest_worker.py --file requests.jsonl --once   # proses yang ada lalu keluar
+    python ingest_worker.py --file requests.jsonl --lag    # tampilkan ketertinggalan saja
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+from batch_score import load_engine
+from persistence import get_pool, insert_status_rows, status_row, transaction
+from sentiment_engine import BASE_DIR
+
+DEFAULT_FILE = os.path.join(BASE_DIR, "requests.jsonl")
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_READ_BYTES = 4 << 20
+DEFAULT_POLL_INTERVAL = 1.0
+
+CHECKPOINT_SCHEMA = """CREATE TABLE IF NOT EXISTS ingest_checkpoint (
+        sumber TEXT PRIMARY KEY,
+        inode INTEGER,
+        offset_byte INTEGER NOT NULL,
+        baris INTEGER NOT NULL,
+        diperbarui TEXT
+    )"""
+
+
+def ensure_schema(conn):
+    conn.execute(CHECKPOINT_SCHEMA)
+
+
+def load_checkpoint(conn, source):
+    """(inode, offset_byte, baris) terakhir yang sudah di-commit untuk `source`."""
+    row = conn.execute("SELECT inode, offset_byte, baris FROM ingest_checkpoint WHERE sumber = ?",
+                       (source,)).fetchone()
+    return row if row else (None, 0, 0)
+
+
+def save_checkpoint(conn, source, inode, offset, rows):
+    conn.execute(
+        """INSERT INTO ingest_checkpoint (sumber, inode, offset_byte, baris, diperbarui)
+           VALUES (?, ?, ?, ?, datetime('now'))
+           ON CONFLICT (sumber) DO UPDATE SET inode = excluded.inode, offset_byte = excluded.offset_byte,
+               baris = excluded.baris, diperbarui = excluded.diperbarui""",
+        (source, inode, offset, rows),
+    )
+
+
+def read_complete_lines(path, offset, max_bytes):
+    """Membaca baris utuh mulai `offset`; baris terakhir tanpa newline ditunda.
+
+    Mengembalikan (list baris dalam bytes, offset baru).
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(max_bytes)
+    end = data.rfind(b"\n")
+    if end < 0:
+        if len(data) == max_bytes:
+            raise ValueError(f"Satu baris di offset {offset} melebihi {max_bytes} byte")
+        return [], offset
+    return data[:end].split(b"\n"), offset + end + 1
+
+
+def _parse_date(value):
+    """Tanggal ISO (YYYY-MM-DD) sebagai string, None jika kosong; ValueError jika tidak valid."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"tanggal harus string, bukan {type(value).__name__}")
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+def parse_line(line):
+    """Mengurai satu baris JSONL menjadi (teks, id_user, tanggal) atau None jika tidak valid.
+
+    `id_user` harus string atau null dan `tanggal` tanggal ISO; nilai lain membuat
+    baris dilewati agar tidak menggagalkan transaksi batch (dan checkpoint) di SQLite.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    text = record.get("text", record.get("isi_status"))
+    if not isinstance(text, str) or not text.strip():
+        return None
+    id_user = record.get("id_user")
+    if id_user is not None and not isinstance(id_user, str):
+        return None
+    try:
+        tanggal = _parse_date(record.get("tanggal") or record.get("tanggal_status"))
+    except ValueError:
+        return None
+    return text, id_user, tanggal
+
+
+def count_lag(path, offset, chunk_size=1 << 20):
+    """Ketertinggalan (byte, baris) antara offset checkpoint dan akhir file."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0, 0
+    if size <= offset:
+        return 0, 0
+    lines = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+    return size - offset, lines
+
+
+class IngestWorker:
+    def __init__(self, path, engine, pool, batch_size=DEFAULT_BATCH_SIZE,
+                 read_bytes=DEFAULT_READ_BYTES, log=sys.stderr):
+        self.path = path
+        self.source = os.path.abspath(path)
+        self.engine = engine
+        self.pool = pool
+        self.batch_size = batch_size
+        self.read_bytes = read_bytes
+        self.log = log
+        self.skipped = 0
+        with pool.connection() as conn:
+            ensure_schema(conn)
+
+    def _position(self, conn):
+        """(inode, offset baca, total baris, offset tersimpan) untuk pembacaan berikutnya.
+
+        Offset baca kembali ke 0 jika file dirotasi atau dipotong.
+        """
+        inode, committed, rows = load_checkpoint(conn, self.source)
+        st = os.stat(self.path)
+        if (inode is not None and inode != st.st_ino) or st.st_size < committed:
+            print(f"File {self.path} dirotasi/dipotong; membaca ulang dari awal", file=self.log)
+            return st.st_ino, 0, rows, committed
+        return st.st_ino, committed, rows, committed
+
+    def poll(self):
+        """Memproses semua baris utuh yang tersedia; mengembalikan jumlah baris yang disimpan."""
+        if not os.path.exists(self.path):
+            return 0
+        stored = 0
+        while True:
+            with self.pool.connection() as conn:
+                inode, offset, total_rows, committed = self._position(conn)
+            lines, new_offset = read_complete_lines(self.path, offset, self.read_bytes)
+            if not lines:
+                return stored
+            records = []
+            skipped = 0  # Ditambahkan ke self.skipped setelah commit agar percobaan ulang tidak menghitung dua kali
+            for line in lines:
+                parsed = parse_line(line)
+                if parsed is None:
+                    skipped += 1
+                else:
+                    records.append(parsed)
+            # Skor di luar transaksi agar lock tulis SQLite dipegang sesingkat mungkin
+            rows = []
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start:start + self.batch_size]
+                labels, confidence = self.engine.predict_with_confidence_batch([r[0] for r in batch])
+                rows.extend(status_row(text, label, conf, id_user, tanggal, self.engine.version)
+                            for (text, id_user, tanggal), label, conf in zip(batch, labels, confidence))
+            with self.pool.connection() as conn, transaction(conn):
+                # Cek ulang di dalam transaksi: worker lain mungkin sudah memproses rentang ini
+                if load_checkpoint(conn, self.source)[1] != committed:
+                    continue
+                if rows:
+                    insert_status_rows(conn, rows)
+                save_checkpoint(conn, self.source, inode, new_offset, total_rows + len(rows))
+            stored += len(rows)
+            self.skipped += skipped
+
+    def lag(self):
+        with self.pool.connection() as conn:
+            _, offset, rows = load_checkpoint(conn, self.source)
+        lag_bytes, lag_rows = count_lag(self.path, offset)
+        return {"offset": offset, "rows_ingested": rows, "lag_bytes": lag_bytes, "lag_rows": lag_rows}
+
+    def run_forever(self, poll_interval=DEFAULT_POLL_INTERVAL, report_every=30.0):
+        next_report = 0.0
+        while True:
+            stored = self.poll()
+            now = time.monotonic()
+            if stored or now >= next_report:
+                lag = self.lag()
+                print(f"Ingest: +{stored} baris, total {lag['rows_ingested']}, "
+                      f"tertinggal {lag['lag_bytes']} byte / {lag['lag_rows']} baris, "
+                      f"dilewati {self.skipped}", file=self.log)
+                next_report = now + report_every
+            if not stored:
+                time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest status dari file JSONL ke sentimen.db.")
+    parser.add_argument("--file", default=DEFAULT_FILE, help="File JSONL yang diikuti (default: requests.jsonl)")
+    parser.add_argument("--bundle", default=None, help="Muat model dari bundle memory-map")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="Proses baris yang ada lalu keluar")
+    parser.add_argument("--lag", action="store_true", help="Tampilkan ketertinggalan lalu keluar")
+    args = parser.parse_args(argv)
+
+    pool = get_pool()
+    if args.lag:
+        with pool.connection() as conn:
+            ensure_schema(conn)
+            _, offset, rows = load_checkpoint(conn, os.path.abspath(args.file))
+        lag_bytes, lag_rows = count_lag(args.file, offset)
+        print(json.dumps({"offset": offset, "rows_ingested": rows, "lag_bytes": lag_bytes, "lag_rows": lag_rows}))
+        return
+    worker = IngestWorker(args.file, load_engine(args.bundle), pool, args.batch_size)
+    if args.once:
+        stored = worker.poll()
+        print(f"Selesai: {stored} baris disimpan, {worker.skipped} baris dilewati", file=sys.stderr)
+        return
+    try:
+        worker.run_forever(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
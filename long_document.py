@@ -0,0 +1,137 @@
+"""Skoring dokumen panjang (jurnal harian) per kalimat / jendela token.
+
+Satu jurnal sering berisi perasaan campuran; di-vectorize sebagai satu
+dokumen, kalimat-kalimat itu saling meniadakan, dan biaya teks yang sangat
+panjang tidak terbatas. Mode dokumen panjang:
+
+1. memecah teks menjadi kalimat (akhiran `.`, `!`, `?`, atau baris baru);
+   kalimat yang lebih panjang dari `window` token dipotong menjadi jendela
+   geser (`stride` token per langkah);
+2. berhenti setelah `max_tokens` token (`SENTIMEN_LONG_DOC_MAX_TOKENS`), jadi
+   pemindaian, transform, dan skoring terbatas berapa pun panjang tempelannya
+   (`truncated` menandai sisa teks yang tidak dinilai);
+3. menilai semua segmen dengan satu `SentimentEngine.analyze_batch` (satu
+   `tfidf.transform` + satu perkalian matriks);
+4. label dokumen = rata-rata probabilitas segmen berbobot jumlah token baru
+   per segmen (token yang sudah tercakup jendela sebelumnya tidak dihitung
+   dua kali), dan setiap segmen menjadi satu titik di timeline sentimen.
+
+app.py memakai mode ini untuk teks dengan sedikitnya `min_tokens` token
+(`SENTIMEN_LONG_DOC_MIN_TOKENS`); status pendek tetap dinilai utuh.
+
+Contoh:
+    python long_document.py "Pagi ini senang sekali. Tapi sore aku capek dan kesal."
+    python long_document.py --file jurnal.txt --max-tokens 500
+"""
+import argparse
+import collections
+import itertools
+import os
+import re
+import sys
+
+import numpy as np
+
+DEFAULT_MAX_TOKENS = int(os.environ.get("SENTIMEN_LONG_DOC_MAX_TOKENS", 2000))
+DEFAULT_MIN_TOKENS = int(os.environ.get("SENTIMEN_LONG_DOC_MIN_TOKENS", 40))
+DEFAULT_WINDOW = 32
+DEFAULT_STRIDE = 24
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+_TOKEN_RE = re.compile(r"\w+")
+
+# `tokens` = jumlah token yang pertama kali dicakup segmen ini (bobot rata-rata dokumen)
+Segment = collections.namedtuple("Segment", ["start", "end", "text", "tokens", "prediction"])
+DocumentAnalysis = collections.namedtuple("DocumentAnalysis", ["prediction", "segments", "tokens", "truncated"])
+
+
+# --- Segmentasi ---
+def is_long(text, min_tokens=DEFAULT_MIN_TOKENS):
+    """True jika teks punya sedikitnya `min_tokens` token (pemindaian berhenti di sana)."""
+    return sum(1 for _ in itertools.islice(_TOKEN_RE.finditer(text), min_tokens)) >= min_tokens
+
+
+def split_segments(text, max_tokens=DEFAULT_MAX_TOKENS, window=DEFAULT_WINDOW, stride=DEFAULT_STRIDE):
+    """(segmen, jumlah_token, terpotong). Segmen = (start, end, jumlah_token_baru) dalam offset karakter `text`."""
+    if window < 1 or not 1 <= stride <= window:
+        raise ValueError("window harus >= 1 dan 1 <= stride <= window")
+    segments = []
+    budget = max_tokens
+    for sentence in _SENTENCE_RE.finditer(text):
+        if budget <= 0:
+            return segments, max_tokens, True
+        # Maksimal budget + 1 token dibaca: cukup untuk tahu apakah kalimat ini melewati batas
+        tokens = list(itertools.islice(_TOKEN_RE.finditer(text, sentence.start(), sentence.end()), budget + 1))
+        if not tokens:
+            continue
+        truncated = len(tokens) > budget
+        tokens = tokens[:budget]
+        if len(tokens) <= window:
+            segments.append((tokens[0].start(), tokens[-1].end(), len(tokens)))
+        else:
+            covered = 0
+            for i in range(0, len(tokens) - window + stride, stride):
+                part = tokens[i:i + window]
+                segments.append((part[0].start(), part[-1].end(), i + len(part) - covered))
+                covered = i + len(part)
+                if covered >= len(tokens):
+                    break
+        budget -= len(tokens)
+        if truncated:
+            return segments, max_tokens, True
+    return segments, max_tokens - budget, False
+
+
+# --- Skoring ---
+def analyze_document(engine, text, max_tokens=DEFAULT_MAX_TOKENS, window=DEFAULT_WINDOW, stride=DEFAULT_STRIDE):
+    """DocumentAnalysis: Prediction gabungan + timeline Segment per kalimat/jendela."""
+    spans, tokens, truncated = split_segments(text, max_tokens, window, stride)
+    if not spans:
+        return DocumentAnalysis(engine.analyze(text), [], 0, False)
+    texts = [text[start:end] for start, end, _ in spans]
+    predictions = engine.analyze_batch(texts)
+    weights = np.array([n for _, _, n in spans], dtype=np.float64)
+    proba = np.array([p.probabilities for p in predictions])
+    document = engine.decode_proba((weights @ proba / weights.sum())[None, :])[0]
+    segments = [Segment(start, end, segment_text, n, p)
+                for (start, end, n), segment_text, p in zip(spans, texts, predictions)]
+    return DocumentAnalysis(document, segments, tokens, truncated)
+
+
+def main(argv=None):
+    from batch_score import load_engine
+
+    parser = argparse.ArgumentParser(description="Nilai sentimen dokumen panjang per kalimat.")
+    parser.add_argument("text", nargs="?", help="Teks dokumen (atau pakai --file)")
+    parser.add_argument("--file", default=None, help="Baca dokumen dari file ('-' untuk stdin)")
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS,
+                        help="Batas token yang dinilai (default: %(default)s)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Token per jendela kalimat panjang")
+    parser.add_argument("--stride", type=int, default=DEFAULT_STRIDE, help="Langkah jendela geser")
+    parser.add_argument("--bundle", default=None, help="Muat model dari bundle memory-map")
+    args = parser.parse_args(argv)
+    if args.max_tokens < 1:
+        raise SystemExit("--max-tokens harus >= 1")
+    if args.window < 1:
+        raise SystemExit("--window harus >= 1")
+    if not 1 <= args.stride <= args.window:
+        raise SystemExit("--stride harus >= 1 dan <= --window")
+    if args.file:
+        with (sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")) as f:
+            text = f.read()
+    elif args.text:
+        text = args.text
+    else:
+        parser.error("teks atau --file wajib diisi")
+
+    result = analyze_document(load_engine(args.bundle), text, args.max_tokens, args.window, args.stride)
+    for i, segment in enumerate(result.segments, 1):
+        p = segment.prediction
+        print(f"{i:>3}. {p.label:<8} {p.confidence * 100:5.1f}%  {segment.text[:80]!r}")
+    p = result.prediction
+    print(f"Dokumen: {p.label} ({p.confidence * 100:.1f}%), {len(result.segments)} segmen, {result.tokens} token"
+          f"{' (terpotong)' if result.truncated else ''}")
+
+
+if __name__ == "__main__":
+    main()
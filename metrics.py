@@ -0,0 +1,159 @@
+"""Registry histogram latensi in-process untuk jalur analisis.
+
+Setiap tahap (vectorize, prediksi model, decode label, render halaman hasil,
+klik analisis sampai hasil tampil) diukur dengan timer monotonic dan dicatat
+ke histogram berbucket tetap. Biayanya hanya dua `perf_counter()` dan satu
+`bisect` per tahap, dan seluruh pengukuran bisa dimatikan lewat environment
+variable SENTIMEN_METRICS=0 (timer menjadi no-op).
+
+Registry bisa diekspor sebagai JSON (`snapshot`) atau format teks Prometheus
+(`render_text`); lihat endpoint /metrics di inference_service.py dan halaman
+admin tersembunyi `?admin=metrik` di app.py.
+"""
+import bisect
+import os
+import threading
+import time
+
+# Batas atas bucket dalam detik: 1us .. 10s (skala 1-2-5)
+DEFAULT_BUCKETS = tuple(round(m * 10.0 ** e, 9) for e in range(-6, 1) for m in (1, 2, 5)) + (10.0,)
+
+
+class Histogram:
+    """Histogram kumulatif dengan bucket tetap (seperti histogram Prometheus)."""
+
+    def __init__(self, name, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Slot terakhir: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Perkiraan kuantil dari batas atas bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "sum_s": round(total, 6),
+            "mean_ms": round(total / count * 1000, 4) if count else None,
+            "p50_ms": _ms(self.quantile(0.5)),
+            "p90_ms": _ms(self.quantile(0.9)),
+            "p99_ms": _ms(self.quantile(0.99)),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 4)
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Kumpulan histogram bernama; aman dipakai dari banyak thread."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram(name))
+        return hist
+
+    def timer(self, name):
+        """Context manager yang mencatat durasi blok ke histogram `name`."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name))
+
+    def observe(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Ringkasan semua histogram (JSON-friendly)."""
+        return {name: hist.snapshot() for name, hist in self._items()}
+
+    def render_text(self, prefix="sentimen_stage_seconds"):
+        """Format eksposisi teks Prometheus; nama tahap menjadi label `stage`."""
+        lines = [f"# TYPE {prefix} histogram"]
+        for name, hist in self._items():
+            with hist._lock:
+                counts, count, total = list(hist.counts), hist.count, hist.sum
+            cumulative = 0
+            for upper, c in zip(hist.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if upper == float("inf") else repr(upper)
+                lines.append(f'{prefix}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_sum{{stage="{name}"}} {total}')
+            lines.append(f'{prefix}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Registry global proses; matikan dengan SENTIMEN_METRICS=0
+REGISTRY = MetricsRegistry(enabled=os.environ.get("SENTIMEN_METRICS", "1") != "0")
+
+
+def timer(name):
+    return REGISTRY.timer(name)
+
+
+def observe(name, seconds):
+    REGISTRY.observe(name, seconds)
@@ -0,0 +1,356 @@
+"""Format artefak model ringkas berbasis memory-map untuk cold start cepat.
+
+Satu file bundle berisi kosakata vectorizer, bobot idf, prior kelas,
+`feature_log_prob_`, dan `label_encoder.classes_`. Kosakata disimpan sebagai
+tabel hash 64-bit terurut (plus blob byte untuk verifikasi tabrakan), bukan
+dict Python, sehingga loader cukup melakukan `mmap` dan semua proses worker
+berbagi halaman yang sama lewat page cache OS.
+
+Tata letak file:
+    MAGIC (8 byte) | versi format (uint32) | panjang header (uint32)
+    | header JSON | array-array NumPy (masing-masing rata 64 byte)
+
+Contoh:
+    python model_bundle.py export -o models/sentimen-v1.bundle --version v1
+    python model_bundle.py info models/sentimen-v1.bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+from collections import Counter
+
+import numpy as np
+
+MAGIC = b"SNTBNDL\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+DEFAULT_BUNDLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def term_hash(term):
+    """Hash 64-bit stabil untuk satu term kosakata."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# --- Ekspor ---
+def _vectorizer_config(tfidf):
+    """Konfigurasi tokenisasi vectorizer yang bisa direproduksi tanpa sklearn."""
+    if getattr(tfidf, "analyzer", "word") != "word" or tfidf.tokenizer is not None:
+        raise ValueError("Bundle hanya mendukung analyzer 'word' dengan token_pattern")
+    normalizer = None
+    if tfidf.preprocessor is not None:
+        from text_normalizer import TextNormalizer
+
+        if not isinstance(tfidf.preprocessor, TextNormalizer):
+            raise ValueError("Bundle hanya mendukung preprocessor TextNormalizer")
+        normalizer = tfidf.preprocessor.get_config()
+    elif tfidf.strip_accents is not None:
+        raise ValueError("Bundle belum mendukung strip_accents")
+    stop_words = tfidf.get_stop_words()
+    return {
+        "normalizer": normalizer,
+        "lowercase": bool(tfidf.lowercase),
+        "token_pattern": tfidf.token_pattern,
+        "ngram_range": list(tfidf.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "norm": tfidf.norm,
+        "use_idf": bool(tfidf.use_idf),
+        "sublinear_tf": bool(tfidf.sublinear_tf),
+        "binary": bool(tfidf.binary),
+    }
+
+
+WEIGHT_DTYPES = ("float64", "float32", "float16")
+
+
+def export_bundle(model, tfidf, label_encoder, path, version=None, weights_dtype="float64"):
+    """Menulis model + vectorizer + LabelEncoder ke satu file bundle.
+
+    `weights_dtype` menentukan presisi `idf` dan `feature_log_prob` (lihat model_variant.py);
+    skor tetap dihitung dalam float64.
+    """
+    if weights_dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"weights_dtype harus salah satu dari {WEIGHT_DTYPES}")
+    config = _vectorizer_config(tfidf)
+    n_features = len(tfidf.vocabulary_)
+    terms = list(tfidf.vocabulary_.items())
+    hashes = np.array([term_hash(t) for t, _ in terms], dtype=np.uint64)
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    if len(sorted_hashes) > 1 and np.any(sorted_hashes[1:] == sorted_hashes[:-1]):
+        raise ValueError("Tabrakan hash pada kosakata; bundle tidak bisa dibuat")
+    encoded = [terms[i][0].encode("utf-8") for i in order]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    idf = tfidf.idf_ if config["use_idf"] else np.ones(n_features)
+    arrays = {
+        "term_hash": sorted_hashes,
+        "term_index": np.array([terms[i][1] for i in order], dtype=np.int32),
+        "term_offsets": offsets,
+        "term_blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "idf": np.ascontiguousarray(idf, dtype=weights_dtype),
+        "class_log_prior": np.ascontiguousarray(model.class_log_prior_, dtype=np.float64),
+        "feature_log_prob": np.ascontiguousarray(model.feature_log_prob_, dtype=weights_dtype),
+    }
+    classes = [str(c) for c in label_encoder.inverse_transform(model.classes_)]
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model_version": version or time.strftime("%Y%m%d%H%M%S"),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "classes": classes,
+        "n_features": n_features,
+        "vectorizer": config,
+        "arrays": {},
+    }
+    # Offset array dihitung relatif terhadap awal area data; area data dimulai
+    # setelah prefix + header dan dibulatkan ke ALIGNMENT.
+    cursor = 0
+    for name, arr in arrays.items():
+        header["arrays"][name] = {"offset": cursor, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+        cursor = _align(cursor + arr.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + cursor)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)  # Atomik: pembaca tidak pernah melihat file setengah jadi
+    return header
+
+
+# --- Loader ---
+class ModelBundle:
+    """Bundle model yang dibuka via memory-map (read-only, berbagi page cache)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, header_len = _PREFIX.unpack(bytes(self._mmap[:_PREFIX.size]))
+        if magic != MAGIC:
+            raise ValueError(f"{path} bukan file bundle model")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Versi format bundle {version} tidak didukung (harap {FORMAT_VERSION})")
+        self.header = json.loads(bytes(self._mmap[_PREFIX.size:_PREFIX.size + header_len]).decode("utf-8"))
+        data_start = _align(_PREFIX.size + header_len)
+        for name, spec in self.header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+            start = data_start + spec["offset"]
+            view = self._mmap[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+            setattr(self, name, view)
+        self.classes = list(self.header["classes"])
+        self.version = self.header["model_version"]
+        self.config = self.header["vectorizer"]
+        self._token_re = re.compile(self.config["token_pattern"])
+        self._stop_words = frozenset(self.config["stop_words"] or ())
+        self._blob = memoryview(self.term_blob)
+        self._normalizer = None  # Satu instans per bundle agar memo token dipakai bersama
+        if self.config.get("normalizer"):
+            from text_normalizer import TextNormalizer
+
+            self._normalizer = TextNormalizer.from_config(self.config["normalizer"])
+
+    # --- Tokenisasi (meniru analyzer 'word' sklearn) ---
+    def build_analyzer(self):
+        # Seperti sklearn: jika ada preprocessor (TextNormalizer), lowercase tidak diterapkan terpisah
+        normalizer = self._normalizer
+        lowercase = self.config["lowercase"] and normalizer is None
+        findall = self._token_re.findall
+        stop_words = self._stop_words
+        min_n, max_n = self.config["ngram_range"]
+
+        def analyze(doc):
+            if normalizer is not None:
+                doc = normalizer(doc)
+            elif lowercase:
+                doc = doc.lower()
+            tokens = findall(doc)
+            if stop_words:
+                tokens = [t for t in tokens if t not in stop_words]
+            if max_n == 1:
+                return tokens
+            original = tokens
+            if min_n == 1:
+                tokens = list(original)
+                min_n_ = 2
+            else:
+                tokens = []
+                min_n_ = min_n
+            n_original = len(original)
+            for n in range(min_n_, min(max_n + 1, n_original + 1)):
+                for i in range(n_original - n + 1):
+                    tokens.append(" ".join(original[i:i + n]))
+            return tokens
+
+        return analyze
+
+    def lookup(self, term):
+        """Indeks fitur untuk `term`, atau -1 jika tidak ada di kosakata."""
+        h = np.uint64(term_hash(term))
+        pos = int(np.searchsorted(self.term_hash, h))
+        if pos >= len(self.term_hash) or self.term_hash[pos] != h:
+            return -1
+        start, end = int(self.term_offsets[pos]), int(self.term_offsets[pos + 1])
+        if self._blob[start:end] != term.encode("utf-8"):
+            return -1  # Tabrakan hash dengan term di luar kosakata
+        return int(self.term_index[pos])
+
+    def feature_names(self):
+        """Term per indeks fitur (setara `get_feature_names_out`), dibangun dari blob term."""
+        names = np.empty(self.header["n_features"], dtype=object)
+        blob = bytes(self._blob)
+        offsets = self.term_offsets.tolist()
+        for pos, j in enumerate(self.term_index.tolist()):
+            names[j] = blob[offsets[pos]:offsets[pos + 1]].decode("utf-8")
+        return names
+
+    def transform(self, texts):
+        """Matriks CSR TF-IDF, setara dengan `TfidfVectorizer.transform`."""
+        import scipy.sparse as sp  # Impor lambat: jalur satu teks (FastScorer) tidak butuh scipy
+
+        analyze = self.build_analyzer()
+        memo = {}
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in texts:
+            row = Counter()
+            for token in analyze(text):
+                j = memo.get(token)
+                if j is None:
+                    j = memo[token] = self.lookup(token)
+                if j >= 0:
+                    row[j] += 1
+            for j in sorted(row):
+                indices.append(j)
+                counts.append(row[j])
+            indptr.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int32)
+        values = np.asarray(counts, dtype=np.float64)
+        if self.config["binary"]:
+            values[:] = 1.0
+        elif self.config["sublinear_tf"]:
+            values = np.log(values) + 1.0
+        values = values * self.idf[indices]
+        indptr = np.asarray(indptr, dtype=np.int64)
+        norm = self.config["norm"]
+        if norm and len(values):
+            lengths = np.diff(indptr)
+            row_ids = np.repeat(np.arange(len(lengths)), lengths)
+            if norm == "l2":
+                scale = np.sqrt(np.bincount(row_ids, values * values, minlength=len(lengths)))
+            else:
+                scale = np.bincount(row_ids, np.abs(values), minlength=len(lengths))
+            scale[scale == 0.0] = 1.0
+            values = values / scale[row_ids]
+        return sp.csr_matrix((values, indices, indptr), shape=(len(indptr) - 1, self.header["n_features"]))
+
+    def joint_log_likelihood(self, X):
+        return np.asarray(X @ self.feature_log_prob.T) + self.class_log_prior
+
+
+# --- Adaptor duck-typing agar SentimentEngine bisa memakai bundle ---
+class BundleVectorizer:
+    def __init__(self, bundle):
+        self.bundle = bundle
+
+    def transform(self, texts):
+        return self.bundle.transform(texts)
+
+    def build_analyzer(self):
+        return self.bundle.build_analyzer()
+
+    def get_feature_names_out(self):
+        return self.bundle.feature_names()
+
+
+class BundleModel:
+    """Meniru API prediksi MultinomialNB di atas array bundle."""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.classes_ = np.arange(len(bundle.classes))
+        self.feature_log_prob_ = bundle.feature_log_prob
+        self.class_log_prior_ = bundle.class_log_prior
+
+    def predict(self, X):
+        return self.classes_[self.bundle.joint_log_likelihood(X).argmax(axis=1)]
+
+    def predict_proba(self, X):
+        jll = self.bundle.joint_log_likelihood(X)
+        jll = jll - jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+class BundleLabelEncoder:
+    def __init__(self, bundle):
+        self.classes_ = np.array(bundle.classes)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y)]
+
+
+class BundleTermLookup:
+    """Pengganti dict `term_weights` FastScorer yang membaca langsung dari bundle."""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+
+    def get(self, term, default=None):
+        j = self.bundle.lookup(term)
+        if j < 0:
+            return default
+        b = self.bundle
+        return (j, float(b.idf[j]), tuple(b.feature_log_prob[:, j].tolist()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor dan inspeksi bundle model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="Konversi file .pkl menjadi satu bundle")
+    p_export.add_argument("-o", "--output", default=None,
+                          help="Path bundle (default: models/sentimen-<versi>.bundle)")
+    p_export.add_argument("--version", default=None, help="Label versi model")
+    p_info = sub.add_parser("info", help="Tampilkan header bundle")
+    p_info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from sentiment_engine import load_artifacts
+
+        model, tfidf, label_encoder = load_artifacts()
+        version = args.version or time.strftime("%Y%m%d%H%M%S")
+        path = args.output or os.path.join(DEFAULT_BUNDLE_DIR, f"sentimen-{version}.bundle")
+        header = export_bundle(model, tfidf, label_encoder, path, version)
+        print(f"Bundle versi {header['model_version']} ditulis ke {path} "
+              f"({os.path.getsize(path):,} byte, {header['n_features']} fitur)")
+    else:
+        start = time.perf_counter()
+        bundle = ModelBundle(args.path)
+        elapsed = (time.perf_counter() - start) * 1000
+        info = {k: v for k, v in bundle.header.items() if k != "arrays"}
+        info["load_ms"] = round(elapsed, 3)
+        print(json.dumps(info, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
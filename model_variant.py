@@ -0,0 +1,222 @@
+"""Varian model ringkas: pemangkasan kosakata + bobot presisi rendah.
+
+Dari artefak yang ada (`naivebayes_model.pkl` + `tf-idf_vectorizer.pkl`)
+dibuat bundle memory-map (model_bundle.py) yang lebih kecil:
+
+- fitur dipangkas berdasarkan document frequency pada korpus survei
+  (`--min-df`; 1 membuang term yang tidak pernah muncul di korpus, 2 juga
+  membuang term yang hanya muncul sekali) dan/atau hanya
+  `--top-k` fitur dengan skor pembeda kelas tertinggi
+  (selisih maksimum `feature_log_prob_` antar kelas);
+- bobot `idf` dan `feature_log_prob` disimpan sebagai float64/float32/float16
+  (`--dtype`); skor tetap dihitung dalam float64.
+
+Laporan membandingkan setiap varian dengan model penuh pada
+sentimen_status.csv: akurasi terhadap label survei, kesepakatan label dengan
+model penuh, selisih probabilitas maksimum, waktu muat, dan ukuran bobot.
+
+app.py memilih varian saat startup lewat environment variable
+SENTIMEN_MODEL_VARIANT (path bundle, atau nama file di folder models/).
+
+Contoh:
+    python model_variant.py --min-df 2 --dtype float16 -o models/sentimen-ringkas.bundle
+    python model_variant.py --top-k 1500 --dtype float32 -o models/sentimen-top1500.bundle
+    python model_variant.py --laporan            # bandingkan beberapa varian standar
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from model_bundle import DEFAULT_BUNDLE_DIR, WEIGHT_DTYPES, ModelBundle, export_bundle
+from sentiment_engine import BASE_DIR, SentimentEngine, load_artifacts
+
+DEFAULT_CSV_PATH = os.path.join(BASE_DIR, "sentimen_status.csv")
+VARIANT_ENV = "SENTIMEN_MODEL_VARIANT"
+
+# Varian yang dibandingkan oleh --laporan: (nama, min_df, top_k, dtype)
+STANDARD_VARIANTS = (
+    ("penuh-float64", 0, None, "float64"),
+    ("penuh-float32", 0, None, "float32"),
+    ("penuh-float16", 0, None, "float16"),
+    ("df1-float32", 1, None, "float32"),
+    ("df2-float16", 2, None, "float16"),
+    ("top1500-float16", 0, 1500, "float16"),
+    ("top500-float16", 0, 500, "float16"),
+)
+
+
+def resolve_variant(name):
+    """Path bundle untuk nilai SENTIMEN_MODEL_VARIANT (path langsung atau nama di models/)."""
+    if os.path.exists(name):
+        return name
+    for candidate in (name, f"{name}.bundle", f"sentimen-{name}.bundle"):
+        path = os.path.join(DEFAULT_BUNDLE_DIR, candidate)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Varian model {name!r} tidak ditemukan")
+
+
+# --- Pemilihan Fitur ---
+def document_frequency(tfidf, texts):
+    """Jumlah dokumen korpus yang memuat setiap fitur (memakai analyzer vectorizer)."""
+    analyze = tfidf.build_analyzer()
+    vocabulary = tfidf.vocabulary_
+    df = np.zeros(len(vocabulary), dtype=np.int64)
+    for text in texts:
+        indices = {vocabulary[t] for t in analyze(text) if t in vocabulary}
+        if indices:
+            df[list(indices)] += 1
+    return df
+
+
+def discriminative_score(model):
+    """Selisih log-probabilitas terbesar antar kelas per fitur; fitur netral bernilai ~0."""
+    flp = np.asarray(model.feature_log_prob_)
+    return flp.max(axis=0) - flp.min(axis=0)
+
+
+def select_features(df, score, min_df=0, top_k=None):
+    """Indeks fitur yang dipertahankan (terurut naik)."""
+    keep = np.flatnonzero(df >= min_df)
+    if top_k is not None and top_k < len(keep):
+        keep = keep[np.argsort(-score[keep], kind="stable")[:top_k]]
+    return np.sort(keep)
+
+
+def prune(model, tfidf, keep):
+    """Salinan model + vectorizer yang hanya memuat fitur `keep` (kosakata diberi indeks ulang)."""
+    keep = np.asarray(keep)
+    new_index = {int(j): i for i, j in enumerate(keep)}
+    pruned_tfidf = copy.deepcopy(tfidf)
+    pruned_tfidf.vocabulary_ = {term: new_index[j] for term, j in tfidf.vocabulary_.items() if j in new_index}
+    if getattr(tfidf, "use_idf", False):
+        pruned_tfidf.idf_ = np.asarray(tfidf.idf_)[keep]
+    pruned_model = copy.deepcopy(model)
+    pruned_model.feature_log_prob_ = np.asarray(model.feature_log_prob_)[:, keep]
+    if hasattr(model, "feature_count_"):
+        pruned_model.feature_count_ = np.asarray(model.feature_count_)[:, keep]
+    pruned_model.n_features_in_ = len(keep)
+    return pruned_model, pruned_tfidf
+
+
+# --- Evaluasi ---
+def measure_load(path, repeats=5):
+    """Median waktu (ms) membuka bundle + membangun engine."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        SentimentEngine.from_bundle(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def evaluate(engine, texts, labels, reference):
+    """Akurasi terhadap label survei + kesepakatan dengan model penuh (`reference` = list Prediction)."""
+    predictions = engine.analyze_batch(texts)
+    labelled = [(p.label, label) for p, label in zip(predictions, labels) if label]
+    proba = np.array([p.probabilities for p in predictions])
+    reference_proba = np.array([p.probabilities for p in reference])
+    return {
+        "akurasi": sum(p == label for p, label in labelled) / len(labelled) if labelled else None,
+        "kesepakatan": sum(p.label == r.label for p, r in zip(predictions, reference)) / len(texts),
+        "selisih_proba_maks": float(np.abs(proba - reference_proba).max()),
+    }
+
+
+def build_variant(model, tfidf, label_encoder, df, score, path, min_df=0, top_k=None,
+                  dtype="float64", version=None):
+    keep = select_features(df, score, min_df, top_k)
+    pruned_model, pruned_tfidf = prune(model, tfidf, keep)
+    header = export_bundle(pruned_model, pruned_tfidf, label_encoder, path, version, weights_dtype=dtype)
+    return header
+
+
+def variant_report(path, texts, labels, reference, full_features):
+    bundle = ModelBundle(path)
+    weight_bytes = bundle.idf.nbytes + bundle.feature_log_prob.nbytes
+    row = {
+        "path": path,
+        "fitur": bundle.header["n_features"],
+        "fitur_persen": round(100.0 * bundle.header["n_features"] / full_features, 1),
+        "dtype": str(bundle.feature_log_prob.dtype),
+        "ukuran_file": os.path.getsize(path),
+        "ukuran_bobot": weight_bytes,
+        "muat_ms": round(measure_load(path), 3),
+    }
+    row.update(evaluate(SentimentEngine.from_bundle(path), texts, labels, reference))
+    return row
+
+
+def load_corpus(csv_path):
+    from batch_score import iter_csv_rows
+
+    rows = list(iter_csv_rows(csv_path))
+    return [text for text, _ in rows], [label.strip().lower() for _, label in rows]
+
+
+def _print_table(rows, log):
+    print(f"{'varian':<18}{'fitur':>7}{'dtype':>9}{'bobot (KB)':>12}{'muat (ms)':>11}"
+          f"{'akurasi':>9}{'sepakat':>9}{'d_proba':>9}", file=log)
+    for row in rows:
+        accuracy = f"{row['akurasi']:.4f}" if row["akurasi"] is not None else "-"
+        print(f"{row['nama']:<18}{row['fitur']:>7}{row['dtype']:>9}{row['ukuran_bobot'] / 1024:>12.1f}"
+              f"{row['muat_ms']:>11.3f}{accuracy:>9}{row['kesepakatan']:>9.4f}{row['selisih_proba_maks']:>9.4f}",
+              file=log)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat varian model ringkas dan laporan akurasinya.")
+    parser.add_argument("-o", "--output", default=None, help="Path bundle varian (default: models/sentimen-<nama>.bundle)")
+    parser.add_argument("--min-df", type=int, default=0,
+                        help="Document frequency minimum pada korpus (default: %(default)s = tanpa pangkas)")
+    parser.add_argument("--top-k", type=int, default=None, help="Pertahankan K fitur paling pembeda kelas")
+    parser.add_argument("--dtype", choices=WEIGHT_DTYPES, default="float32", help="Presisi bobot")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="Korpus untuk df dan evaluasi")
+    parser.add_argument("--laporan", action="store_true", help="Bandingkan varian standar (tanpa menyimpan)")
+    parser.add_argument("--json", default=None, help="Simpan laporan sebagai JSON")
+    args = parser.parse_args(argv)
+
+    model, tfidf, label_encoder = load_artifacts()
+    full = SentimentEngine(model, tfidf, label_encoder)
+    texts, labels = load_corpus(args.csv)
+    reference = full.analyze_batch(texts)
+    df = document_frequency(tfidf, texts)
+    score = discriminative_score(model)
+    full_features = len(tfidf.vocabulary_)
+    start = time.perf_counter()
+    load_artifacts()
+    pkl_load_ms = (time.perf_counter() - start) * 1000
+    print(f"Model penuh (.pkl): {full_features} fitur, muat {pkl_load_ms:.1f} ms, "
+          f"{int((df == 0).sum())} fitur tidak muncul di korpus, {int((df == 1).sum())} muncul sekali",
+          file=sys.stderr)
+
+    rows = []
+    if args.laporan:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, min_df, top_k, dtype in STANDARD_VARIANTS:
+                path = os.path.join(tmp, f"{name}.bundle")
+                build_variant(model, tfidf, label_encoder, df, score, path, min_df, top_k, dtype, name)
+                rows.append({"nama": name, **variant_report(path, texts, labels, reference, full_features)})
+                rows[-1]["path"] = None
+    else:
+        name = f"df{args.min_df}" + (f"-top{args.top_k}" if args.top_k else "") + f"-{args.dtype}"
+        path = args.output or os.path.join(DEFAULT_BUNDLE_DIR, f"sentimen-{name}.bundle")
+        build_variant(model, tfidf, label_encoder, df, score, path, args.min_df, args.top_k, args.dtype, name)
+        rows.append({"nama": name, **variant_report(path, texts, labels, reference, full_features)})
+        print(f"Varian ditulis ke {path}; pakai dengan {VARIANT_ENV}={path}", file=sys.stderr)
+    _print_table(rows, sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"pkl_muat_ms": round(pkl_load_ms, 3), "fitur_penuh": full_features, "varian": rows},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Indeks MinHash/LSH untuk mendeteksi status yang hampir sama (near-duplicate).
+
+Banyak status masuk adalah salinan: kutipan yang di-repost, lirik lagu, atau
+keluhan yang sama dengan tanda baca berbeda. Setiap status di tabel `status`
+diubah menjadi himpunan shingle karakter (teks huruf kecil tanpa tanda baca),
+lalu diringkas menjadi signature MinHash 64 nilai. Signature dibagi menjadi
+16 band x 4 baris; setiap band di-hash ke tabel `status_lsh` yang terindeks,
+sehingga pencarian hanya menyentuh bucket band yang sama (sublinear terhadap
+jumlah riwayat) dan kemiripan kandidat diverifikasi dari signature.
+
+- `ensure_schema` membangun indeks secara massal dari `status` saat tabel
+  pertama kali dibuat; `index_pending` dipanggil oleh
+  persistence.insert_status_rows di transaksi insert yang sama sehingga baris
+  baru langsung terindeks.
+- `lookup` mengembalikan status tersimpan yang paling mirip di atas ambang;
+  app.py memakai label dan `kepercayaan`-nya tanpa menjalankan model, hanya
+  untuk baris yang dihasilkan versi model aktif (kolom `status.model_versi`).
+- `clusters` melaporkan kelompok status yang saling mirip.
+
+Catatan: seperti agregat harian, UPDATE/DELETE langsung pada `status` tidak
+tercermin di signature; jalankan `python near_duplicate.py --bangun-ulang`.
+
+Contoh:
+    python near_duplicate.py "capek banget hari ini!!"
+    python near_duplicate.py --klaster --min-ukuran 3
+"""
+import argparse
+import collections
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.85
+MAX_CANDIDATES = 200  # Batas kandidat per lookup agar bucket yang sangat ramai tetap murah
+DEFAULT_BATCH_SIZE = 1000
+
+# Koefisien permutasi tetap (signature disimpan di database, jadi harus stabil antar proses).
+# Hash multiply-shift: (a*h + b) mod 2^64, diambil 32 bit teratas; `a` ganjil.
+_rng = np.random.RandomState(20250701)
+_PERM_A = _rng.randint(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS status_minhash (
+            id_status INTEGER PRIMARY KEY,
+            signature BLOB
+        )""",
+    """CREATE TABLE IF NOT EXISTS status_lsh (
+            band INTEGER NOT NULL,
+            kunci INTEGER NOT NULL,
+            id_status INTEGER NOT NULL,
+            PRIMARY KEY (band, kunci, id_status)
+        ) WITHOUT ROWID""",
+)
+
+Duplicate = collections.namedtuple("Duplicate", ["id_status", "isi_status", "label", "kepercayaan", "similarity"])
+
+
+# --- MinHash ---
+def shingles(text):
+    """Shingle karakter dari teks huruf kecil tanpa tanda baca."""
+    normalized = " ".join(_WORD_RE.findall(text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """Signature MinHash (uint32 x NUM_PERM), atau None untuk teks tanpa kata."""
+    items = shingles(text or "")
+    if not items:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64, count=len(items))
+    permuted = (np.multiply.outer(hashes, _PERM_A) + _PERM_B) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(sig):
+    """Kunci hash 64-bit bertanda (muat di INTEGER SQLite) untuk setiap band."""
+    raw = sig.tobytes()
+    width = ROWS_PER_BAND * 4
+    return [int.from_bytes(hashlib.blake2b(raw[b * width:(b + 1) * width], digest_size=8).digest(),
+                           "little", signed=True) for b in range(BANDS)]
+
+
+def similarity(sig_a, sig_b):
+    """Perkiraan kemiripan Jaccard dari dua signature."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def _decode(blob):
+    return np.frombuffer(blob, dtype=np.uint32)
+
+
+# --- Pemeliharaan Indeks ---
+def ensure_schema(conn):
+    """Membuat tabel indeks; mengisinya dari riwayat `status` saat pertama dibuat."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'status_minhash'").fetchone()
+    for statement in SCHEMA:
+        conn.execute(statement)
+    if not exists:
+        index_pending(conn)
+
+
+def index_pending(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """Mengindeks baris `status` yang belum punya signature (id di atas yang terakhir terindeks)."""
+    total = 0
+    while True:
+        rows = conn.execute(
+            """SELECT id_status, isi_status FROM status
+               WHERE id_status > (SELECT COALESCE(MAX(id_status), 0) FROM status_minhash)
+               ORDER BY id_status LIMIT ?""",
+            (batch_size,),
+        ).fetchall()
+        if not rows:
+            return total
+        signatures = []
+        bands = []
+        for id_status, text in rows:
+            sig = signature(text)
+            signatures.append((id_status, sig.tobytes() if sig is not None else None))
+            if sig is not None:
+                bands.extend((b, key, id_status) for b, key in enumerate(band_keys(sig)))
+        conn.executemany("INSERT INTO status_minhash (id_status, signature) VALUES (?, ?)", signatures)
+        conn.executemany("INSERT OR IGNORE INTO status_lsh (band, kunci, id_status) VALUES (?, ?, ?)", bands)
+        total += len(rows)
+
+
+def rebuild(conn):
+    conn.execute("DELETE FROM status_lsh")
+    conn.execute("DELETE FROM status_minhash")
+    return index_pending(conn)
+
+
+# --- Pencarian ---
+def _candidates(conn, keys):
+    clauses = " OR ".join(["(band = ? AND kunci = ?)"] * len(keys))
+    params = [v for b, key in enumerate(keys) for v in (b, key)]
+    sql = (f"SELECT DISTINCT id_status FROM status_lsh WHERE {clauses} "
+           "ORDER BY id_status DESC LIMIT ?")
+    return [row[0] for row in conn.execute(sql, params + [MAX_CANDIDATES])]
+
+
+def lookup(conn, text, threshold=DEFAULT_THRESHOLD, require_confidence=True, model_version=None):
+    """Status tersimpan paling mirip dengan `text` (kemiripan >= threshold), atau None.
+
+    Dengan `require_confidence`, hanya status yang punya nilai `kepercayaan` numerik yang
+    dipertimbangkan. `model_version` membatasi kandidat ke baris hasil versi model tersebut.
+    """
+    sig = signature(text)
+    if sig is None:
+        return None
+    ids = _candidates(conn, band_keys(sig))
+    if not ids:
+        return None
+    placeholders = ",".join("?" * len(ids))
+    sql = ("SELECT s.id_status, s.isi_status, s.label_sentimen, s.kepercayaan, m.signature "
+           "FROM status s JOIN status_minhash m ON m.id_status = s.id_status "
+           f"WHERE s.id_status IN ({placeholders})")
+    params = list(ids)
+    if require_confidence:
+        sql += " AND typeof(s.kepercayaan) IN ('real', 'integer')"
+    if model_version is not None:
+        sql += " AND s.model_versi = ?"
+        params.append(model_version)
+    best = None
+    for id_status, isi, label, kepercayaan, blob in conn.execute(sql, params):
+        if blob is None:
+            continue
+        score = similarity(sig, _decode(blob))
+        # Kemiripan sama: status terbaru menang
+        if score >= threshold and (best is None or (score, id_status) > (best.similarity, best.id_status)):
+            best = Duplicate(id_status, isi, label, kepercayaan, score)
+    return best
+
+
+def clusters(conn, threshold=DEFAULT_THRESHOLD, min_size=2):
+    """Kelompok status yang saling mirip, terbesar dulu: list of list id_status."""
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    signatures = {}
+
+    def sig_of(id_status):
+        if id_status not in signatures:
+            row = conn.execute("SELECT signature FROM status_minhash WHERE id_status = ?", (id_status,)).fetchone()
+            signatures[id_status] = _decode(row[0]) if row and row[0] is not None else None
+        return signatures[id_status]
+
+    buckets = conn.execute(
+        "SELECT group_concat(id_status) FROM status_lsh GROUP BY band, kunci HAVING COUNT(*) > 1")
+    for (members,) in buckets:
+        ids = [int(i) for i in members.split(",")]
+        anchor = sig_of(ids[0])
+        if anchor is None:
+            continue
+        for other in ids[1:]:
+            if similarity(anchor, sig_of(other)) >= threshold:
+                parent.setdefault(ids[0], ids[0])
+                parent.setdefault(other, other)
+                root_a, root_b = find(ids[0]), find(other)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+    groups = collections.defaultdict(list)
+    for id_status in parent:
+        groups[find(id_status)].append(id_status)
+    result = [sorted(g) for g in groups.values() if len(g) >= min_size]
+    return sorted(result, key=lambda g: (-len(g), g[0]))
+
+
+def main(argv=None):
+    from persistence import get_pool, transaction
+
+    parser = argparse.ArgumentParser(description="Cari status hampir sama di sentimen.db.")
+    parser.add_argument("text", nargs="?", help="Teks yang dicari padanannya")
+    parser.add_argument("--ambang", type=float, default=DEFAULT_THRESHOLD, help="Kemiripan minimum (0-1)")
+    parser.add_argument("--klaster", action="store_true", help="Laporkan kelompok status yang mirip")
+    parser.add_argument("--min-ukuran", type=int, default=2, help="Ukuran klaster minimum")
+    parser.add_argument("--bangun-ulang", action="store_true", help="Bangun ulang seluruh indeks")
+    args = parser.parse_args(argv)
+    with get_pool().connection() as conn:
+        if args.bangun_ulang:
+            with transaction(conn):
+                print(f"{rebuild(conn)} status diindeks ulang")
+        if args.text:
+            match = lookup(conn, args.text, args.ambang, require_confidence=False)
+            if match is None:
+                print("Tidak ada status yang mirip")
+            else:
+                print(f"[{match.id_status}] kemiripan {match.similarity:.2f} {match.label} "
+                      f"{match.kepercayaan}: {match.isi_status}")
+        if args.klaster:
+            for group in clusters(conn, args.ambang, args.min_ukuran):
+                placeholders = ",".join("?" * len(group))
+                labels = collections.Counter(label for (label,) in conn.execute(
+                    f"SELECT label_sentimen FROM status WHERE id_status IN ({placeholders})", group))
+                text = conn.execute("SELECT isi_status FROM status WHERE id_status = ?", (group[0],)).fetchone()[0]
+                print(f"{len(group)} status {dict(labels)}: {text[:80]!r} (id {group[0]}..{group[-1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Pembaruan model inkremental dengan `MultinomialNB.partial_fit` dan hot-swap atomik.
+
+Hanya baris baru sejak watermark terakhir yang dipakai:
+- baris survei `sentimen_status.csv` (kolom 3 teks, kolom 4 label dari responden),
+  ditandai dengan jumlah baris CSV yang sudah diproses;
+- baris tabel `status` di sentimen.db dengan id_status di atas watermark.
+  Label di tabel ini adalah hasil prediksi, jadi hanya baris dengan kepercayaan
+  >= `--min-kepercayaan` (atau tanpa nilai kepercayaan, mis. data berlabel
+  manual) yang dipakai sebagai label.
+
+Vectorizer TF-IDF dan LabelEncoder dibekukan; teks baru diubah dengan kosakata
+yang sama lalu diumpankan ke salinan model versi terakhir. Kandidat dinilai
+pada holdout tetap (sekitar 1/5 baris survei, dipilih dari hash teks dan tidak
+pernah ikut dilatih). Jika akurasinya tidak turun lebih dari `--toleransi`,
+kandidat disimpan sebagai artefak berversi (`models/naivebayes-<versi>.pkl` dan
+`models/sentimen-<versi>.bundle`), watermark dimajukan, lalu pointer
+`models/CURRENT` diganti secara atomik (shared_model.publish). Dengan
+`--perbarui-pkl`, set .pkl lengkap juga ditulis ke `models/pkl-<versi>/` dan
+pointer `models/CURRENT_PKL` dipindah (sentiment_engine.publish_artifacts).
+Proses yang melayani (ModelRegistry, atau app.py mode lokal) menukar engine
+pada permintaan berikutnya; permintaan yang sedang berjalan tetap memakai
+engine lama.
+
+Pada jalankan pertama (belum ada state) watermark hanya diinisialisasi ke akhir
+data yang ada, karena model yang dikirim sudah dilatih dengan data tersebut.
+
+Contoh:
+    python online_update.py                  # latih baris baru, validasi, publikasikan
+    python online_update.py --dry-run        # latih dan validasi saja
+    python online_update.py --status         # tampilkan watermark dan versi aktif
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+import time
+
+from batch_score import DEFAULT_CHUNK_SIZE, iter_chunks, iter_csv_rows
+from model_bundle import DEFAULT_BUNDLE_DIR, export_bundle
+from sentiment_engine import BASE_DIR, artifact_paths, load_artifacts, publish_artifacts, save_artifacts
+from shared_model import DEFAULT_POINTER_PATH, publish
+
+DEFAULT_STATE_PATH = os.path.join(DEFAULT_BUNDLE_DIR, "online_state.json")
+DEFAULT_CSV_PATH = os.path.join(BASE_DIR, "sentimen_status.csv")
+DEFAULT_MIN_CONFIDENCE = 80.0  # persen, sama dengan kolom `kepercayaan`
+DEFAULT_TOLERANCE = 0.01
+HOLDOUT_BUCKETS = 5  # 1 dari 5 teks survei masuk holdout
+
+
+# --- State & Watermark ---
+def load_state(path=DEFAULT_STATE_PATH):
+    """State pembaruan terakhir, atau None jika belum pernah dijalankan."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(state, path=DEFAULT_STATE_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def is_holdout(text):
+    """Pembagian holdout yang stabil antar jalankan (berdasarkan hash teks)."""
+    digest = hashlib.blake2b(text.strip().lower().encode("utf-8"), digest_size=8).digest()
+    return digest[0] % HOLDOUT_BUCKETS == 0
+
+
+def _label(value):
+    return str(value).strip().lower()
+
+
+def read_csv_rows(csv_path):
+    """List (teks, label) baris survei yang berteks dan berlabel."""
+    return [(text, _label(label)) for text, label in iter_csv_rows(csv_path) if text.strip() and label.strip()]
+
+
+def max_status_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id_status), 0) FROM status").fetchone()[0]
+
+
+def new_status_rows(conn, after_id, high_id, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """(teks, label) dari tabel `status` dengan after_id < id_status <= high_id."""
+    rows = conn.execute(
+        """SELECT isi_status, label_sentimen FROM status
+           WHERE id_status > ? AND id_status <= ? AND isi_status IS NOT NULL
+             AND (kepercayaan IS NULL OR kepercayaan >= ?)
+           ORDER BY id_status""",
+        (after_id, high_id, min_confidence),
+    ).fetchall()
+    return [(text, _label(label)) for text, label in rows if text.strip() and label]
+
+
+# --- Pelatihan & Validasi ---
+def accuracy(model, tfidf, label_encoder, rows):
+    if not rows:
+        return None
+    X = tfidf.transform([text for text, _ in rows])
+    predicted = label_encoder.inverse_transform(model.predict(X))
+    return sum(p == label for p, (_, label) in zip(predicted, rows)) / len(rows)
+
+
+def partial_fit_rows(model, tfidf, label_encoder, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Mengumpankan baris ke `model.partial_fit` per chunk; mengembalikan jumlah baris terpakai."""
+    known = set(str(c) for c in label_encoder.classes_)
+    used = 0
+    for chunk in iter_chunks((r for r in rows if r[1] in known), chunk_size):
+        X = tfidf.transform([text for text, _ in chunk])
+        model.partial_fit(X, label_encoder.transform([label for _, label in chunk]))
+        used += len(chunk)
+    return used
+
+
+def _dump_atomic(obj, path):
+    import joblib
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def update(conn, csv_path=DEFAULT_CSV_PATH, state_path=DEFAULT_STATE_PATH,
+           pointer_path=DEFAULT_POINTER_PATH, min_confidence=DEFAULT_MIN_CONFIDENCE,
+           tolerance=DEFAULT_TOLERANCE, dry_run=False, replace_pkl=False, log=sys.stderr):
+    """Menjalankan satu putaran pembaruan; mengembalikan laporan (dict)."""
+    csv_rows = read_csv_rows(csv_path)
+    high_id = max_status_id(conn)
+    state = load_state(state_path)
+    if state is None:
+        state = {"version": None, "model_path": None, "csv_rows": len(csv_rows), "status_id": high_id}
+        if not dry_run:
+            save_state(state, state_path)
+        print(f"Watermark diinisialisasi: {len(csv_rows)} baris CSV, id_status {high_id}", file=log)
+        return {"status": "inisialisasi", **state}
+
+    new_csv = csv_rows[state["csv_rows"]:]
+    new_db = new_status_rows(conn, state["status_id"], high_id, min_confidence)
+    train_rows = [r for r in new_csv if not is_holdout(r[0])] + new_db
+    holdout = [r for r in csv_rows if is_holdout(r[0])]
+    report = {"csv_baru": len(new_csv), "status_baru": len(new_db), "holdout": len(holdout)}
+    if not train_rows:
+        print("Tidak ada baris baru untuk dilatih", file=log)
+        return {"status": "tidak_ada_data", **report}
+
+    base_path = state.get("model_path") or artifact_paths()[0]
+    base_model, tfidf, label_encoder = load_artifacts(base_path)
+    candidate = copy.deepcopy(base_model)
+    report["dilatih"] = partial_fit_rows(candidate, tfidf, label_encoder, train_rows)
+    report["akurasi_lama"] = accuracy(base_model, tfidf, label_encoder, holdout)
+    report["akurasi_baru"] = accuracy(candidate, tfidf, label_encoder, holdout)
+    if report["akurasi_lama"] is not None and report["akurasi_baru"] + tolerance < report["akurasi_lama"]:
+        print(f"Kandidat ditolak: akurasi holdout {report['akurasi_baru']:.4f} "
+              f"< {report['akurasi_lama']:.4f} - {tolerance}", file=log)
+        return {"status": "ditolak", **report}
+    if dry_run:
+        return {"status": "dry_run", **report}
+
+    version = time.strftime("%Y%m%d%H%M%S")
+    artifact_dir = os.path.dirname(os.path.abspath(state_path))  # Artefak disimpan di samping state
+    model_path = os.path.join(artifact_dir, f"naivebayes-{version}.pkl")
+    bundle_path = os.path.join(artifact_dir, f"sentimen-{version}.bundle")
+    os.makedirs(artifact_dir, exist_ok=True)
+    _dump_atomic(candidate, model_path)
+    export_bundle(candidate, tfidf, label_encoder, bundle_path, version)
+    # Watermark dimajukan sebelum pointer: jika proses berhenti di antaranya,
+    # baris yang sama tidak akan dilatih dua kali pada jalankan berikutnya.
+    save_state({"version": version, "model_path": model_path, "bundle_path": bundle_path,
+                "parent": state.get("version"), "csv_rows": len(csv_rows), "status_id": high_id,
+                "akurasi_holdout": report["akurasi_baru"], "dibuat": time.strftime("%Y-%m-%dT%H:%M:%S")},
+               state_path)
+    publish(bundle_path, pointer_path)
+    if replace_pkl:  # Set .pkl lengkap untuk app.py mode lokal, dipasang dengan satu pointer
+        pkl_dir = os.path.join(artifact_dir, f"pkl-{version}")
+        save_artifacts(candidate, tfidf, label_encoder, pkl_dir)
+        publish_artifacts(pkl_dir)
+    print(f"Versi {version} dipublikasikan ({report['dilatih']} baris baru)", file=log)
+    return {"status": "dipublikasikan", "versi": version, **report}
+
+
+def main(argv=None):
+    from persistence import get_pool
+
+    parser = argparse.ArgumentParser(description="Pembaruan model inkremental dengan partial_fit.")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="File survei berlabel (default: sentimen_status.csv)")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="File state/watermark")
+    parser.add_argument("--pointer", default=DEFAULT_POINTER_PATH, help="File pointer model aktif")
+    parser.add_argument("--min-kepercayaan", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help="Kepercayaan minimum (persen) baris sentimen.db yang dipakai (default: %(default)s)")
+    parser.add_argument("--toleransi", type=float, default=DEFAULT_TOLERANCE,
+                        help="Penurunan akurasi holdout yang masih diterima (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Latih dan validasi tanpa menyimpan apa pun")
+    parser.add_argument("--perbarui-pkl", action="store_true",
+                        help="Pasang juga sebagai set .pkl aktif (untuk app.py tanpa pointer bundle)")
+    parser.add_argument("--status", action="store_true", help="Tampilkan state terakhir lalu keluar")
+    args = parser.parse_args(argv)
+    if args.status:
+        print(json.dumps(load_state(args.state), ensure_ascii=False, indent=2))
+        return
+    with get_pool().connection() as conn:
+        report = update(conn, args.csv, args.state, args.pointer, args.min_kepercayaan, args.toleransi,
+                        args.dry_run, args.perbarui_pkl)
+    print(json.dumps(report, ensure_ascii=False))
+    sys.exit(1 if report["status"] == "ditolak" else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Potongan HTML statis halaman Streamlit, dibangun sekali per proses.
+
+app.py dijalankan ulang pada setiap interaksi, sedangkan modul ini hanya
+diimpor sekali, sehingga header, banner hasil, rekomendasi, dan footer tidak
+disusun ulang setiap rerun.
+
+CSS tema (static/style.css) dan logo disajikan oleh static file serving
+Streamlit (`server.enableStaticServing` di .streamlit/config.toml) dan
+di-cache browser; setiap rerun hanya mengirim satu tag `<link>` kecil. URL
+memuat hash isi file, jadi perubahan CSS langsung terlihat. Jika static
+serving dimatikan, CSS disisipkan inline seperti sebelumnya.
+"""
+import hashlib
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+STYLESHEET = "style.css"
+LOGO = "logo_sentimen.png"
+
+
+def _read_static(name):
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return f.read()
+
+
+def _versioned_url(name):
+    digest = hashlib.sha1(_read_static(name)).hexdigest()[:10]
+    return f"{STATIC_URL}/{name}?v={digest}"
+
+
+STYLESHEET_LINK = f'<link rel="stylesheet" href="{_versioned_url(STYLESHEET)}">'
+
+
+def stylesheet_html(static_serving=True):
+    """Tag untuk memuat CSS tema: `<link>` ke file statis, atau `<style>` inline sebagai cadangan."""
+    if static_serving:
+        return STYLESHEET_LINK
+    return f"<style>\n{_read_static(STYLESHEET).decode('utf-8')}\n</style>"
+
+
+_LOGO_HTML = f"""
+            <div class="logo-section">
+                <img src="{_versioned_url(LOGO)}" alt="">
+                <span>Analisis Sentimen</span>
+            </div>"""
+
+# --- Header ---
+HOME_HEADER_HTML = f"""
+        <div class="main-header">{_LOGO_HTML}
+            <div class="main-title">ANALISIS SENTIMEN</div>
+            <div class="subtitle">"SELAMAT DATANG DI SISTEM ANALISIS STATUS"</div>
+        </div>
+    """
+
+PAGE_HEADER_HTML = f"""
+        <div class="main-header">{_LOGO_HTML}
+        </div>
+    """
+
+# --- Hasil Sentimen: (banner, rekomendasi) per label ---
+# PASTIKAN LABEL INI SESUAI DENGAN `label_encoder.classes_` ANDA
+SENTIMENT_HTML = {
+    "positif": (
+        """
+            <div class="sentiment-positive">
+                🎉 Hasil Sentimen: POSITIF
+            </div>
+        """,
+        """
+        <div class="recommendation-box">
+            <strong>💡 Rekomendasi & Dukungan:</strong><br><br>
+            ✨ Luar biasa! Energi positif Anda sangat menginspirasi<br>
+            🌟 Terus jaga pikiran positif dan bagikan ke orang sekitar<br>
+            🎯 Luangkan waktu untuk hal-hal yang membuat Anda bahagia<br>
+            🚀 Momentum positif ini bisa dijadikan motivasi untuk pencapaian lebih besar
+        </div>
+        """,
+    ),
+    "negatif": (
+        """
+            <div class="sentiment-negative">
+                💔 Hasil Sentimen: NEGATIF
+            </div>
+        """,
+        """
+        <div class="recommendation-box">
+            <strong>🤗 Saran & Dukungan:</strong><br><br>
+            💪 Anda tidak sendirian, cobalah berbicara dengan orang terdekat<br>
+            🩺 Pertimbangkan konsultasi dengan psikolog profesional<br>
+            🧘 Luangkan waktu untuk self-care dan aktivitas yang menenangkan<br>
+            ❤️ Ingat, Anda berharga dan pantas mendapatkan bantuan serta perhatian
+        </div>
+        """,
+    ),
+    "netral": (
+        """
+            <div class="sentiment-neutral">
+                ⚖️ Hasil Sentimen: NETRAL
+            </div>
+        """,
+        """
+        <div class="recommendation-box">
+            <strong>📌 Catatan & Saran:</strong><br><br>
+            🔍 Status menunjukkan sentimen yang seimbang<br>
+            👁️ Tetap pantau perasaan dan jangan ragu untuk berbagi cerita<br>
+            ⚖️ Jaga keseimbangan hidup, tetaplah reflektif dan terbuka<br>
+            🌱 Momen netral adalah kesempatan untuk introspeksi diri
+        </div>
+        """,
+    ),
+}
+
+RESULT_TITLE_HTML = '<h2 class="section-title" style="color: white;">📊 HASIL ANALISIS</h2>'
+
+# --- Footer ---
+FOOTER_HTML = """
+        <div class='footer'>
+            © 2025 Sentimen Analisis Kesehatan Mental<br>
+            <small>Dibuat dengan ❤️ menggunakan Machine Learning & NLP</small>
+        </div>
+    """
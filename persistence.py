@@ -0,0 +1,334 @@
+"""Lapisan persistensi SQLite untuk tabel `status` di sentimen.db.
+
+- Pool koneksi per proses dalam mode WAL dengan pragma yang disetel, sehingga
+  pembaca tidak diblokir penulis dan setiap sesi Streamlit tidak antre di
+  belakang lock penulis tunggal SQLite.
+- `StatusWriter` menampung hasil prediksi lalu menyimpannya dengan satu
+  `executemany` per transaksi, di-flush berdasarkan ukuran buffer atau waktu.
+- Indeks `(id_user, id_status)` untuk halaman riwayat terbaru per pengguna, dan
+  indeks covering `(.., tanggal_status, label_sentimen, kepercayaan)` untuk
+  agregasi/ekspor per rentang tanggal.
+- Agregat harian (aggregates.py) dan indeks near-duplicate MinHash
+  (near_duplicate.py) diperbarui dalam transaksi insert yang sama, dan indeks
+  FTS5 (search.py) dijaga sinkron oleh trigger.
+- Tabel akun dan sesi login (user_store.py) ikut dibuat oleh `ensure_schema`.
+- Kolom `model_versi` mencatat versi model yang menghasilkan setiap baris;
+  near_duplicate.py hanya memakai ulang hasil dari versi model yang aktif.
+
+Konvensi kolom mengikuti data yang sudah ada: `label_sentimen` huruf besar
+(POSITIF/NETRAL/NEGATIF), `kepercayaan` dalam persen, `tanggal_status`
+berformat YYYY-MM-DD. Baris lama yang menyimpan `kepercayaan` sebagai
+float32/float64 mentah (BLOB) dikonversi ke REAL oleh `ensure_schema`.
+"""
+import atexit
+import contextlib
+import datetime
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+
+import aggregates
+import near_duplicate
+import search
+import user_store
+from sentiment_engine import BASE_DIR
+
+# Lokasi database bisa diganti lewat environment variable SENTIMEN_DB_PATH
+DB_PATH = os.environ.get("SENTIMEN_DB_PATH", os.path.join(BASE_DIR, "sentimen.db"))
+DEFAULT_POOL_SIZE = 4
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_DELAY = 0.5  # detik
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # Aman di WAL; fsync hanya saat checkpoint
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache per koneksi
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS status (
+            id_status INTEGER PRIMARY KEY AUTOINCREMENT,
+            isi_status TEXT,
+            label_sentimen TEXT,
+            kepercayaan REAL,
+            tanggal_status DATE
+        , id_user TEXT, model_versi TEXT)""",
+    # Riwayat per pengguna (urut tanggal) dan agregasi per pengguna tanpa menyentuh tabel
+    """CREATE INDEX IF NOT EXISTS idx_status_user_tanggal
+        ON status (id_user, tanggal_status, label_sentimen, kepercayaan)""",
+    # Halaman riwayat terbaru per pengguna: urutan indeks = ORDER BY id_status DESC, tanpa sort
+    "CREATE INDEX IF NOT EXISTS idx_status_user_id ON status (id_user, id_status)",
+    # Query rentang tanggal lintas pengguna (admin, ekspor)
+    """CREATE INDEX IF NOT EXISTS idx_status_tanggal
+        ON status (tanggal_status, label_sentimen, kepercayaan)""",
+)
+
+INSERT_SQL = ("INSERT INTO status (isi_status, label_sentimen, kepercayaan, tanggal_status, id_user, model_versi) "
+              "VALUES (?, ?, ?, ?, ?, ?)")
+
+
+def connect(path=DB_PATH):
+    """Membuka satu koneksi dengan pragma standar (autocommit; transaksi eksplisit)."""
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def ensure_schema(conn):
+    """Membuat tabel dan indeks bila belum ada (idempoten)."""
+    for statement in SCHEMA:
+        conn.execute(statement)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(status)")}
+    if "model_versi" not in columns:
+        try:
+            conn.execute("ALTER TABLE status ADD COLUMN model_versi TEXT")
+        except sqlite3.OperationalError:
+            pass  # Sudah ditambahkan oleh proses lain
+    aggregates.ensure_schema(conn)
+    normalize_confidence(conn)
+    search.ensure_schema(conn)
+    near_duplicate.ensure_schema(conn)
+    user_store.ensure_schema(conn)
+
+
+def decode_confidence(value):
+    """Nilai `kepercayaan` sebagai angka; baris lama menyimpannya sebagai float32/float64 mentah (BLOB)."""
+    if isinstance(value, bytes):
+        if len(value) == 4:
+            return round(struct.unpack("<f", value)[0], 2)
+        if len(value) == 8:
+            return round(struct.unpack("<d", value)[0], 2)
+        return None
+    return value
+
+
+def normalize_confidence(conn):
+    """Mengonversi `kepercayaan` BLOB lama menjadi REAL; mengembalikan jumlah baris yang diubah.
+
+    Agregat harian dihitung ulang karena rollup lama mungkin dibuat dari nilai BLOB tersebut.
+    """
+    rows = conn.execute("SELECT id_status, kepercayaan FROM status WHERE typeof(kepercayaan) = 'blob'").fetchall()
+    if rows:
+        with transaction(conn):
+            conn.executemany("UPDATE status SET kepercayaan = ? WHERE id_status = ?",
+                             [(decode_confidence(value), id_status) for id_status, value in rows])
+            aggregates.rebuild(conn)
+    return len(rows)
+
+
+@contextlib.contextmanager
+def transaction(conn, immediate=True):
+    """Transaksi eksplisit; BEGIN IMMEDIATE mengambil lock tulis di awal agar tidak deadlock."""
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite sederhana untuk satu proses."""
+
+    def __init__(self, path=DB_PATH, size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._pool = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+        with self.connection() as conn:
+            ensure_schema(conn)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return connect(self.path)
+        return self._pool.get()  # Tunggu koneksi dikembalikan
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def today():
+    return datetime.date.today().isoformat()
+
+
+def status_row(text, label, confidence=None, id_user=None, tanggal=None, model_version=None):
+    """Tuple baris `status` dari hasil prediksi (label kapital, kepercayaan dalam persen)."""
+    kepercayaan = round(confidence * 100, 2) if confidence is not None else None
+    return (text, str(label).upper(), kepercayaan, tanggal or today(), id_user, model_version)
+
+
+def insert_status_rows(conn, rows):
+    """Menulis baris (beserta agregat hariannya) di dalam transaksi yang sudah dibuka pemanggil."""
+    max_id_before = conn.execute("SELECT COALESCE(MAX(id_status), 0) FROM status").fetchone()[0]
+    conn.executemany(INSERT_SQL, rows)
+    aggregates.record_rows(conn, rows, max_id_before)
+    near_duplicate.index_pending(conn)
+
+
+class StatusWriter:
+    """Buffer hasil prediksi yang disimpan per batch dengan `executemany`.
+
+    Buffer di-flush jika jumlah baris mencapai `batch_size` atau baris tertua
+    sudah menunggu lebih dari `max_delay` detik (dicek oleh thread latar).
+    """
+
+    def __init__(self, pool, batch_size=DEFAULT_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="status-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        self.rows_written = 0
+        self.flushes = 0
+
+    def add(self, text, label, confidence=None, id_user=None, tanggal=None, model_version=None):
+        """Menambahkan satu hasil prediksi ke buffer."""
+        self.add_rows([status_row(text, label, confidence, id_user, tanggal, model_version)])
+
+    def add_rows(self, rows):
+        """Menambahkan baris `status` (tuple urutan INSERT_SQL) ke buffer."""
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.extend(rows)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Menyimpan seluruh isi buffer dalam satu transaksi; mengembalikan jumlah baris."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer, self._oldest = self._buffer, [], None
+            if not rows:
+                return 0
+            try:
+                with self.pool.connection() as conn, transaction(conn):
+                    self.write_rows(conn, rows)
+            except Exception:
+                # Kembalikan baris ke depan buffer agar tidak hilang
+                with self._lock:
+                    self._buffer[:0] = rows
+                    self._oldest = time.monotonic()
+                raise
+            self.rows_written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def write_rows(self, conn, rows):
+        insert_status_rows(conn, rows)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.max_delay / 2):
+            oldest = self._oldest
+            if oldest is not None and time.monotonic() - oldest >= self.max_delay:
+                try:
+                    self.flush()
+                except sqlite3.Error:
+                    pass  # Baris sudah dikembalikan ke buffer; dicoba lagi pada putaran berikutnya
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+# --- Query Baca ---
+def fetch_history(conn, id_user, limit=50, before_id=None, date_from=None, date_to=None):
+    """Riwayat status seorang pengguna, terbaru dulu (paginasi keyset lewat `before_id`).
+
+    Tanpa `date_to`, query ditelusuri lewat `idx_status_user_id` dari `before_id`
+    ke bawah dan berhenti setelah `limit` baris cocok, jadi biaya per halaman tidak
+    tumbuh bersama riwayat. Dengan `date_to`, baris yang lebih baru harus dilewati;
+    planner memakai `idx_status_user_tanggal` dan hanya mengurutkan baris di rentang itu.
+    """
+    clauses = ["id_user = ?"]
+    params = [id_user]
+    if date_from:
+        clauses.append("tanggal_status >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("tanggal_status <= ?")
+        params.append(date_to)
+    if before_id is not None:
+        clauses.append("id_status < ?")
+        params.append(before_id)
+    params.append(limit)
+    indexed = "" if date_to else "INDEXED BY idx_status_user_id "
+    sql = (f"SELECT id_status, isi_status, label_sentimen, kepercayaan, tanggal_status FROM status {indexed}"
+           f"WHERE {' AND '.join(clauses)} ORDER BY id_status DESC LIMIT ?")
+    return conn.execute(sql, params).fetchall()
+
+
+def count_by_label(conn, date_from, date_to, id_user=None):
+    """Jumlah status per label pada rentang tanggal (dijawab dari indeks covering)."""
+    if id_user is None:
+        sql = ("SELECT label_sentimen, COUNT(*) FROM status WHERE tanggal_status BETWEEN ? AND ? "
+               "GROUP BY label_sentimen")
+        return dict(conn.execute(sql, (date_from, date_to)).fetchall())
+    sql = ("SELECT label_sentimen, COUNT(*) FROM status WHERE id_user = ? "
+           "AND tanggal_status BETWEEN ? AND ? GROUP BY label_sentimen")
+    return dict(conn.execute(sql, (id_user, date_from, date_to)).fetchall())
+
+
+# --- Instans per Proses ---
+_pool = None
+_writer = None
+_pid = None
+_instance_lock = threading.Lock()
+
+
+def get_pool(path=DB_PATH):
+    """Pool koneksi milik proses ini (dibuat ulang setelah fork; `path` dari pemanggilan pertama)."""
+    global _pool, _writer, _pid
+    with _instance_lock:
+        if _pool is None or _pid != os.getpid():
+            _pool = ConnectionPool(path)
+            _writer = None
+            _pid = os.getpid()
+        return _pool
+
+
+def get_writer(path=DB_PATH):
+    """StatusWriter milik proses ini."""
+    global _writer
+    pool = get_pool(path)
+    with _instance_lock:
+        if _writer is None:
+            _writer = StatusWriter(pool)
+        return _writer
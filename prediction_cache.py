@@ -0,0 +1,82 @@
+"""Cache LRU berbatas untuk hasil prediksi sentimen.
+
+Kunci cache adalah hash dari teks yang sudah dinormalisasi (token hasil
+analyzer TF-IDF), sehingga variasi sepele seperti "capek bgt" dan
+"capek bgt!!" berbagi satu entri karena menghasilkan vektor yang sama.
+Satu cache melayani satu SentimentEngine, yang tidak pernah mengganti model
+di memorinya; saat file artefak berganti, pemanggil membuat engine baru
+(beserta cache baru), lihat `sentiment_engine.artifact_signature`.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 10000
+
+
+class PredictionCache:
+    """Cache LRU thread-safe dengan penghitung hit/miss/eviction."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size harus >= 1")
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(normalized_text, explain=0):
+        """Hash ringkas dari teks ternormalisasi (dan jumlah token penjelasan, jika diminta).
+
+        Prediksi dengan penjelasan top-k disimpan terpisah per k, agar permintaan
+        dengan k lebih besar tidak menerima daftar token yang lebih pendek.
+        """
+        data = normalized_text if not explain else f"{normalized_text}\x00{explain}"
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key, default=None, count_miss=True):
+        """Nilai untuk `key`; `count_miss=False` untuk pengecekan awal yang akan diikuti `get` biasa."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                if count_miss:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Ringkasan penghitung cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,134 @@
+"""Pencarian teks penuh (SQLite FTS5) atas riwayat status yang sudah dianalisis.
+
+Tabel virtual `status_fts` memakai tabel `status` sebagai external content
+sehingga teks tidak disimpan dua kali, dan dijaga sinkron lewat trigger
+insert/update/delete. Query menggabungkan MATCH dengan filter label, pengguna,
+dan rentang tanggal, lalu dipaginasi secara keyset (id_status menurun)
+sehingga halaman dalam tetap O(ukuran halaman).
+
+Contoh:
+    python search.py kerja --label negatif
+    python search.py "capek kuliah" --user Siti --after 120
+"""
+import argparse
+import re
+import sqlite3
+
+SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS status_fts USING fts5(
+            isi_status,
+            content='status',
+            content_rowid='id_status',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+    """CREATE TRIGGER IF NOT EXISTS status_fts_ai AFTER INSERT ON status BEGIN
+            INSERT INTO status_fts (rowid, isi_status) VALUES (new.id_status, new.isi_status);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS status_fts_ad AFTER DELETE ON status BEGIN
+            INSERT INTO status_fts (status_fts, rowid, isi_status) VALUES ('delete', old.id_status, old.isi_status);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS status_fts_au AFTER UPDATE OF isi_status ON status BEGIN
+            INSERT INTO status_fts (status_fts, rowid, isi_status) VALUES ('delete', old.id_status, old.isi_status);
+            INSERT INTO status_fts (rowid, isi_status) VALUES (new.id_status, new.isi_status);
+        END""",
+)
+
+DEFAULT_PAGE_SIZE = 20
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_schema(conn):
+    """Membuat indeks FTS5 beserta trigger; mengisi indeks dari data lama saat pertama dibuat.
+
+    Mengembalikan False jika SQLite tidak dikompilasi dengan FTS5.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'status_fts'").fetchone()
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e).lower():
+            return False
+        raise
+    if not exists:
+        conn.execute("INSERT INTO status_fts (status_fts) VALUES ('rebuild')")
+    return True
+
+
+def build_match_query(text):
+    """Mengubah input bebas pengguna menjadi query FTS5 yang aman (semua kata wajib ada).
+
+    Kata berakhiran `*` diperlakukan sebagai pencarian awalan (mis. `kerj*`).
+    """
+    terms = []
+    for raw in text.split():
+        prefix = raw.endswith("*")
+        for word in _WORD_RE.findall(raw):
+            terms.append(f'"{word}"')
+        if prefix and terms:
+            terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(conn, text, label=None, id_user=None, date_from=None, date_to=None,
+           limit=DEFAULT_PAGE_SIZE, after=None):
+    """Mencari status yang cocok dengan `text`, terbaru dulu.
+
+    `after` adalah id_status terakhir dari halaman sebelumnya (paginasi keyset).
+    Mengembalikan (baris, kursor_berikutnya); kursor None berarti halaman terakhir.
+    """
+    match = build_match_query(text)
+    if not match:
+        return [], None
+    clauses = ["status_fts MATCH ?"]
+    params = [match]
+    if after is not None:
+        clauses.append("f.rowid < ?")
+        params.append(after)
+    if label:
+        clauses.append("s.label_sentimen = ?")
+        params.append(label.upper())
+    if id_user:
+        clauses.append("s.id_user = ?")
+        params.append(id_user)
+    if date_from:
+        clauses.append("s.tanggal_status >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("s.tanggal_status <= ?")
+        params.append(date_to)
+    params.append(limit + 1)  # Satu baris ekstra untuk mengetahui ada halaman berikutnya
+    sql = ("SELECT s.id_status, s.isi_status, s.label_sentimen, s.kepercayaan, s.tanggal_status, s.id_user "
+           "FROM status_fts f JOIN status s ON s.id_status = f.rowid "
+           f"WHERE {' AND '.join(clauses)} ORDER BY f.rowid DESC LIMIT ?")
+    rows = conn.execute(sql, params).fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0]
+    return rows, None
+
+
+def main(argv=None):
+    from persistence import get_pool
+
+    parser = argparse.ArgumentParser(description="Cari riwayat status di sentimen.db.")
+    parser.add_argument("query", help="Kata yang dicari (semua kata wajib ada, akhiri dengan * untuk awalan)")
+    parser.add_argument("--label", help="Filter label: positif/netral/negatif")
+    parser.add_argument("--user", help="Filter id_user")
+    parser.add_argument("--from", dest="date_from", help="Tanggal awal YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="Tanggal akhir YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--after", type=int, help="Kursor halaman berikutnya (id_status)")
+    args = parser.parse_args(argv)
+    with get_pool().connection() as conn:
+        rows, cursor = search(conn, args.query, args.label, args.user, args.date_from, args.date_to,
+                              args.limit, args.after)
+    for id_status, isi, label, kepercayaan, tanggal, id_user in rows:
+        print(f"[{id_status}] {tanggal} {label} {kepercayaan} {id_user or '-'}: {isi}")
+    if cursor is not None:
+        print(f"-- halaman berikutnya: --after {cursor}")
+
+
+if __name__ == "__main__":
+    main()
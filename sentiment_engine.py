@@ -0,0 +1,351 @@
+"""Mesin inferensi sentimen yang bisa diimpor tanpa Streamlit.
+
+Modul ini membungkus tiga artefak yang juga dimuat oleh `load_nlp_resources()`
+di `app.py` (model Naive Bayes, TF-IDF vectorizer, dan LabelEncoder) sehingga
+worker batch maupun layanan lain bisa melakukan prediksi tanpa mengimpor
+Streamlit atau menjalankan blok CSS halaman.
+"""
+import collections
+import hashlib
+import math
+import os
+
+import numpy as np
+
+import metrics
+from fast_scorer import FastScorer
+from prediction_cache import PredictionCache
+
+# --- Lokasi Default Artefak Model ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "naivebayes_model.pkl")
+VECTORIZER_PATH = os.path.join(BASE_DIR, "tf-idf_vectorizer.pkl")
+LABEL_ENCODER_PATH = os.path.join(BASE_DIR, "label_encoder.pkl")
+# Pointer ke folder berisi ketiga file .pkl di atas (nama file sama); jika belum ada,
+# file di BASE_DIR yang dipakai. Lihat `publish_artifacts`.
+PKL_POINTER_PATH = os.environ.get("SENTIMEN_PKL_POINTER", os.path.join(BASE_DIR, "models", "CURRENT_PKL"))
+
+# --- Ambang Tinjauan ---
+# Prediksi ditandai untuk ditinjau moderator jika probabilitas kelas terpilih
+# di bawah ambang ini, atau selisihnya dengan kelas kedua terlalu tipis.
+LOW_CONFIDENCE_THRESHOLD = float(os.environ.get("SENTIMEN_LOW_CONFIDENCE", 0.5))
+LOW_MARGIN_THRESHOLD = float(os.environ.get("SENTIMEN_LOW_MARGIN", 0.1))
+
+# Hasil analisis satu teks. `probabilities` berurutan sesuai `SentimentEngine.classes`,
+# `margin` = probabilitas kelas terpilih dikurangi kelas kedua. `explanation`
+# hanya diisi jika diminta (lihat `Explanation`).
+Prediction = collections.namedtuple(
+    "Prediction", ["label", "confidence", "probabilities", "margin", "low_confidence", "explanation"],
+    defaults=(None,))
+
+# Kontribusi token terhadap prediksi: list (token, skor) yang mendorong ke label
+# terpilih (`toward`, skor > 0) dan yang menahannya (`against`, skor < 0),
+# relatif terhadap kelas kedua `versus`. Skor token j = tfidf_j * (flp[label, j] - flp[versus, j]),
+# sehingga jumlah semua skor + selisih prior = selisih log-likelihood kedua kelas.
+Explanation = collections.namedtuple("Explanation", ["toward", "against", "versus"])
+
+
+def artifact_paths(pointer_path=PKL_POINTER_PATH):
+    """(model, vectorizer, LabelEncoder) aktif: folder yang ditunjuk pointer, atau file di BASE_DIR."""
+    try:
+        with open(pointer_path, encoding="utf-8") as f:
+            target = f.read().strip()
+    except FileNotFoundError:
+        return MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH
+    if not os.path.isabs(target):
+        target = os.path.join(os.path.dirname(os.path.abspath(pointer_path)), target)
+    return tuple(os.path.join(target, os.path.basename(p)) for p in (MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH))
+
+
+def save_artifacts(model, tfidf, label_encoder, directory):
+    """Menulis ketiga artefak ke `directory` dengan nama file standar; mengembalikan path-nya."""
+    import joblib
+
+    os.makedirs(directory, exist_ok=True)
+    paths = tuple(os.path.join(directory, os.path.basename(p)) for p in (MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH))
+    for obj, path in zip((model, tfidf, label_encoder), paths):
+        joblib.dump(obj, path)
+    return paths
+
+
+def publish_artifacts(directory, pointer_path=PKL_POINTER_PATH):
+    """Mengarahkan pointer ke folder artefak .pkl secara atomik (tulis file sementara lalu `os.replace`).
+
+    Model, vectorizer, dan LabelEncoder berganti bersamaan: pembaca tidak pernah
+    melihat vectorizer baru dengan model lama. Folder tidak boleh diubah setelahnya.
+    """
+    for name in (MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH):
+        path = os.path.join(directory, os.path.basename(name))
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Artefak tidak lengkap: {path}")
+    pointer_dir = os.path.dirname(os.path.abspath(pointer_path))
+    os.makedirs(pointer_dir, exist_ok=True)
+    target = os.path.relpath(os.path.abspath(directory), pointer_dir)
+    tmp_path = f"{pointer_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(target + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, pointer_path)
+    return target
+
+
+def load_artifacts(model_path=None, vectorizer_path=None, label_encoder_path=None):
+    """Memuat model, TF-IDF vectorizer, dan LabelEncoder dari file .pkl.
+
+    Path yang tidak diberikan diambil dari set artefak aktif (`artifact_paths`).
+    """
+    import joblib  # Impor lambat: worker yang memakai bundle tidak perlu joblib/sklearn
+
+    active = artifact_paths()
+    model_path = model_path or active[0]
+    vectorizer_path = vectorizer_path or active[1]
+    label_encoder_path = label_encoder_path or active[2]
+
+    model = joblib.load(model_path)
+    tfidf = joblib.load(vectorizer_path)
+    label_encoder = joblib.load(label_encoder_path)
+    return model, tfidf, label_encoder
+
+
+def artifact_signature(*paths):
+    """(inode, mtime, ukuran) setiap file artefak; berubah setiap kali salah satu file diganti."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def artifact_version(*paths):
+    """Label versi dari isi file artefak: sama untuk file identik di proses mana pun."""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return f"pkl-{digest.hexdigest()[:12]}"
+
+
+class SentimentEngine:
+    """Pembungkus model + vectorizer + LabelEncoder dengan API prediksi batch.
+
+    Semua metode batch melakukan satu kali `tfidf.transform` untuk seluruh
+    teks lalu satu kali pemanggilan model atas matriks sparse hasilnya,
+    sehingga overhead Python per teks tidak lagi mendominasi.
+
+    Label, probabilitas, dan margin diturunkan dari satu kali perhitungan
+    log-likelihood gabungan (lihat `analyze`/`analyze_batch`).
+
+    Jika `cache` (PredictionCache) diberikan, `analyze`/`predict` memeriksa
+    cache lebih dulu sebelum menjalankan vectorize -> skor -> decode.
+    Prediksi satu teks memakai FastScorer (tanpa matriks sparse) bila model
+    mendukungnya.
+    """
+
+    def __init__(self, model, tfidf, label_encoder, cache=None):
+        self.model = model
+        self.tfidf = tfidf
+        self.label_encoder = label_encoder
+        self.cache = cache
+        self.version = None  # Label versi model (bundle atau `artifact_version`); disimpan bersama hasil
+        self.low_confidence_threshold = LOW_CONFIDENCE_THRESHOLD
+        self.low_margin_threshold = LOW_MARGIN_THRESHOLD
+        # Label string sesuai urutan kolom `predict_proba` model
+        self.classes = [str(c) for c in label_encoder.inverse_transform(model.classes_)]
+        # Analyzer vectorizer (lowercase + token_pattern) dipakai sebagai normalisasi kunci cache
+        self._analyzer = tfidf.build_analyzer()
+        self._feature_names = None  # Dibangun saat penjelasan token pertama kali diminta
+        try:
+            self.fast_scorer = FastScorer.from_artifacts(model, tfidf, self.classes)
+        except ValueError:
+            self.fast_scorer = None  # Model bukan MultinomialNB: pakai jalur sklearn
+
+    @classmethod
+    def from_files(cls, model_path=None, vectorizer_path=None, label_encoder_path=None, cache_size=None):
+        """Membuat engine langsung dari file artefak di disk (default: set aktif, lihat `artifact_paths`).
+
+        Artefak dibaca sekali; engine (dan PredictionCache-nya, jika `cache_size` > 0)
+        tidak mengikuti perubahan file sesudahnya. Pemanggil yang perlu memuat ulang
+        membandingkan `artifact_signature` lalu membuat engine baru.
+        """
+        active = artifact_paths()
+        paths = (model_path or active[0], vectorizer_path or active[1], label_encoder_path or active[2])
+        cache = PredictionCache(cache_size) if cache_size else None
+        engine = cls(*load_artifacts(*paths), cache=cache)
+        engine.version = artifact_version(*paths)
+        return engine
+
+    @classmethod
+    def from_bundle(cls, path, cache_size=None):
+        """Membuat engine dari bundle memory-map (lihat model_bundle.py) tanpa unpickle."""
+        from model_bundle import BundleLabelEncoder, BundleModel, BundleVectorizer, ModelBundle
+
+        bundle = ModelBundle(path)
+        cache = PredictionCache(cache_size) if cache_size else None
+        engine = cls(BundleModel(bundle), BundleVectorizer(bundle), BundleLabelEncoder(bundle), cache=cache)
+        engine.fast_scorer = FastScorer.from_bundle(bundle)
+        engine.version = bundle.version
+        return engine
+
+    def normalize(self, text):
+        """Bentuk normal teks: token hasil analyzer TF-IDF yang digabung spasi.
+
+        Dua teks dengan bentuk normal yang sama pasti menghasilkan vektor TF-IDF
+        yang sama, sehingga aman berbagi hasil prediksi.
+        """
+        return " ".join(self._analyzer(text))
+
+    def vectorize(self, texts):
+        """Mengubah daftar teks menjadi matriks sparse TF-IDF (satu kali transform)."""
+        with metrics.timer("vectorize"):
+            return self.tfidf.transform(list(texts))
+
+    def joint_log_likelihood(self, X):
+        """Skor log-likelihood gabungan (n_teks x n_kelas) dari matriks TF-IDF, dihitung sekali."""
+        with metrics.timer("model_score"):
+            if hasattr(self.model, "feature_log_prob_") and hasattr(self.model, "class_log_prior_"):
+                # Sama dengan MultinomialNB._joint_log_likelihood: X @ feature_log_prob_.T + prior
+                return np.asarray(X @ self.model.feature_log_prob_.T) + self.model.class_log_prior_
+            if hasattr(self.model, "predict_joint_log_proba"):
+                return self.model.predict_joint_log_proba(X)
+            return np.log(self.model.predict_proba(X))
+
+    def _decode(self, jll):
+        """Mengubah matriks log-likelihood menjadi list Prediction (label, probabilitas, margin)."""
+        with metrics.timer("label_decode"):
+            shifted = jll - jll.max(axis=1, keepdims=True)
+            proba = np.exp(shifted)
+            proba /= proba.sum(axis=1, keepdims=True)
+            order = np.argsort(-proba, axis=1, kind="stable")
+            rows = np.arange(len(proba))
+            best = order[:, 0]
+            confidence = proba[rows, best]
+            runner_up = proba[rows, order[:, 1]] if proba.shape[1] > 1 else np.zeros(len(proba))
+            margin = confidence - runner_up
+            low = (confidence < self.low_confidence_threshold) | (margin < self.low_margin_threshold)
+            return [
+                Prediction(self.classes[b], float(c), tuple(p), float(m), bool(f))
+                for b, c, p, m, f in zip(best.tolist(), confidence, proba.tolist(), margin, low)
+            ]
+
+    def decode_proba(self, proba):
+        """List Prediction dari matriks probabilitas (mis. gabungan skor segmen, lihat long_document.py)."""
+        return self._decode(np.log(np.maximum(np.asarray(proba, dtype=np.float64), 1e-300)))
+
+    def _decode_one(self, jll):
+        """Versi murni Python dari `_decode` untuk satu baris (jalur latensi rendah)."""
+        top = max(jll)
+        exps = [math.exp(s - top) for s in jll]
+        total = sum(exps)
+        proba = tuple(e / total for e in exps)
+        best = max(range(len(proba)), key=proba.__getitem__)
+        confidence = proba[best]
+        runner_up = max((p for i, p in enumerate(proba) if i != best), default=0.0)
+        margin = confidence - runner_up
+        low = confidence < self.low_confidence_threshold or margin < self.low_margin_threshold
+        return Prediction(self.classes[best], confidence, proba, margin, low)
+
+    # --- Penjelasan Token ---
+    def feature_names(self):
+        """Term per indeks fitur vectorizer."""
+        if self._feature_names is None:
+            self._feature_names = self.tfidf.get_feature_names_out()
+        return self._feature_names
+
+    def _explain(self, prediction, indices, values, top_k):
+        """Token pendorong/penahan dari baris TF-IDF yang sama dengan yang dipakai untuk prediksi.
+
+        Hanya untuk model dengan `feature_log_prob_` (MultinomialNB); selain itu None.
+        """
+        flp = getattr(self.model, "feature_log_prob_", None)
+        if flp is None or len(self.classes) < 2:
+            return None
+        with metrics.timer("explain"):
+            best = self.classes.index(prediction.label)
+            versus = max((c for c in range(len(self.classes)) if c != best),
+                         key=prediction.probabilities.__getitem__)
+            names = self.feature_names()
+            scored = sorted(
+                ((float(v) * (float(flp[best, j]) - float(flp[versus, j])), str(names[j]))
+                 for j, v in zip(indices, values)),
+                reverse=True)
+            toward = [(token, s) for s, token in scored[:top_k] if s > 0]
+            against = [(token, s) for s, token in reversed(scored[-top_k:]) if s < 0]
+            return Explanation(toward, against, self.classes[versus])
+
+    def _analyze_one(self, text, explain=0):
+        if self.fast_scorer is None:
+            return self.analyze_batch([text], explain)[0]
+        with metrics.timer("fast_score"):
+            features = self.fast_scorer.features(text)
+            prediction = self._decode_one(self.fast_scorer.score_features(features))
+        if explain:
+            explanation = self._explain(prediction, [f[0] for f in features], [f[1] for f in features], explain)
+            prediction = prediction._replace(explanation=explanation)
+        return prediction
+
+    def analyze(self, text, explain=0):
+        """Label, probabilitas per kelas, margin, dan tanda tinjauan untuk satu teks.
+
+        Semuanya diturunkan dari satu kali perhitungan log-likelihood (melalui cache jika aktif).
+        `explain` > 0 menambahkan `Explanation` berisi maksimal sebanyak itu token per arah.
+        """
+        if self.cache is None:
+            return self._analyze_one(text, explain)
+        with metrics.timer("cache_lookup"):
+            key = self.cache.make_key(self.normalize(text), explain)
+            prediction = self.cache.get(key)
+        if prediction is None:
+            prediction = self._analyze_one(text, explain)
+            self.cache.put(key, prediction)
+        return prediction
+
+    def cached(self, text, explain=0):
+        """Prediction yang sudah ada di cache untuk `text`, atau None (tanpa menjalankan model)."""
+        if self.cache is None:
+            return None
+        with metrics.timer("cache_lookup"):
+            return self.cache.get(self.cache.make_key(self.normalize(text), explain), count_miss=False)
+
+    def analyze_batch(self, texts, explain=0):
+        """Versi batch `analyze`: satu transform + satu perkalian matriks untuk semua teks.
+
+        Penjelasan token (`explain` > 0) dibaca dari baris matriks sparse yang sama.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        X = self.vectorize(texts)
+        predictions = self._decode(self.joint_log_likelihood(X))
+        if not explain:
+            return predictions
+        X = X.tocsr()
+        return [
+            p._replace(explanation=self._explain(
+                p, X.indices[X.indptr[i]:X.indptr[i + 1]], X.data[X.indptr[i]:X.indptr[i + 1]], explain))
+            for i, p in enumerate(predictions)
+        ]
+
+    def predict(self, text):
+        """Memprediksi label sentimen untuk satu teks (melalui cache jika aktif)."""
+        return self.analyze(text).label
+
+    def predict_batch(self, texts):
+        """Memprediksi label sentimen untuk banyak teks sekaligus."""
+        return [p.label for p in self.analyze_batch(texts)]
+
+    def predict_proba_batch(self, texts):
+        """Mengembalikan matriks probabilitas (n_teks x n_kelas) sesuai urutan `self.classes`."""
+        predictions = self.analyze_batch(texts)
+        if not predictions:
+            return np.empty((0, len(self.classes)))
+        return np.array([p.probabilities for p in predictions])
+
+    def predict_with_confidence_batch(self, texts):
+        """Mengembalikan (label, kepercayaan) per teks; kepercayaan = probabilitas kelas terpilih."""
+        predictions = self.analyze_batch(texts)
+        return [p.label for p in predictions], [p.confidence for p in predictions]
@@ -0,0 +1,250 @@
+"""Model read-only yang dibagi oleh beberapa proses Streamlit / worker.
+
+`@st.cache_resource` hanya menghapus duplikasi di dalam satu proses. Modul ini
+menyediakan dua mekanisme berbagi:
+
+1. Bundle memory-map (model_bundle.py): setiap proses memetakan file yang sama
+   sehingga halaman model berada satu kali di page cache OS.
+2. Preloader fork: proses induk memuat bundle sekali lalu mem-fork N replika
+   Streamlit; replika mewarisi engine yang sudah dimuat (copy-on-write).
+
+Versi model aktif ditunjuk oleh file pointer (default `models/CURRENT`).
+`publish` mengganti pointer secara atomik dan setiap proses menukar engine-nya
+pada permintaan berikutnya tanpa restart.
+
+Contoh:
+    python shared_model.py publish models/sentimen-v2.bundle
+    python shared_model.py serve --replicas 4 --base-port 8501
+    python shared_model.py memory
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from model_bundle import DEFAULT_BUNDLE_DIR
+from prediction_cache import DEFAULT_MAX_SIZE
+from sentiment_engine import SentimentEngine
+
+DEFAULT_POINTER_PATH = os.path.join(DEFAULT_BUNDLE_DIR, "CURRENT")
+POINTER_ENV = "SENTIMEN_MODEL_POINTER"
+
+
+class ModelRegistry:
+    """Menyimpan engine versi aktif dan menukarnya saat file pointer berubah."""
+
+    def __init__(self, pointer_path=DEFAULT_POINTER_PATH, check_interval=1.0, cache_size=None):
+        self.pointer_path = pointer_path
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._engine = None
+        self._bundle_path = None
+        self._pointer_stat = None
+        self._next_check = 0.0
+        self.swaps = 0
+
+    def _resolve(self):
+        with open(self.pointer_path, encoding="utf-8") as f:
+            target = f.read().strip()
+        if not os.path.isabs(target):
+            target = os.path.join(os.path.dirname(os.path.abspath(self.pointer_path)), target)
+        return target
+
+    def _pointer_signature(self):
+        st = os.stat(self.pointer_path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def current_engine(self):
+        """Engine versi aktif; memuat ulang bila pointer berganti sejak pengecekan terakhir.
+
+        Permintaan yang sedang berjalan tetap memegang referensi engine lama,
+        sehingga penukaran tidak memutus prediksi yang sedang berlangsung.
+        """
+        engine = self._engine
+        now = time.monotonic()
+        if engine is not None and now < self._next_check:
+            return engine
+        with self._lock:
+            if self._engine is not None and now < self._next_check:
+                return self._engine
+            self._next_check = now + self.check_interval
+            signature = self._pointer_signature()
+            if self._engine is None or signature != self._pointer_stat:
+                bundle_path = self._resolve()
+                if self._engine is None or bundle_path != self._bundle_path:
+                    self._engine = SentimentEngine.from_bundle(bundle_path, cache_size=self.cache_size)
+                    if self._bundle_path is not None:
+                        self.swaps += 1
+                    self._bundle_path = bundle_path
+                self._pointer_stat = signature
+            return self._engine
+
+    @property
+    def bundle_path(self):
+        return self._bundle_path
+
+    def warm(self):
+        """Memuat engine dan menyentuh seluruh halaman bundle agar masuk page cache."""
+        engine = self.current_engine()
+        bundle = engine.model.bundle
+        for name in bundle.header["arrays"]:
+            getattr(bundle, name).sum()
+        return engine
+
+
+def publish(bundle_path, pointer_path=DEFAULT_POINTER_PATH):
+    """Mengarahkan pointer ke bundle baru secara atomik (tulis file sementara lalu `os.replace`)."""
+    from model_bundle import ModelBundle
+
+    ModelBundle(bundle_path)  # Validasi bundle sebelum dipublikasikan
+    pointer_dir = os.path.dirname(os.path.abspath(pointer_path))
+    os.makedirs(pointer_dir, exist_ok=True)
+    target = os.path.relpath(os.path.abspath(bundle_path), pointer_dir)
+    tmp_path = f"{pointer_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(target + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, pointer_path)
+    return target
+
+
+# --- Registry Tingkat Proses ---
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def active_registry():
+    """Registry bersama proses ini, atau None jika mode berbagi model tidak aktif.
+
+    Mode aktif bila proses di-fork oleh `serve` (registry diwarisi) atau bila
+    environment variable SENTIMEN_MODEL_POINTER menunjuk file pointer.
+    """
+    global _registry
+    if _registry is not None:
+        return _registry
+    pointer_path = os.environ.get(POINTER_ENV)
+    if not pointer_path:
+        return None
+    with _registry_lock:
+        if _registry is None:
+            cache_size = int(os.environ.get("SENTIMEN_CACHE_SIZE", DEFAULT_MAX_SIZE)) or None
+            _registry = ModelRegistry(pointer_path, cache_size=cache_size)
+    return _registry
+
+
+# --- Laporan Memori ---
+def mapping_memory(path, pid="self"):
+    """Rss, Pss, dan Shared (kB) untuk pemetaan file `path` pada suatu proses (Linux)."""
+    path = os.path.realpath(path)
+    totals = {"rss_kb": 0, "pss_kb": 0, "shared_kb": 0}
+    current = False
+    try:
+        with open(f"/proc/{pid}/smaps", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                if "-" in parts[0] and not parts[0].endswith(":"):
+                    current = len(parts) >= 6 and parts[-1] == path
+                elif current:
+                    key = parts[0]
+                    if key == "Rss:":
+                        totals["rss_kb"] += int(parts[1])
+                    elif key == "Pss:":
+                        totals["pss_kb"] += int(parts[1])
+                    elif key in ("Shared_Clean:", "Shared_Dirty:"):
+                        totals["shared_kb"] += int(parts[1])
+    except FileNotFoundError:
+        return None  # Bukan Linux atau proses sudah berhenti
+    return totals
+
+
+def memory_report(bundle_path, pid="self"):
+    """Memori residen model yang dihemat satu replika berkat pemetaan bersama.
+
+    `saved_kb` = Rss - Pss: bagian halaman model yang ditanggung bersama
+    replika lain alih-alih disalin di heap proses ini.
+    """
+    usage = mapping_memory(bundle_path, pid)
+    if usage is None:
+        return None
+    usage["saved_kb"] = usage["rss_kb"] - usage["pss_kb"]
+    usage["bundle_kb"] = os.path.getsize(bundle_path) // 1024
+    return usage
+
+
+# --- Preloader Fork ---
+def serve(replicas, base_port, script, pointer_path=DEFAULT_POINTER_PATH):
+    """Memuat model sekali lalu mem-fork `replicas` server Streamlit (copy-on-write)."""
+    global _registry
+    cache_size = int(os.environ.get("SENTIMEN_CACHE_SIZE", DEFAULT_MAX_SIZE)) or None
+    _registry = ModelRegistry(pointer_path, cache_size=cache_size)
+    _registry.warm()
+    children = []
+    for i in range(replicas):
+        pid = os.fork()
+        if pid == 0:
+            from streamlit.web import bootstrap
+
+            port = base_port + i
+            flag_options = {"server.port": port, "server.headless": True}
+            bootstrap.load_config_options(flag_options=flag_options)
+            bootstrap.run(script, False, [], flag_options)
+            os._exit(0)
+        children.append(pid)
+        print(f"Replika {i + 1} (pid {pid}) di port {base_port + i}", file=sys.stderr)
+
+    def _stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Berbagi model read-only antar proses.")
+    parser.add_argument("--pointer", default=os.environ.get(POINTER_ENV, DEFAULT_POINTER_PATH),
+                        help="File pointer versi model aktif")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_publish = sub.add_parser("publish", help="Aktifkan bundle baru secara atomik")
+    p_publish.add_argument("bundle")
+    p_serve = sub.add_parser("serve", help="Preload model lalu fork replika Streamlit")
+    p_serve.add_argument("--replicas", type=int, default=2)
+    p_serve.add_argument("--base-port", type=int, default=8501)
+    p_serve.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
+    p_memory = sub.add_parser("memory", help="Laporan memori model untuk proses tertentu")
+    p_memory.add_argument("pids", nargs="*", help="PID replika (default: proses ini)")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        target = publish(args.bundle, args.pointer)
+        print(f"Pointer {args.pointer} -> {target}")
+    elif args.command == "serve":
+        os.environ[POINTER_ENV] = os.path.abspath(args.pointer)
+        serve(args.replicas, args.base_port, args.script, args.pointer)
+    else:
+        registry = ModelRegistry(args.pointer)
+        registry.warm()
+        reports = {pid: memory_report(registry.bundle_path, pid) for pid in (args.pids or ["self"])}
+        print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    # Jalankan lewat modul bernama agar registry hasil preload terlihat oleh app.py
+    import shared_model
+
+    shared_model.main()
@@ -0,0 +1,7 @@
+"""Konfigurasi pytest: modul aplikasi berada di root repositori (bukan paket)."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,37 @@
+"""Paritas FastScorer dengan pipeline sklearn (TF-IDF + MultinomialNB) atas sentimen_status.csv."""
+import os
+
+import numpy as np
+import pytest
+
+from batch_score import iter_csv_rows
+from fast_scorer import FastScorer
+from sentiment_engine import BASE_DIR, LABEL_ENCODER_PATH, MODEL_PATH, VECTORIZER_PATH, load_artifacts
+
+CSV_PATH = os.path.join(BASE_DIR, "sentimen_status.csv")
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return [text for text, _ in iter_csv_rows(CSV_PATH)]
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    return load_artifacts(MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH)
+
+
+def test_fast_scorer_matches_sklearn_on_corpus(corpus, artifacts):
+    model, tfidf, label_encoder = artifacts
+    classes = [str(c) for c in label_encoder.inverse_transform(model.classes_)]
+    scorer = FastScorer.from_artifacts(model, tfidf, classes)
+
+    X = tfidf.transform(corpus)
+    expected_labels = [str(c) for c in label_encoder.inverse_transform(model.predict(X))]
+    expected_proba = model.predict_proba(X)
+
+    assert corpus
+    for i, text in enumerate(corpus):
+        assert scorer.predict(text) == expected_labels[i], text
+        np.testing.assert_allclose(scorer.predict_proba(text), expected_proba[i], rtol=0, atol=1e-9,
+                                   err_msg=text)
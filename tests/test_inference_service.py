@@ -0,0 +1,31 @@
+"""Validasi body /predict pada inference_service.py."""
+import asyncio
+import json
+
+import pytest
+
+from inference_service import InferenceService
+
+
+class _RecordingBatcher:
+    def __init__(self):
+        self.texts = []
+
+    async def predict(self, text):
+        self.texts.append(text)
+        raise AssertionError("Teks tidak valid tidak boleh sampai ke model")
+
+
+@pytest.mark.parametrize("payload", [
+    {"text": None},
+    {"text": 123},
+    {"text": ["capek"]},
+    {"texts": ["capek", 1]},
+    {"texts": [None]},
+])
+def test_non_string_texts_are_rejected(payload):
+    batcher = _RecordingBatcher()
+    status, body = asyncio.run(InferenceService(batcher).handle_predict(json.dumps(payload).encode("utf-8")))
+    assert status == 400
+    assert "error" in body
+    assert batcher.texts == []
@@ -0,0 +1,50 @@
+"""Validasi baris JSONL pada ingest_worker.py."""
+import io
+import json
+
+import pytest
+
+import ingest_worker
+from batch_score import load_engine
+from persistence import ConnectionPool
+
+
+@pytest.mark.parametrize("record", [
+    {"text": "capek", "id_user": {"x": 1}},
+    {"text": "capek", "id_user": 7},
+    {"text": "capek", "tanggal": "kemarin"},
+    {"text": "capek", "tanggal": 20250701},
+    {"text": "capek", "tanggal": "2025-02-30"},
+    {"text": None},
+    ["capek"],
+])
+def test_parse_line_rejects_malformed_fields(record):
+    assert ingest_worker.parse_line(json.dumps(record).encode("utf-8")) is None
+
+
+def test_parse_line_accepts_valid_record():
+    line = json.dumps({"text": "senang", "id_user": "siti", "tanggal": "2025-07-01"}).encode("utf-8")
+    assert ingest_worker.parse_line(line) == ("senang", "siti", "2025-07-01")
+    assert ingest_worker.parse_line(b'{"isi_status": "senang", "id_user": null}') == ("senang", None, None)
+
+
+def test_malformed_line_is_skipped_and_checkpoint_advances(tmp_path):
+    source = tmp_path / "masuk.jsonl"
+    lines = [
+        {"text": "senang sekali hari ini", "id_user": "siti"},
+        {"text": "capek", "id_user": {"x": 1}},
+        {"text": "aku kesal", "id_user": "siti", "tanggal": "2025-07-01"},
+    ]
+    source.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+    pool = ConnectionPool(str(tmp_path / "sentimen.db"))
+    worker = ingest_worker.IngestWorker(str(source), load_engine(), pool, log=io.StringIO())
+
+    assert worker.poll() == 2
+    assert worker.skipped == 1
+    with pool.connection() as conn:
+        _, offset, rows = ingest_worker.load_checkpoint(conn, worker.source)
+        stored = conn.execute("SELECT isi_status, id_user, tanggal_status FROM status ORDER BY id_status").fetchall()
+    assert (offset, rows) == (source.stat().st_size, 2)
+    assert stored[1] == ("aku kesal", "siti", "2025-07-01")
+    assert worker.poll() == 0  # Batch tidak diulang setelah restart/poll berikutnya
+    pool.close()
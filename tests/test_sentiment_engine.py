@@ -0,0 +1,23 @@
+"""Cache prediksi SentimentEngine."""
+import pytest
+
+from sentiment_engine import LABEL_ENCODER_PATH, MODEL_PATH, VECTORIZER_PATH, SentimentEngine
+
+TEXT = "aku capek banget hari ini tapi tetap semangat kerja"
+
+
+@pytest.fixture
+def engine():
+    return SentimentEngine.from_files(MODEL_PATH, VECTORIZER_PATH, LABEL_ENCODER_PATH, cache_size=100)
+
+
+def _explained_tokens(prediction):
+    return len(prediction.explanation.toward) + len(prediction.explanation.against)
+
+
+def test_cached_explanation_follows_requested_k(engine):
+    short = engine.analyze(TEXT, explain=2)
+    longer = engine.analyze(TEXT, explain=5)
+    assert _explained_tokens(longer) > _explained_tokens(short)
+    assert engine.analyze(TEXT, explain=5) is longer  # Hit cache untuk k yang sama
+    assert engine.analyze(TEXT).explanation is None
@@ -0,0 +1,12 @@
+"""Normalisasi teks (text_normalizer.py)."""
+from text_normalizer import TextNormalizer
+
+
+def test_repeated_letters_are_reduced():
+    assert TextNormalizer()("senaaaang bangettt") == "senang banget"
+
+
+def test_numbers_pass_through_unchanged():
+    normalizer = TextNormalizer()
+    assert normalizer("Tahun 2000 gajinya 1000000") == "tahun 2000 gajinya 1000000"
+    assert normalizer("jam 111 lewat") == "jam 111 lewat"
@@ -0,0 +1,188 @@
+"""Normalisasi teks status berbahasa Indonesia sebelum TF-IDF.
+
+Status Facebook penuh singkatan ("bgt", "gk", "yg"), huruf berulang
+("capeeek") dan emoji yang memecah kosakata. `TextNormalizer` dipasang sebagai
+`preprocessor` TfidfVectorizer sehingga langkah yang sama persis berjalan saat
+pelatihan (train.py), prediksi sklearn, FastScorer, maupun bundle model:
+
+1. huruf kecil, URL dan mention diganti token tetap (regex dikompilasi sekali);
+2. emoji umum dipetakan ke token kata (`emosenang`, `emosedih`, `emomarah`),
+   sisanya dibuang;
+3. huruf yang berulang tiga kali atau lebih dipadatkan ("capeeek" -> "capek");
+4. per token: kamus slang lalu stemmer opsional (Sastrawi).
+
+Langkah per token disimpan di memo terbatas milik instans sehingga token yang
+sudah pernah dilihat (hampir semua token pada trafik normal) cukup satu lookup
+dict; stemmer yang lambat hanya berjalan sekali per token unik. `transform`
+menormalisasi satu batch dengan menyelesaikan token unik batch lebih dulu.
+
+Objek bisa di-pickle bersama vectorizer; memo tidak ikut disimpan.
+
+Contoh:
+    python text_normalizer.py "gk tau knp capeeek bgt 😭"
+"""
+import argparse
+import re
+import threading
+
+DEFAULT_MEMO_SIZE = 50000
+
+# Kamus slang/singkatan umum status media sosial -> bentuk baku
+DEFAULT_SLANG = {
+    "gk": "tidak", "ga": "tidak", "gak": "tidak", "ngga": "tidak", "nggak": "tidak", "engga": "tidak",
+    "enggak": "tidak", "tdk": "tidak", "g": "tidak", "kagak": "tidak", "nda": "tidak", "ndak": "tidak",
+    "bgt": "banget", "bngt": "banget", "bgtt": "banget", "yg": "yang", "dgn": "dengan", "dg": "dengan",
+    "utk": "untuk", "tuk": "untuk", "sy": "saya", "aq": "aku", "ak": "aku", "gw": "gue", "gua": "gue",
+    "lu": "lo", "km": "kamu", "kmu": "kamu", "kalo": "kalau", "klo": "kalau", "kl": "kalau",
+    "krn": "karena", "karna": "karena", "tp": "tapi", "tpi": "tapi", "jg": "juga", "jgn": "jangan",
+    "sdh": "sudah", "udh": "sudah", "udah": "sudah", "dah": "sudah", "blm": "belum", "blom": "belum",
+    "lg": "lagi", "lgi": "lagi", "aja": "saja", "aj": "saja", "sm": "sama", "ama": "sama",
+    "knp": "kenapa", "napa": "kenapa", "gmn": "gimana", "gmna": "gimana", "bgmn": "bagaimana",
+    "trs": "terus", "trus": "terus", "bs": "bisa", "bsa": "bisa", "dr": "dari", "dri": "dari",
+    "org": "orang", "orng": "orang", "hr": "hari", "skrg": "sekarang", "skrng": "sekarang",
+    "bkn": "bukan", "emg": "memang", "emang": "memang", "mmg": "memang", "sll": "selalu",
+    "slalu": "selalu", "cm": "cuma", "cuman": "cuma", "mksh": "makasih", "makasi": "makasih",
+    "trims": "terima kasih", "thx": "terima kasih", "tq": "terima kasih", "bnyk": "banyak",
+    "byk": "banyak", "sbnrnya": "sebenarnya", "sebenernya": "sebenarnya", "pdhl": "padahal",
+    "dpt": "dapat", "dapet": "dapat", "mo": "mau", "pengen": "ingin", "pgn": "ingin",
+    "pingin": "ingin", "gpp": "tidak apa apa", "gapapa": "tidak apa apa", "gaes": "teman",
+    "wkwk": "tertawa", "wkwkwk": "tertawa", "haha": "tertawa", "hahaha": "tertawa", "hehe": "tertawa",
+    "cape": "capek", "cpk": "capek", "sdih": "sedih", "bete": "kesal", "bt": "kesal",
+    "mager": "malas gerak", "baper": "bawa perasaan",
+}
+
+EMOJI_GROUPS = {
+    "emosenang": "😀😁😂🤣😃😄😅😆😊😍🥰😘😋😎🤗🥳❤💕💖💗💙💚💛💜👍👏🙌✨🎉",
+    "emosedih": "😢😭😞😔😟😕🙁☹😣😖😫😩🥺💔😿",
+    "emomarah": "😠😡🤬👿💢😤",
+}
+
+_EMOJI_TO_TOKEN = {ch: token for token, chars in EMOJI_GROUPS.items() for ch in chars}
+# Blok Unicode emoji/simbol yang dibuang setelah pemetaan di atas
+_EMOJI_RE = re.compile("[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\uFE0F\u200D]")
+_MAPPED_EMOJI_RE = re.compile("|".join(sorted(map(re.escape, _EMOJI_TO_TOKEN), key=len, reverse=True)))
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_REPEAT_RE = re.compile(r"([^\W\d_])\1{2,}")  # Huruf saja: angka seperti 2000 tidak dipendekkan
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class TextNormalizer:
+    """Preprocessor TfidfVectorizer: teks mentah -> teks ternormalisasi (token dipisah spasi)."""
+
+    def __init__(self, slang=None, stem=False, reduce_repeats=True, map_emoji=True,
+                 memo_size=DEFAULT_MEMO_SIZE):
+        self.slang = dict(DEFAULT_SLANG if slang is None else slang)
+        self.stem = stem
+        self.reduce_repeats = reduce_repeats
+        self.map_emoji = map_emoji
+        self.memo_size = memo_size
+        self._init_runtime()
+
+    def _init_runtime(self):
+        self._memo = {}
+        self._lock = threading.Lock()
+        self._stemmer = None
+        if self.stem:
+            self._stemmer = _load_stemmer()
+
+    # --- Pickle: memo, lock, dan stemmer dibangun ulang saat dimuat ---
+    def __getstate__(self):
+        return {"slang": self.slang, "stem": self.stem, "reduce_repeats": self.reduce_repeats,
+                "map_emoji": self.map_emoji, "memo_size": self.memo_size}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def __repr__(self):
+        return (f"TextNormalizer(slang={len(self.slang)} entri, stem={self.stem}, "
+                f"reduce_repeats={self.reduce_repeats}, map_emoji={self.map_emoji})")
+
+    def get_config(self):
+        """Konfigurasi JSON-friendly (disimpan di header bundle model)."""
+        return self.__getstate__()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    # --- Normalisasi ---
+    def _clean(self, text):
+        """Langkah tingkat teks (regex), sebelum pemecahan token."""
+        text = text.lower()
+        # Cek murah dulu: sebagian besar status tidak berisi URL, mention, atau emoji
+        if "http" in text or "www." in text:
+            text = _URL_RE.sub(" tautan ", text)
+        if "@" in text:
+            text = _MENTION_RE.sub(" ", text)
+        if text.isascii():
+            return text
+        if self.map_emoji:
+            text = _MAPPED_EMOJI_RE.sub(lambda m: f" {_EMOJI_TO_TOKEN[m.group()]} ", text)
+        return _EMOJI_RE.sub(" ", text)
+
+    def _normalize_token(self, token):
+        """Langkah mahal per token (tanpa memo)."""
+        if self.reduce_repeats:
+            token = _REPEAT_RE.sub(r"\1", token)
+        token = self.slang.get(token, token)
+        if self._stemmer is not None:
+            token = " ".join(self._stemmer.stem(part) for part in token.split())
+        return token
+
+    def _resolve(self, tokens):
+        """Bentuk normal untuk setiap token lewat memo terbatas."""
+        memo = self._memo
+        fresh = {}
+        out = []
+        for token in tokens:
+            value = memo.get(token)
+            if value is None:
+                value = fresh.get(token)
+                if value is None:
+                    value = fresh[token] = self._normalize_token(token)
+            out.append(value)
+        if fresh:
+            with self._lock:
+                for token, value in fresh.items():
+                    if len(memo) >= self.memo_size:
+                        memo.pop(next(iter(memo)), None)  # Buang entri tertua
+                    memo[token] = value
+        return out
+
+    def __call__(self, text):
+        return " ".join(self._resolve(_TOKEN_RE.findall(self._clean(text))))
+
+    def transform(self, texts):
+        """Normalisasi satu batch: token unik seluruh batch diselesaikan sekali."""
+        token_lists = [_TOKEN_RE.findall(self._clean(text)) for text in texts]
+        unique = list(dict.fromkeys(t for tokens in token_lists for t in tokens))
+        mapping = dict(zip(unique, self._resolve(unique)))
+        return [" ".join(mapping[t] for t in tokens) for tokens in token_lists]
+
+    def memo_stats(self):
+        return {"size": len(self._memo), "max_size": self.memo_size}
+
+
+def _load_stemmer():
+    """Stemmer Sastrawi (dependensi opsional: `pip install PySastrawi`)."""
+    try:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    except ImportError as e:
+        raise ImportError("Stemming membutuhkan paket PySastrawi (pip install PySastrawi)") from e
+    return StemmerFactory().create_stemmer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coba normalisasi teks status.")
+    parser.add_argument("text", nargs="+", help="Teks yang dinormalisasi")
+    parser.add_argument("--stem", action="store_true", help="Aktifkan stemmer Sastrawi")
+    args = parser.parse_args(argv)
+    normalizer = TextNormalizer(stem=args.stem)
+    for text in args.text:
+        print(normalizer(text))
+
+
+if __name__ == "__main__":
+    main()
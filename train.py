@@ -0,0 +1,212 @@
+"""Pelatihan ulang TF-IDF + classifier yang reprodusibel dari sentimen_status.csv.
+
+Menghasilkan tiga artefak yang dimuat `load_nlp_resources()` di app.py
+(`naivebayes_model.pkl`, `tf-idf_vectorizer.pkl`, `label_encoder.pkl`) beserta
+laporan metrik JSON.
+
+- Pencarian hyperparameter vectorizer dan classifier memakai GridSearchCV
+  dengan validasi silang berstrata, dijalankan paralel di semua core (`--jobs`).
+- Pipeline memakai `joblib.Memory`: hasil fit TF-IDF untuk setiap kombinasi
+  konfigurasi preprocessing + lipatan data disimpan di disk (`--cache-dir`),
+  sehingga langkah yang tidak berubah tidak dihitung ulang antar kandidat
+  maupun antar jalankan.
+- Normalisasi teks (text_normalizer.TextNormalizer) ikut dicari sebagai
+  `preprocessor` vectorizer; `--stem` menambahkan varian dengan stemmer.
+- Metrik dilaporkan pada test split yang tidak ikut pencarian; model akhir lalu
+  dilatih ulang dengan parameter terbaik di seluruh data.
+
+Secara default hanya MultinomialNB yang dicari karena FastScorer dan bundle
+model (model_bundle.py) mengandalkan `feature_log_prob_`, dan online_update.py
+memakai `partial_fit`. `--model semua` ikut mencoba Logistic Regression; jika
+LR yang menang, artefaknya tetap ditulis tetapi `--pasang` ditolak.
+
+Waktu pencarian dengan 1 core pada sentimen_status.csv (~1000 baris): sekitar
+16 detik untuk grid default (320 fit) dan 35-40 detik dengan `--model semua`.
+Cache joblib hanya menghemat fit TF-IDF; transform lipatan uji saat skoring
+tetap dihitung, jadi jalankan ulang dengan cache hangat tidak jauh lebih cepat.
+
+Contoh:
+    python train.py                        # artefak ke models/latih-<versi>/
+    python train.py --pasang               # jadikan set artefak aktif app.py (pointer models/CURRENT_PKL)
+    python train.py --model semua --jobs 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from batch_score import iter_csv_rows
+from model_bundle import DEFAULT_BUNDLE_DIR, export_bundle
+from sentiment_engine import BASE_DIR, publish_artifacts, save_artifacts
+from text_normalizer import TextNormalizer
+
+DEFAULT_CSV_PATH = os.path.join(BASE_DIR, "sentimen_status.csv")
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "train")
+DEFAULT_TEST_SIZE = 0.2
+DEFAULT_FOLDS = 5
+RANDOM_STATE = 42
+
+# Ruang pencarian preprocessing (sama untuk semua classifier). Preprocessor
+# TextNormalizer ikut tersimpan di vectorizer sehingga serving memakai normalisasi yang sama.
+VECTORIZER_GRID = {
+    "tfidf__preprocessor": [None, TextNormalizer()],
+    "tfidf__ngram_range": [(1, 1), (1, 2)],
+    "tfidf__sublinear_tf": [False, True],
+    "tfidf__min_df": [1, 2],
+}
+
+CLASSIFIER_GRIDS = {
+    "nb": {"clf": [MultinomialNB()], "clf__alpha": [0.1, 0.3, 0.5, 1.0]},
+    "lr": {"clf": [LogisticRegression(max_iter=2000)], "clf__C": [1.0, 10.0, 100.0]},
+}
+
+
+def load_corpus(csv_path=DEFAULT_CSV_PATH):
+    """(teks, label) dari survei; label dinormalisasi ke huruf kecil seperti LabelEncoder lama."""
+    texts, labels = [], []
+    for text, label in iter_csv_rows(csv_path):
+        text, label = text.strip(), label.strip().lower()
+        if text and label:
+            texts.append(text)
+            labels.append(label)
+    return texts, labels
+
+
+def build_search(memory, models=("nb",), folds=DEFAULT_FOLDS, jobs=-1, stem=False):
+    pipeline = Pipeline(
+        [("tfidf", TfidfVectorizer(max_features=10000)), ("clf", MultinomialNB())],
+        memory=memory,  # Cache hasil fit_transform TF-IDF per konfigurasi + data
+    )
+    vectorizer_grid = dict(VECTORIZER_GRID)
+    if stem:
+        vectorizer_grid["tfidf__preprocessor"] = vectorizer_grid["tfidf__preprocessor"] + [TextNormalizer(stem=True)]
+    grid = [{**vectorizer_grid, **CLASSIFIER_GRIDS[name]} for name in models]
+    return GridSearchCV(
+        pipeline, grid, scoring="f1_macro",
+        cv=StratifiedKFold(folds, shuffle=True, random_state=RANDOM_STATE),
+        n_jobs=jobs, refit=True,
+    )
+
+
+def _describe_value(key, value):
+    if key == "clf":
+        return type(value).__name__
+    if isinstance(value, tuple):
+        return list(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def _describe_params(params):
+    return {k: _describe_value(k, v) for k, v in params.items()}
+
+
+def train(texts, labels, cache_dir=DEFAULT_CACHE_DIR, models=("nb",), folds=DEFAULT_FOLDS,
+          jobs=-1, test_size=DEFAULT_TEST_SIZE, stem=False, log=sys.stderr):
+    """Mencari parameter terbaik dan melatih model akhir; mengembalikan (artefak, laporan)."""
+    label_encoder = LabelEncoder().fit(labels)
+    y = label_encoder.transform(labels)
+    X_train, X_test, y_train, y_test = train_test_split(
+        texts, y, test_size=test_size, stratify=y, random_state=RANDOM_STATE)
+    memory = joblib.Memory(cache_dir, verbose=0) if cache_dir else None
+
+    started = time.perf_counter()
+    search = build_search(memory, models, folds, jobs, stem)
+    search.fit(X_train, y_train)
+    search_seconds = time.perf_counter() - started
+    print(f"Pencarian selesai dalam {search_seconds:.1f} detik; terbaik {_describe_params(search.best_params_)} "
+          f"(f1_macro CV {search.best_score_:.4f})", file=log)
+
+    predicted = search.predict(X_test)
+    class_names = [str(c) for c in label_encoder.classes_]
+    ranked = sorted(range(len(search.cv_results_["params"])),
+                    key=lambda i: search.cv_results_["rank_test_score"][i])
+    report = {
+        "data": {"baris": len(texts), "latih": len(X_train), "uji": len(X_test),
+                 "per_label": {c: int((y == i).sum()) for i, c in enumerate(class_names)}},
+        "parameter_terbaik": _describe_params(search.best_params_),
+        "cv": {"lipatan": folds, "f1_macro_terbaik": search.best_score_,
+               "kandidat": len(ranked),
+               "lima_teratas": [{"parameter": _describe_params(search.cv_results_["params"][i]),
+                                 "f1_macro": search.cv_results_["mean_test_score"][i],
+                                 "std": search.cv_results_["std_test_score"][i]} for i in ranked[:5]]},
+        "uji": {"akurasi": accuracy_score(y_test, predicted),
+                "f1_macro": f1_score(y_test, predicted, average="macro"),
+                "laporan": classification_report(y_test, predicted, target_names=class_names,
+                                                 output_dict=True, zero_division=0),
+                "confusion_matrix": confusion_matrix(y_test, predicted).tolist()},
+        "detik_pencarian": round(search_seconds, 2),
+    }
+
+    # Model akhir: parameter terbaik, seluruh data (TF-IDF diambil dari cache bila sudah pernah di-fit)
+    final = clone(search.best_estimator_).fit(texts, y)
+    report["detik_total"] = round(time.perf_counter() - started, 2)
+    return (final.named_steps["clf"], final.named_steps["tfidf"], label_encoder), report
+
+
+def write_artifacts(artifacts, report, output_dir):
+    """Menulis tiga artefak + laporan ke `output_dir`; mengembalikan path artefak."""
+    model, tfidf, label_encoder = artifacts
+    paths = save_artifacts(model, tfidf, label_encoder, output_dir)
+    if hasattr(model, "feature_log_prob_"):
+        export_bundle(model, tfidf, label_encoder, os.path.join(output_dir, "sentimen.bundle"),
+                      os.path.basename(os.path.normpath(output_dir)))
+    with open(os.path.join(output_dir, "laporan.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=float)
+    return paths
+
+
+def install(output_dir):
+    """Menjadikan folder artefak berversi `output_dir` set aktif app.py.
+
+    Ketiga file tidak disalin satu per satu: pointer `models/CURRENT_PKL` dipindah
+    secara atomik (sentiment_engine.publish_artifacts), jadi app.py selalu memuat
+    model, vectorizer, dan LabelEncoder dari pelatihan yang sama.
+    """
+    return publish_artifacts(output_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih ulang TF-IDF + classifier dari sentimen_status.csv.")
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH, help="File survei berlabel (default: sentimen_status.csv)")
+    parser.add_argument("--output-dir", default=None, help="Folder artefak (default: models/latih-<versi>)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Cache joblib.Memory untuk TF-IDF; string kosong untuk menonaktifkan")
+    parser.add_argument("--model", choices=["nb", "semua"], default="nb",
+                        help="nb = MultinomialNB saja, semua = ikut Logistic Regression (default: %(default)s)")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--jobs", type=int, default=-1, help="Jumlah proses paralel (-1 = semua core)")
+    parser.add_argument("--stem", action="store_true",
+                        help="Ikut coba normalisasi dengan stemmer Sastrawi (butuh PySastrawi)")
+    parser.add_argument("--pasang", action="store_true", help="Ganti artefak yang dipakai app.py secara atomik")
+    args = parser.parse_args(argv)
+
+    texts, labels = load_corpus(args.csv)
+    models = ("nb",) if args.model == "nb" else ("nb", "lr")
+    artifacts, report = train(texts, labels, args.cache_dir or None, models, args.folds, args.jobs,
+                              stem=args.stem)
+    output_dir = args.output_dir or os.path.join(DEFAULT_BUNDLE_DIR, "latih-" + time.strftime("%Y%m%d%H%M%S"))
+    write_artifacts(artifacts, report, output_dir)
+    if args.pasang and not isinstance(artifacts[0], MultinomialNB):
+        parser.exit(1, f"Model terbaik {type(artifacts[0]).__name__} tidak dipasang: app.py (FastScorer) dan "
+                       f"online_update.py membutuhkan MultinomialNB. Artefak tetap di {output_dir}\n")
+    if args.pasang:
+        install(output_dir)
+    print(f"Uji: akurasi {report['uji']['akurasi']:.4f}, f1_macro {report['uji']['f1_macro']:.4f}; "
+          f"artefak di {output_dir}{' (terpasang)' if args.pasang else ''}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
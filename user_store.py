@@ -0,0 +1,285 @@
+"""Penyimpanan akun pengguna di sentimen.db (menggantikan users.json).
+
+users.json menyimpan seluruh pasangan username -> hash SHA-256 dalam satu
+objek JSON: setiap login membaca dan mem-parse seluruh file, setiap
+pendaftaran menulis ulang seluruh file, dan dua sesi Streamlit yang mendaftar
+bersamaan bisa saling menimpa. Modul ini memakai tabel `users` dengan indeks
+unik pada username (tanpa membedakan huruf besar/kecil):
+
+- Login dan pendaftaran adalah satu lookup indeks / satu INSERT, jadi
+  latensinya tidak bergantung pada jumlah pengguna. Pendaftaran bersamaan
+  dengan username sama ditolak oleh indeks unik, bukan oleh file yang rusak.
+- Password baru di-hash dengan PBKDF2-HMAC-SHA256 ber-salt. Hash SHA-256 lama
+  dari users.json tetap bisa dipakai login dan otomatis di-upgrade saat
+  login berhasil.
+- Cache baca in-process dengan TTL (`SENTIMEN_USER_CACHE_TTL`) untuk data
+  akun dan sesi; perubahan dari proses ini langsung menginvalidasi entrinya,
+  perubahan dari proses lain terlihat setelah TTL habis.
+- Tabel `user_sessions`: setelah login, rerun cukup memvalidasi token sesi
+  (hash token disimpan, bukan token mentahnya) tanpa menghitung hash
+  password lagi. Sesi kedaluwarsa setelah tidak aktif selama
+  `SENTIMEN_SESSION_TTL` detik (auto-logout).
+
+Migrasi users.json berjalan sekali, saat tabel `users` pertama kali dibuat
+oleh persistence.ensure_schema; setelah itu users.json tidak dibaca lagi.
+
+Contoh:
+    python user_store.py --daftar budi          # password diminta di terminal
+    python user_store.py --migrasi users.json   # impor ulang (username yang ada dilewati)
+    python user_store.py --daftar-pengguna
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import string
+import threading
+import time
+
+from sentiment_engine import BASE_DIR
+
+USERS_JSON_PATH = os.path.join(BASE_DIR, "users.json")
+DEFAULT_CACHE_TTL = float(os.environ.get("SENTIMEN_USER_CACHE_TTL", 60))
+DEFAULT_SESSION_TTL = float(os.environ.get("SENTIMEN_SESSION_TTL", 1800))  # 30 menit tidak aktif
+PBKDF2_ITERATIONS = 200000
+MIN_PASSWORD_LENGTH = 6
+MAX_USERNAME_LENGTH = 64
+# Kunci cache mengikuti COLLATE NOCASE SQLite: hanya huruf ASCII yang disamakan
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL COLLATE NOCASE,
+            password_hash TEXT NOT NULL,
+            dibuat TEXT NOT NULL DEFAULT (datetime('now'))
+        )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users (username)",
+    """CREATE TABLE IF NOT EXISTS user_sessions (
+            token_hash TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            kedaluwarsa REAL NOT NULL
+        ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS idx_user_sessions_kedaluwarsa ON user_sessions (kedaluwarsa)",
+)
+
+
+# --- Hash Password ---
+def hash_password(password, iterations=PBKDF2_ITERATIONS):
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    """Cocokkan password dengan hash tersimpan (PBKDF2, atau SHA-256 tanpa salt dari users.json)."""
+    scheme, _, rest = stored.partition("$")
+    if scheme == "pbkdf2_sha256":
+        iterations, salt, expected = rest.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(digest.hex(), expected)
+    if scheme == "sha256":
+        return hmac.compare_digest(hashlib.sha256(password.encode("utf-8")).hexdigest(), rest)
+    return False
+
+
+def needs_rehash(stored):
+    scheme, _, rest = stored.partition("$")
+    return scheme != "pbkdf2_sha256" or int(rest.split("$")[0]) < PBKDF2_ITERATIONS
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# --- Skema & Migrasi ---
+def ensure_schema(conn, users_json=USERS_JSON_PATH):
+    """Membuat tabel akun/sesi; mengimpor users.json saat tabel `users` pertama dibuat."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone()
+    for statement in SCHEMA:
+        conn.execute(statement)
+    if not exists and os.path.exists(users_json):
+        migrate_json(conn, users_json)
+
+
+def migrate_json(conn, path=USERS_JSON_PATH):
+    """Impor pasangan username -> hash SHA-256 dari users.json; username yang sudah ada dilewati."""
+    with open(path, encoding="utf-8") as f:
+        users = json.load(f)
+    before = conn.total_changes
+    conn.executemany("INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, ?)",
+                     ((username, f"sha256${digest}") for username, digest in users.items()))
+    return conn.total_changes - before
+
+
+# --- Cache TTL ---
+class _TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            if len(self._data) > 10000:  # Buang entri kedaluwarsa sesekali agar cache tetap kecil
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class UserStore:
+    """Akun dan sesi login di atas pool koneksi persistence.py."""
+
+    def __init__(self, pool, cache_ttl=DEFAULT_CACHE_TTL, session_ttl=DEFAULT_SESSION_TTL):
+        self.pool = pool
+        self.session_ttl = session_ttl
+        self._users = _TTLCache(cache_ttl)
+        self._sessions = _TTLCache(cache_ttl)
+
+    # --- Akun ---
+    def get_user(self, username):
+        """(username kanonis, hash password), atau None jika tidak terdaftar."""
+        key = username.strip().translate(_NOCASE)
+        cached = self._users.get(key)
+        if cached is None:
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT username, password_hash FROM users WHERE username = ?",
+                                   (username.strip(),)).fetchone()
+            cached = tuple(row) if row else ()  # Tuple kosong: username tidak terdaftar (ikut di-cache)
+            self._users.put(key, cached)
+        return cached or None
+
+    def register(self, username, password):
+        """Mendaftarkan akun baru; ValueError jika username tidak valid atau sudah dipakai."""
+        username = username.strip()
+        if not username or len(username) > MAX_USERNAME_LENGTH:
+            raise ValueError(f"Username wajib diisi (maksimal {MAX_USERNAME_LENGTH} karakter)")
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise ValueError(f"Password minimal {MIN_PASSWORD_LENGTH} karakter")
+        password_hash = hash_password(password)
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Username {username!r} sudah dipakai") from None
+        finally:
+            self._users.invalidate(username.translate(_NOCASE))
+        return username
+
+    def authenticate(self, username, password):
+        """Username kanonis jika password cocok, selain itu None. Hash lama di-upgrade ke PBKDF2."""
+        user = self.get_user(username)
+        if user is None or not verify_password(password, user[1]):
+            return None
+        if needs_rehash(user[1]):
+            with self.pool.connection() as conn:
+                conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (hash_password(password), user[0]))
+            self._users.invalidate(user[0].translate(_NOCASE))
+        return user[0]
+
+    def list_users(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT username, dibuat FROM users ORDER BY username").fetchall()
+
+    # --- Sesi ---
+    def create_session(self, username):
+        """Token sesi baru untuk pengguna yang sudah terautentikasi."""
+        token = secrets.token_urlsafe(32)
+        expires = time.time() + self.session_ttl
+        with self.pool.connection() as conn:
+            conn.execute("INSERT INTO user_sessions (token_hash, username, kedaluwarsa) VALUES (?, ?, ?)",
+                         (_token_hash(token), username, expires))
+            conn.execute("DELETE FROM user_sessions WHERE kedaluwarsa < ?", (time.time(),))
+        self._sessions.put(token, (username, expires))
+        return token
+
+    def resolve_session(self, token):
+        """Username pemilik token yang masih berlaku, atau None.
+
+        Masa berlaku diperpanjang (sliding) hanya saat sisa waktunya tinggal
+        kurang dari separuh, agar rerun biasa tidak menulis ke database.
+        """
+        if not token:
+            return None
+        entry = self._sessions.get(token)
+        if entry is None:
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT username, kedaluwarsa FROM user_sessions WHERE token_hash = ?",
+                                   (_token_hash(token),)).fetchone()
+            if row is None:
+                return None
+            entry = tuple(row)
+        username, expires = entry
+        now = time.time()
+        if expires < now:
+            self.end_session(token)
+            return None
+        if expires - now < self.session_ttl / 2:
+            expires = now + self.session_ttl
+            with self.pool.connection() as conn:
+                conn.execute("UPDATE user_sessions SET kedaluwarsa = ? WHERE token_hash = ?",
+                             (expires, _token_hash(token)))
+        self._sessions.put(token, (username, expires))
+        return username
+
+    def end_session(self, token):
+        self._sessions.invalidate(token)
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM user_sessions WHERE token_hash = ?", (_token_hash(token),))
+
+
+# --- Instans per Proses ---
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """UserStore milik proses ini (memakai persistence.get_pool)."""
+    global _store
+    from persistence import get_pool
+
+    pool = get_pool()
+    with _store_lock:
+        if _store is None or _store.pool is not pool:
+            _store = UserStore(pool)
+        return _store
+
+
+def main(argv=None):
+    import getpass
+
+    from persistence import get_pool, transaction
+
+    parser = argparse.ArgumentParser(description="Kelola akun pengguna di sentimen.db.")
+    parser.add_argument("--daftar", metavar="USERNAME", help="Daftarkan akun baru (password diminta)")
+    parser.add_argument("--migrasi", metavar="JSON", help="Impor akun dari file users.json")
+    parser.add_argument("--daftar-pengguna", action="store_true", help="Tampilkan semua username")
+    args = parser.parse_args(argv)
+    if args.migrasi:
+        with get_pool().connection() as conn, transaction(conn):
+            print(f"{migrate_json(conn, args.migrasi)} akun diimpor")
+    if args.daftar:
+        try:
+            print(f"Akun {get_user_store().register(args.daftar, getpass.getpass('Password: '))} dibuat")
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+    if args.daftar_pengguna:
+        for username, created in get_user_store().list_users():
+            print(f"{username}\t{created}")
+
+
+if __name__ == "__main__":
+    main()